@@ -0,0 +1,128 @@
+"""
+Semantic cache of chat answers, per meeting.
+
+Attendees tend to ask a meeting the same few questions in different words. A
+new question whose embedding is within `similarity` (cosine) of a cached one
+gets the cached answer back, skipping search and generation. Entries are
+stored against a version of the meeting's collection (its point count), and
+a lookup with a different version drops the meeting's entries, so anything
+added to or removed from the collection invalidates them.
+"""
+from collections import OrderedDict
+import threading
+import time
+
+import numpy as np
+
+
+class CachedAnswer:
+    def __init__(self, prompt: str, answer: str, citations: list, cost: float):
+        self.prompt = prompt
+        self.answer = answer
+        self.citations = citations
+        # Seconds the search and generation took, i.e. what a hit saves
+        self.cost = cost
+        self.created_at = time.monotonic()
+
+
+class MeetingAnswers:
+    def __init__(self, version: int):
+        self.version = version
+        self.entries = []
+        self.vectors = None
+
+
+class AnswerCache:
+    def __init__(self, similarity: float = 0.93, ttl: float = 3600.0, max_per_meeting: int = 100,
+                 max_meetings: int = 1000):
+        self.similarity = similarity
+        self.ttl = ttl
+        self.max_per_meeting = max_per_meeting
+        self.max_meetings = max_meetings
+        self._meetings = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+        self._latency_saved = 0.0
+
+    def lookup(self, meeting_id: str, version: int, vector: list):
+        """The cached answer closest to `vector`, if one is within `similarity`, else None."""
+        query = self._unit(vector)
+        with self._lock:
+            meeting = self._current(meeting_id, version)
+            if meeting is None or not meeting.entries:
+                self._counts["misses"] += 1
+                return None
+
+            self._drop_expired(meeting)
+            best = None
+            if meeting.entries:
+                scores = meeting.vectors @ query
+                index = int(np.argmax(scores))
+                if scores[index] >= self.similarity:
+                    best = meeting.entries[index]
+
+            if best is None:
+                self._counts["misses"] += 1
+                return None
+            self._counts["hits"] += 1
+            self._latency_saved += best.cost
+            self._meetings.move_to_end(meeting_id)
+            return best
+
+    def store(self, meeting_id: str, version: int, vector: list, entry: CachedAnswer):
+        with self._lock:
+            meeting = self._current(meeting_id, version)
+            if meeting is None:
+                meeting = self._meetings[meeting_id] = MeetingAnswers(version)
+
+            meeting.entries.append(entry)
+            vector = self._unit(vector)[None, :]
+            meeting.vectors = vector if meeting.vectors is None else np.vstack([meeting.vectors, vector])
+            if len(meeting.entries) > self.max_per_meeting:
+                meeting.entries.pop(0)
+                meeting.vectors = meeting.vectors[1:]
+
+            self._counts["stores"] += 1
+            self._meetings.move_to_end(meeting_id)
+            while len(self._meetings) > self.max_meetings:
+                self._meetings.popitem(last=False)
+
+    def invalidate(self, meeting_id: str):
+        with self._lock:
+            if self._meetings.pop(meeting_id, None) is not None:
+                self._counts["invalidations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counts["hits"] + self._counts["misses"]
+            return {
+                "meetings": len(self._meetings),
+                "entries": sum(len(meeting.entries) for meeting in self._meetings.values()),
+                "similarity": self.similarity,
+                **self._counts,
+                "hit_rate": self._counts["hits"] / lookups if lookups else 0.0,
+                "latency_saved_seconds": round(self._latency_saved, 3),
+            }
+
+    def _current(self, meeting_id: str, version: int):
+        """The meeting's answers, dropping them first if they're for another version. Call with the lock held."""
+        meeting = self._meetings.get(meeting_id)
+        if meeting is not None and meeting.version != version:
+            # Point counts go down as well as up (PDF deletes), so any change is a new version
+            del self._meetings[meeting_id]
+            self._counts["invalidations"] += 1
+            return None
+        return meeting
+
+    def _drop_expired(self, meeting: MeetingAnswers):
+        cutoff = time.monotonic() - self.ttl
+        keep = [i for i, entry in enumerate(meeting.entries) if entry.created_at >= cutoff]
+        if len(keep) < len(meeting.entries):
+            meeting.entries = [meeting.entries[i] for i in keep]
+            meeting.vectors = meeting.vectors[keep] if keep else None
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
@@ -0,0 +1,113 @@
+"""
+Chat latency and model calls with and without the semantic answer cache.
+
+Several attendees ask one meeting a handful of questions, each in a few
+wordings, through POST /meetings/{id}/chat. The run is repeated with the
+cache disabled and enabled. Then a transcript segment is appended, to check
+that the next question is answered afresh. The fake embedder is bag of words,
+which is cruder than a real embedding model, so the default similarity here
+is lower than the server's. Run from the backend directory:
+
+    python -m benchmarks.answer_cache --questions 200 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import statistics
+import time
+
+import httpx
+
+from answer_cache import AnswerCache
+from benchmarks.fakes import FakeGenerativeModel, install_fake_services
+
+TRANSCRIPT = [
+    "The action items are that Priya sends the pricing deck and Tom books the vendor review",
+    "We decided on pricing: the new tier launches next quarter at twenty dollars",
+    "The main risk is the data migration slipping past the release date",
+    "Next meeting is on Thursday to review the hiring plan and the budget",
+    "Customer churn went down after the onboarding changes last month",
+]
+
+QUESTIONS = [
+    ["What were the action items?", "what were the action items", "so what were the action items",
+     "What were the action items again?"],
+    ["What did we decide on pricing?", "what did we decide on pricing", "What did we decide about pricing?"],
+    ["What is the main risk?", "what is the main risk", "So what is the main risk?"],
+    ["When is the next meeting?", "when is the next meeting", "When is the next meeting again?"],
+    ["How did customer churn change?", "how did customer churn change", "So how did customer churn change?"],
+]
+
+
+def workload(count: int, seed: int = 3) -> list:
+    """Questions drawn with a skew towards the first few, like real traffic."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+    return [rng.choice(rng.choices(QUESTIONS, weights)[0]) for _ in range(count)]
+
+
+async def ask_all(client, meeting_id: str, questions: list) -> list:
+    latencies = []
+    for question in questions:
+        start = time.perf_counter()
+        response = await client.post(f"/meetings/{meeting_id}/chat", json={"message": question})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run(args):
+    main = install_fake_services(llm_latency=args.llm_latency, bag_of_words=True)
+    manager = main.qdrant_manager
+    meeting_id = str(main.db["meetings"].insert_one({"title": "Bench", "teamId": "t"}).inserted_id)
+    manager.create_collection(meeting_id)
+    for text in TRANSCRIPT:
+        manager.add_text(meeting_id, text)
+    questions = workload(args.questions)
+
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, similarity in (("cache off", 1.01), ("cache on", args.similarity)):
+            manager.answer_cache = AnswerCache(similarity=similarity)
+            FakeGenerativeModel.calls = 0
+            latencies = await ask_all(client, meeting_id, questions)
+            stats = manager.answer_cache.stats()
+            results.append({
+                "mode": label,
+                "questions": len(questions),
+                "model_calls": FakeGenerativeModel.calls,
+                "hit_rate": round(stats["hit_rate"], 3),
+                "mean_ms": round(statistics.mean(latencies) * 1000, 1),
+                "p50_ms": round(statistics.median(latencies) * 1000, 1),
+                "latency_saved_seconds": stats["latency_saved_seconds"],
+            })
+
+        # New transcript data must invalidate the meeting's answers
+        manager.add_text(meeting_id, "Update: the action items now include a security review")
+        FakeGenerativeModel.calls = 0
+        await ask_all(client, meeting_id, [QUESTIONS[0][0]])
+        results.append({"mode": "after a new segment", "model_calls": FakeGenerativeModel.calls,
+                        "invalidations": manager.answer_cache.stats()["invalidations"]})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--similarity", type=float, default=0.85)
+    args = parser.parse_args()
+
+    # The handlers print liberally
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = asyncio.run(run(args))
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Time to first token for buffered vs streamed chat.
+
+Sends the same questions to POST /meetings/{id}/chat and
+/meetings/{id}/chat/stream, with a stub model that takes --latency seconds
+per answer spread over --chunks chunks. Each body chunk the app sends is
+timestamped at the ASGI layer, so the numbers are what a client would see.
+A last run disconnects after the first token and counts how many chunks the
+model produced afterwards. Run from the backend directory:
+
+    python -m benchmarks.chat_stream --latency 3.0 --chunks 30 --requests 5
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import time
+
+from benchmarks.fakes import FakeGenerativeModel, install_fake_services
+
+
+async def call(app, path, body, disconnect_after_first=False):
+    """Run one POST through the ASGI app. Returns (first body chunk, last body chunk) in seconds."""
+    payload = json.dumps(body).encode()
+    disconnected = asyncio.Event()
+    sent_body = False
+    first = last = None
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal first, last
+        if message["type"] == "http.response.body" and message.get("body"):
+            now = time.perf_counter() - start
+            if first is None and (not path.endswith("/stream") or b"event: token" in message["body"]):
+                first = now
+                if disconnect_after_first:
+                    disconnected.set()
+            last = now
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"bench")],
+        "server": ("bench", 80), "client": ("bench", 1234), "root_path": "",
+    }
+    await app(scope, receive, send)
+    return first, last
+
+
+def summarize(label, timings):
+    firsts = [first for first, _ in timings]
+    lasts = [last for _, last in timings]
+    return {
+        "mode": label,
+        "requests": len(timings),
+        "ttft_p50_ms": round(statistics.median(firsts) * 1000, 1),
+        "ttft_max_ms": round(max(firsts) * 1000, 1),
+        "complete_p50_ms": round(statistics.median(lasts) * 1000, 1),
+    }
+
+
+async def run(args):
+    main = install_fake_services(llm_latency=args.latency)
+    FakeGenerativeModel.stream_chunks = args.chunks
+    meeting_id = str(main.db["meetings"].insert_one({"title": "Bench", "teamId": "t"}).inserted_id)
+    main.qdrant_manager.create_collection(meeting_id)
+    # The fake embedder only matches identical text, so ask with the stored sentence
+    sentence = "We agreed to ship the pricing change next quarter."
+    main.qdrant_manager.add_text(meeting_id, sentence)
+    question = {"message": sentence}
+    # Every request should reach the model, not the answer cache
+    main.qdrant_manager.answer_cache.similarity = 2.0
+
+    results = []
+    for path, label in ((f"/meetings/{meeting_id}/chat", "buffered"),
+                        (f"/meetings/{meeting_id}/chat/stream", "streamed")):
+        timings = [await call(main.app, path, question) for _ in range(args.requests)]
+        results.append(summarize(label, timings))
+
+    # Disconnect after the first token and see whether generation stops
+    FakeGenerativeModel.chunks_sent = 0
+    await call(main.app, f"/meetings/{meeting_id}/chat/stream", question, disconnect_after_first=True)
+    await asyncio.sleep(args.latency)
+    results.append({"mode": "streamed, client disconnects after first token",
+                    "chunks_per_answer": args.chunks, "chunks_generated": FakeGenerativeModel.chunks_sent})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=3.0, help="seconds per full answer")
+    parser.add_argument("--chunks", type=int, default=30, help="chunks per streamed answer")
+    parser.add_argument("--requests", type=int, default=5)
+    args = parser.parse_args()
+
+    # The handlers print liberally
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = asyncio.run(run(args))
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Wall-clock time and LLM calls for concept graphs of growing transcripts.
+
+Compares the old single pass over the first 10k characters with hierarchical
+extraction, which covers the whole transcript in concurrent windows plus one
+consolidation pass. The model is a stub that sleeps `--latency` seconds and
+returns a graph of words from the prompt. Run from the backend directory:
+
+    python -m benchmarks.concept_graph --segments 200 800 3200 --latency 0.5
+"""
+import argparse
+import json
+import threading
+import time
+
+from benchmarks.fakes import synthetic_lines
+from concept_graph import extract_concept_graph, transcript_prompt, parse_graph, tokenize
+
+
+class StubGraphModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        words = sorted(set(token for token in tokenize(prompt) if len(token) > 6))[:8]
+        nodes = [{"id": str(i), "text": word, "type": "concept", "importance": 5} for i, word in enumerate(words)]
+        edges = [{"source": str(i), "target": str(i + 1), "type": "related", "strength": 5}
+                 for i in range(len(words) - 1)]
+        return json.dumps({"nodes": nodes, "edges": edges})
+
+
+def run(segments, latency, concurrency, truncated):
+    transcriptions = [{"text": line, "start_time": i * 10, "end_time": i * 10 + 10}
+                      for i, line in enumerate(synthetic_lines(segments, words_per_line=25))]
+    model = StubGraphModel(latency)
+    chars = sum(len(t["text"]) + 1 for t in transcriptions)
+
+    start = time.perf_counter()
+    if truncated:
+        text = "\n".join(t["text"] for t in transcriptions)[:10000]
+        graph = parse_graph(model(transcript_prompt(text)))
+        covered = min(chars, 10000)
+    else:
+        graph = extract_concept_graph(transcriptions, model, max_concurrency=concurrency)
+        covered = chars
+
+    return {
+        "mode": "truncated" if truncated else f"hierarchical x{concurrency}",
+        "segments": segments,
+        "transcript_chars": chars,
+        "chars_covered": covered,
+        "llm_calls": model.calls,
+        "nodes": len(graph["nodes"]),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, nargs="+", default=[200, 800, 3200])
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per LLM call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    for segments in args.segments:
+        print(json.dumps(run(segments, args.latency, 1, truncated=True)))
+        for concurrency in args.concurrency:
+            print(json.dumps(run(segments, args.latency, concurrency, truncated=False)))
+
+
+if __name__ == "__main__":
+    main()
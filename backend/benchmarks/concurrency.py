@@ -0,0 +1,88 @@
+"""
+Event-loop responsiveness benchmark.
+
+Measures p50/p99 latency of a cheap endpoint (GET /meetings/{id}) on its own
+and again while slow chat requests are in flight. If any handler blocks the
+event loop the second set of numbers grows with the chat latency. Run from the
+backend directory:
+
+    python -m benchmarks.concurrency --chat-latency 1.0 --chats 8
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks.fakes import install_fake_services
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def measure_reads(client, meeting_id, requests, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(f"/meetings/{meeting_id}")
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return {
+        "requests": requests,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+    }
+
+
+async def run(args):
+    main = install_fake_services(llm_latency=args.chat_latency)
+    meeting_id = str(main.db["meetings"].insert_one({"title": "Bench", "teamId": "t"}).inserted_id)
+    main.qdrant_manager.create_collection(meeting_id)
+    main.qdrant_manager.add_text(meeting_id, "We agreed to ship the pricing change next quarter.")
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        idle = await measure_reads(client, meeting_id, args.requests, args.concurrency)
+
+        chats = [
+            asyncio.create_task(client.post(f"/meetings/{meeting_id}/chat", json={"message": "What about pricing?"}))
+            for _ in range(args.chats)
+        ]
+        # Let the chat requests reach the model before measuring
+        await asyncio.sleep(0.05)
+        loaded = await measure_reads(client, meeting_id, args.requests, args.concurrency)
+        chat_responses = await asyncio.gather(*chats)
+
+    return {"chat_latency_s": args.chat_latency, "chats_in_flight": args.chats,
+            "chat_errors": sum(r.status_code != 200 for r in chat_responses),
+            "idle": idle, "during_chat": loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--chats", type=int, default=8)
+    parser.add_argument("--chat-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    # The handlers print liberally
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Prompt size with and without context packing.
+
+Builds search results that look like a real chat retrieval: runs of
+neighbouring transcript segments that restate each other (vectors close
+together) and PDF lines repeated across pages. It then compares the context
+chat used to build (every hit concatenated) with ContextPacker's output.
+Run from the backend directory:
+
+    python -m benchmarks.context_packing --hits 30 --budget 2000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from qdrant_client.http.models import ScoredPoint
+
+from context_packing import ContextPacker, estimate_tokens, render_result
+
+WORDS = ("pricing launch budget roadmap hiring customer churn quarter release "
+         "migration contract vendor onboarding forecast revenue support").split()
+
+
+def make_results(hits: int, dimension: int = 768, run_length: int = 4, pdf_share: float = 0.3, seed: int = 7) -> list:
+    rng = np.random.default_rng(seed)
+    results = []
+    start_time = 0
+    pdf_lines = [" ".join(rng.choice(WORDS, 14)) for _ in range(3)]
+    while len(results) < hits:
+        if rng.random() < pdf_share:
+            # The same line, as it appears on several pages
+            text = pdf_lines[rng.integers(len(pdf_lines))]
+            vector = rng.standard_normal(dimension)
+            payload = {"text": text, "isPDF": True}
+            results.append((payload, vector))
+            continue
+        # A run of neighbouring segments on one point, the first two restating it
+        base = rng.standard_normal(dimension)
+        sentence = " ".join(rng.choice(WORDS, 25))
+        for j in range(run_length):
+            text = sentence + " " + " ".join(rng.choice(WORDS, 3))
+            vector = base + (0.1 if j < 2 else 0.4) * rng.standard_normal(dimension)
+            payload = {"text": text, "start_time": start_time, "end_time": start_time + 10}
+            results.append((payload, vector))
+            start_time += 10
+        start_time += 60
+
+    points = []
+    for i, (payload, vector) in enumerate(results[:hits]):
+        points.append(ScoredPoint(id=i, version=0, score=float(0.9 - 0.01 * i + rng.normal(0, 0.02)),
+                                  payload=payload, vector=(vector / np.linalg.norm(vector)).tolist()))
+    return points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hits", type=int, default=30)
+    parser.add_argument("--budget", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    results = make_results(args.hits)
+    naive = "".join(render_result(result) for result in results)
+
+    packer = ContextPacker(token_budget=args.budget)
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        selected, packed = packer.pack(results)
+    pack_ms = (time.perf_counter() - start) / args.runs * 1000
+
+    stats = packer.stats()
+    print(json.dumps({
+        "hits": len(results),
+        "naive_tokens": estimate_tokens(naive),
+        "packed_tokens": estimate_tokens(packed),
+        "selected": len(selected),
+        "duplicates_dropped": stats["duplicates_dropped"] // args.runs,
+        "segments_merged": stats["segments_merged"] // args.runs,
+        "tokens_saved_ratio": round(stats["tokens_saved_ratio"], 3),
+        "pack_ms": round(pack_ms, 3),
+    }))
+
+
+if __name__ == "__main__":
+    main()
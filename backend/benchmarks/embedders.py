@@ -0,0 +1,74 @@
+"""
+Embedding throughput and batch latency per provider and batch size.
+
+Embeds synthetic transcript lines in batches of each size and reports texts
+per second and batch p50/p99, from the embedder's own counters. Batch size 1
+is the old one-request-per-segment path. The local provider needs the
+optional `sentence-transformers` package and is skipped without it; gemini
+makes real API calls, so it only runs when asked for and GOOGLE_API_KEY is
+set. Run from the backend directory:
+
+    python -m benchmarks.embedders --texts 2000 --batch-sizes 1,16,64,256
+    python -m benchmarks.embedders --providers local --threads 1,4 --backend onnx
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks.fakes import synthetic_lines
+from embeddings import make_embedder
+
+
+def run(embedder, texts: list, batch_size: int) -> dict:
+    # Warm up first (model load, caches), outside the counters
+    embedder._embed_batch(texts[:min(batch_size, 8)])
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        embedder.embed(texts[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+    stats = embedder.stats()
+    return {
+        "texts": len(texts),
+        "seconds": round(elapsed, 3),
+        "texts_per_second": round(len(texts) / elapsed, 1),
+        "batch_p50_ms": stats["batch_p50_ms"],
+        "batch_p99_ms": stats["batch_p99_ms"],
+    }
+
+
+def run_provider(provider: str, texts: list, args):
+    if provider == "gemini" and not os.getenv("GOOGLE_API_KEY"):
+        print(json.dumps({"provider": provider, "skipped": "GOOGLE_API_KEY is not set"}))
+        return
+    for threads in [int(t) for t in args.threads.split(",")] if provider == "local" else [0]:
+        for batch_size in [int(size) for size in args.batch_sizes.split(",")]:
+            try:
+                # A fresh embedder per run, so the counters only cover that run
+                embedder = make_embedder(provider, dimension=args.dimension, threads=threads or None,
+                                         backend=args.backend)
+            except ImportError as e:
+                print(json.dumps({"provider": provider, "skipped": str(e)}))
+                return
+            result = run(embedder, texts, batch_size)
+            print(json.dumps({"provider": embedder.name, "threads": threads or None, "batch_size": batch_size,
+                              **result}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--providers", default="hashing,local")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-sizes", default="1,16,64,256")
+    parser.add_argument("--dimension", type=int, default=768, help="vector size; the local provider truncates to it")
+    parser.add_argument("--threads", default="0", help="local provider CPU threads to try, 0 for the default")
+    parser.add_argument("--backend", default="torch", help="local provider backend, torch or onnx")
+    args = parser.parse_args()
+
+    texts = synthetic_lines(args.texts)
+    for provider in args.providers.split(","):
+        run_provider(provider, texts, args)
+
+
+if __name__ == "__main__":
+    main()
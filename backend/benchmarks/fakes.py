@@ -0,0 +1,245 @@
+"""
+Local stand-ins for the external services the backend talks to, used by the
+benchmarks in this package. Nothing here makes network calls.
+"""
+import hashlib
+import io
+import re
+import sys
+import threading
+import time
+import types
+
+import google.generativeai as genai
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+import mongomock
+import mongomock.gridfs
+import numpy as np
+from qdrant_client import QdrantClient
+
+from qdrant_layout import TenantResolver, mongo_tenant_lookup
+from qdrant_manager import QdrantManager
+
+
+class FakeEmbedder:
+    """
+    Deterministic embedder with configurable latency.
+
+    Each call sleeps `latency` seconds plus `per_text_latency` per text, which
+    roughly models a remote batch embedding API. By default every distinct text
+    gets an unrelated vector; with `bag_of_words` a text is the sum of its
+    words' vectors, so rewordings of a question land close together.
+    """
+
+    def __init__(self, dimension: int = 768, latency: float = 0.0, per_text_latency: float = 0.0,
+                 bag_of_words: bool = False):
+        self.dimension = dimension
+        self.latency = latency
+        self.per_text_latency = per_text_latency
+        self.bag_of_words = bag_of_words
+        self.calls = 0
+        self.texts = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, texts: list) -> list:
+        with self._lock:
+            self.calls += 1
+            self.texts += len(texts)
+        time.sleep(self.latency + self.per_text_latency * len(texts))
+        return [self.vector(text) for text in texts]
+
+    def vector(self, text: str) -> list:
+        if self.bag_of_words:
+            words = re.findall(r"\w+", text.lower()) or [""]
+            vector = sum(self._random_vector(word) for word in words)
+        else:
+            vector = self._random_vector(text)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def _random_vector(self, text: str):
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+
+
+class SerializedClient:
+    """
+    Proxy that serializes calls to a client. The local in-memory QdrantClient is
+    not thread-safe, whereas a Qdrant server is, so concurrent benchmarks go
+    through this.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+        return call
+
+
+def make_qdrant_manager(embedder=None, storage: str = "per_meeting", database=None) -> QdrantManager:
+    """
+    QdrantManager backed by an in-memory Qdrant and a fake embedder. The
+    shared storage mode resolves tenants from `database`.
+    """
+    return QdrantManager(
+        qdrant_api_key=None,
+        google_api_key=None,
+        client=SerializedClient(QdrantClient(":memory:")),
+        embed_fn=embedder or FakeEmbedder(),
+        storage=storage,
+        tenant_resolver=TenantResolver(mongo_tenant_lookup(database)) if database is not None else None,
+    )
+
+
+def synthetic_lines(count: int, words_per_line: int = 12) -> list:
+    vocabulary = ("revenue", "pipeline", "customer", "roadmap", "hiring", "budget", "launch",
+                  "pricing", "churn", "forecast", "design", "metrics", "quarter", "partner")
+    return [
+        " ".join(vocabulary[(i * 7 + j * 3) % len(vocabulary)] for j in range(words_per_line)) + f" #{i}"
+        for i in range(count)
+    ]
+
+
+def synthetic_pdf(pages: int, lines_per_page: int = 40, words_per_line: int = 12) -> bytes:
+    """A valid text-only PDF with `pages` pages of synthetic lines."""
+    lines = synthetic_lines(pages * lines_per_page, words_per_line)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(pages):
+        text = ["BT /F1 9 Tf 11 TL 40 800 Td"]
+        for line in lines[page * lines_per_page:(page + 1) * lines_per_page]:
+            # Synthetic lines have no characters that need escaping in a PDF string
+            text.append(f"({line}) '")
+        text.append("ET")
+        stream = "\n".join(text).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Stand-in for genai.GenerativeModel that blocks for `latency` seconds per
+    call. With stream=True the same time is spread evenly over
+    `stream_chunks` chunks; `chunks_sent` counts chunks actually produced.
+    Set `respond` to a function of the prompt to choose the reply text.
+    """
+
+    latency = 0.0
+    stream_chunks = 20
+    respond = None
+    calls = 0
+    chunks_sent = 0
+    _lock = threading.Lock()
+
+    def __init__(self, model_name, *args, **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, *args, stream=False, **kwargs):
+        with FakeGenerativeModel._lock:
+            FakeGenerativeModel.calls += 1
+        text = f"Answer from {self.model_name} for a {len(str(prompt))} character prompt."
+        if FakeGenerativeModel.respond is not None:
+            text = FakeGenerativeModel.respond(str(prompt))
+        if stream:
+            return self._stream(text)
+        time.sleep(self.latency)
+        return FakeResponse(text)
+
+    def _stream(self, text):
+        words = text.split(" ")
+        per_chunk = max(1, -(-len(words) // self.stream_chunks))
+        for i in range(self.stream_chunks):
+            time.sleep(self.latency / self.stream_chunks)
+            with FakeGenerativeModel._lock:
+                FakeGenerativeModel.chunks_sent += 1
+            yield FakeResponse(" ".join(words[i * per_chunk:(i + 1) * per_chunk]) + " ")
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    LangChain chat model stand-in for the summarizer. Counts calls, sleeps
+    `latency` seconds per call and answers with a short fixed-size summary.
+    """
+
+    latency: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        prompt_chars = sum(len(str(message.content)) for message in messages)
+        text = f"- Summary point covering {prompt_chars} characters of input."
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def get_num_tokens(self, text: str) -> int:
+        # Rough 4 characters per token, avoids needing a tokenizer
+        return len(text) // 4
+
+
+def install_fake_services(llm_latency: float = 0.0, embed_latency: float = 0.0, bag_of_words: bool = False,
+                          storage: str = "per_meeting", mongo_url: str = None, mongo_database: str = "biz_data"):
+    """
+    Import the FastAPI app with Mongo replaced by mongomock, Qdrant by an
+    in-memory client and Gemini by fakes. Must be called before anything else
+    imports `main`. Returns the `main` module. With `mongo_url`, a real Mongo
+    server is used instead of mongomock, with `mongo_database` as the database.
+    """
+    fake_mongo = types.ModuleType("db.mongo")
+    if mongo_url:
+        from pymongo import MongoClient
+        fake_mongo.client = MongoClient(mongo_url)
+    else:
+        # Lets gridfs (PDF storage) run on mongomock collections
+        mongomock.gridfs.enable_gridfs_integration()
+        fake_mongo.client = mongomock.MongoClient()
+    fake_mongo.db = fake_mongo.client[mongo_database]
+    sys.modules["db.mongo"] = fake_mongo
+
+    FakeGenerativeModel.latency = llm_latency
+    genai.GenerativeModel = FakeGenerativeModel
+
+    import main
+    main.qdrant_manager = make_qdrant_manager(FakeEmbedder(latency=embed_latency, bag_of_words=bag_of_words),
+                                              storage=storage, database=fake_mongo.db)
+    if main.qdrant_manager.layout.shared:
+        main.qdrant_manager.ensure_shared_collection()
+    main.pdf_ingestor.qdrant_manager = main.qdrant_manager
+    main.transcript_feed.qdrant_manager = main.qdrant_manager
+    main.segment_batcher.qdrant_manager = main.qdrant_manager
+    main.summary_scheduler.version_fn = main.qdrant_manager.transcript_revision
+    return main
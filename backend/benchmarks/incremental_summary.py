@@ -0,0 +1,63 @@
+"""
+LLM call counts for repeated summaries of a growing transcript.
+
+Simulates a meeting whose transcript grows between summary refreshes and
+compares summarizing from scratch each time with the incremental summarizer,
+which reuses map outputs for chunks it has already seen. Run from the backend
+directory:
+
+    python -m benchmarks.incremental_summary --refreshes 12 --segments-per-refresh 40
+"""
+import argparse
+import json
+import time
+
+from benchmarks.fakes import FakeChatModel, synthetic_lines
+from summarize import Summarizer, InMemoryMapStore
+
+
+def run(refreshes, segments_per_refresh, latency, incremental):
+    llm = FakeChatModel(latency=latency)
+    store = InMemoryMapStore()
+    segments = synthetic_lines(refreshes * segments_per_refresh, words_per_line=20)
+
+    rows = []
+    for refresh in range(1, refreshes + 1):
+        text = " ".join(segments[:refresh * segments_per_refresh])
+        # Without reuse every refresh starts with an empty map store
+        summarizer = Summarizer(llm=llm, map_store=store if incremental else InMemoryMapStore())
+        calls_before = llm.calls
+        start = time.perf_counter()
+        result = summarizer.summarize(text)
+        rows.append({
+            "refresh": refresh,
+            "transcript_chars": len(text),
+            "chunks": len(result["input_documents"]),
+            "mapped_chunks": result["mapped_chunks"],
+            "llm_calls": llm.calls - calls_before,
+            "seconds": time.perf_counter() - start,
+        })
+
+    return {
+        "mode": "incremental" if incremental else "full",
+        "total_llm_calls": llm.calls,
+        "refreshes": rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--refreshes", type=int, default=12)
+    parser.add_argument("--segments-per-refresh", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per LLM call")
+    args = parser.parse_args()
+
+    for incremental in (False, True):
+        result = run(args.refreshes, args.segments_per_refresh, args.latency, incremental)
+        print(json.dumps({"mode": result["mode"], "total_llm_calls": result["total_llm_calls"]}))
+        for row in result["refreshes"]:
+            print("  " + json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Serial vs process-pool PDF text extraction.
+
+Generates a multi-hundred-page PDF and extracts its text with the old
+in-process pdfplumber loop and with `PdfExtractor` at several worker counts,
+reporting pages per second and the time until the first line is available
+to the embed stage. With --ingest, each run also feeds `PdfIngestor` with a
+fake embedder, showing embedding overlapping extraction. Worker pools are
+started before timing. Run from the backend directory:
+
+    python -m benchmarks.pdf_extract --pages 400 --workers 1,2,4
+"""
+import argparse
+import io
+import json
+import time
+
+import pdfplumber
+
+from benchmarks.fakes import FakeEmbedder, make_qdrant_manager, synthetic_pdf
+from pdf_extract import PdfExtractor
+from pdf_ingest import PdfIngestor
+
+
+def serial_lines(pdf_bytes):
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text()
+            if text:
+                yield from text.splitlines()
+
+
+def timed(lines):
+    """Consume `lines`, returning (line count, seconds to the first line)."""
+    start = time.perf_counter()
+    first_line = None
+    count = 0
+    for _ in lines:
+        if first_line is None:
+            first_line = time.perf_counter() - start
+        count += 1
+    return count, first_line
+
+
+def measure(mode, make_lines, pages, ingest, embed_latency):
+    start = time.perf_counter()
+    first_line = None
+    if ingest:
+        manager = make_qdrant_manager(FakeEmbedder(latency=embed_latency))
+        stats = PdfIngestor(manager).ingest("bench", make_lines(), document_key="bench.pdf")
+        count = stats.lines
+    else:
+        count, first_line = timed(make_lines())
+    seconds = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "pages": pages,
+        "lines": count,
+        "seconds": round(seconds, 3),
+        "pages_per_second": round(pages / seconds, 1),
+        "first_line_seconds": round(first_line, 3) if first_line is not None else None,
+    }
+
+
+def int_list(value):
+    return [int(v) for v in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int_list, default=[1, 2, 4])
+    parser.add_argument("--pages-per-task", type=int, default=8)
+    parser.add_argument("--ingest", action="store_true", help="also embed and store the text")
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="seconds per embed request")
+    args = parser.parse_args()
+
+    pdf_bytes = synthetic_pdf(args.pages)
+    print(json.dumps({"pdf_bytes": len(pdf_bytes), "pages": args.pages}))
+    print(json.dumps(measure("serial", lambda: serial_lines(pdf_bytes), args.pages, args.ingest, args.embed_latency)))
+
+    for workers in args.workers:
+        extractor = PdfExtractor(workers=workers, pages_per_task=args.pages_per_task)
+        # Start the worker processes outside the timed run
+        list(extractor.iter_lines(io.BytesIO(synthetic_pdf(workers))))
+        result = measure(f"process pool x{workers}", lambda: extractor.iter_lines(io.BytesIO(pdf_bytes)),
+                         args.pages, args.ingest, args.embed_latency)
+        print(json.dumps(result))
+        extractor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
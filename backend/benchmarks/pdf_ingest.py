@@ -0,0 +1,81 @@
+"""
+Throughput benchmark for PDF ingestion.
+
+Compares the legacy one-call-per-line path (`QdrantManager.add_text_pdf`) with
+`PdfIngestor` across a grid of batch sizes and concurrency limits, using a fake
+embedder and an in-memory Qdrant. Run from the backend directory:
+
+    python -m benchmarks.pdf_ingest --lines 2000 --latency 0.05
+"""
+import argparse
+import itertools
+import json
+import time
+
+from benchmarks.fakes import FakeEmbedder, make_qdrant_manager, synthetic_lines
+from pdf_ingest import PdfIngestor
+
+
+def run_legacy(lines, latency):
+    embedder = FakeEmbedder(latency=latency)
+    manager = make_qdrant_manager(embedder)
+    start = time.perf_counter()
+    for index, line in enumerate(lines):
+        manager.add_text_pdf("bench", line, "bench.pdf", index)
+    seconds = time.perf_counter() - start
+    return {
+        "mode": "legacy",
+        "lines": len(lines),
+        "embed_calls": embedder.calls,
+        "seconds": seconds,
+        "lines_per_second": len(lines) / seconds,
+    }
+
+
+def run_bulk(lines, latency, embed_batch_size, max_concurrency, upsert_batch_size, chunk_chars):
+    embedder = FakeEmbedder(latency=latency)
+    manager = make_qdrant_manager(embedder)
+    ingestor = PdfIngestor(manager, chunk_chars=chunk_chars, embed_batch_size=embed_batch_size,
+                           upsert_batch_size=upsert_batch_size, max_concurrency=max_concurrency)
+    stats = ingestor.ingest("bench", lines, document_key="bench.pdf")
+    return {
+        "mode": "bulk",
+        "embed_batch_size": embed_batch_size,
+        "max_concurrency": max_concurrency,
+        "upsert_batch_size": upsert_batch_size,
+        "chunk_chars": chunk_chars,
+        "embed_calls": embedder.calls,
+        "points": manager.client.count("bench").count,
+        **stats.as_dict(),
+    }
+
+
+def int_list(value):
+    return [int(v) for v in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per embed request")
+    parser.add_argument("--batch-sizes", type=int_list, default=[16, 64])
+    parser.add_argument("--concurrency", type=int_list, default=[1, 4])
+    parser.add_argument("--upsert-batch-size", type=int, default=256)
+    parser.add_argument("--chunk-chars", type=int, default=500)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    lines = synthetic_lines(args.lines)
+    results = []
+    if not args.skip_legacy:
+        results.append(run_legacy(lines, args.latency))
+    for batch_size, concurrency in itertools.product(args.batch_sizes, args.concurrency):
+        results.append(run_bulk(lines, args.latency, batch_size, concurrency,
+                                args.upsert_batch_size, args.chunk_chars))
+
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Memory, search latency and recall@k for each Qdrant collection profile.
+
+Uses clustered synthetic 768-d vectors, with exact top-k by brute force as the
+ground truth. With --url each profile is created on that Qdrant server,
+loaded, indexed and searched for real. Without it, the embedded in-memory
+Qdrant has no HNSW or quantization to measure. The profile's quantized
+search (int8 or binary scoring, oversampling, then rescoring with the
+originals) is emulated in numpy instead, which gives recall but not server
+latency. Memory is estimated from the profile either way. Run from the
+backend directory:
+
+    python -m benchmarks.qdrant_profiles --points 20000 --queries 200
+    python -m benchmarks.qdrant_profiles --url http://localhost:6333 --points 100000
+"""
+import argparse
+import json
+import time
+import uuid
+
+import numpy as np
+
+from collection_profiles import PROFILES
+
+
+def make_vectors(points: int, dimension: int, clusters: int = 50, spread: float = 0.6, seed: int = 11):
+    """Unit vectors around `clusters` topics, roughly how meeting embeddings group."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    labels = rng.integers(clusters, size=points)
+    vectors = centers[labels] + spread * rng.standard_normal((points, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors, count: int, noise: float = 0.5, seed: int = 12):
+    rng = np.random.default_rng(seed)
+    picks = vectors[rng.integers(len(vectors), size=count)]
+    queries = picks + noise * rng.standard_normal(picks.shape).astype(np.float32) / np.sqrt(vectors.shape[1])
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors, queries, k: int):
+    scores = queries @ vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def recall(found: list, truth) -> float:
+    hits = sum(len(set(ids) & set(expected)) for ids, expected in zip(found, truth.tolist()))
+    return hits / truth.size
+
+
+def emulate(profile, vectors, queries, k: int):
+    """Per-query top-k ids and latencies for the profile's quantized search with rescoring."""
+    if profile.quantization == "scalar":
+        # int8 over the 0.99 quantile range, as Qdrant does (held as float32 for numpy's matmul)
+        bound = float(np.quantile(np.abs(vectors), 0.99))
+        codes = np.clip(np.round(vectors / bound * 127), -127, 127).astype(np.float32)
+        score = lambda query: codes @ query
+    elif profile.quantization == "binary":
+        signs = np.where(vectors > 0, 1.0, -1.0).astype(np.float32)
+        score = lambda query: signs @ np.where(query > 0, 1.0, -1.0).astype(np.float32)
+    else:
+        score = lambda query: vectors @ query
+
+    candidates = int(k * (profile.oversampling or 1.0)) if profile.quantization else k
+    found, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        scores = score(query)
+        ids = np.argpartition(-scores, candidates)[:candidates]
+        if profile.quantization and profile.rescore:
+            # Rescore the oversampled candidates with the original vectors
+            scores = vectors[ids] @ query
+        else:
+            scores = scores[ids]
+        ids = ids[np.argsort(-scores)][:k]
+        latencies.append(time.perf_counter() - start)
+        found.append(ids.tolist())
+    return found, latencies
+
+
+def run_on_server(url: str, profile, vectors, queries, k: int, batch_size: int = 512):
+    from qdrant_client import QdrantClient
+    from qdrant_client.http.models import CollectionStatus, PointStruct
+
+    client = QdrantClient(url=url, timeout=300)
+    name = f"bench_profile_{profile.name}_{uuid.uuid4().hex[:8]}"
+    client.create_collection(name, **profile.create_args(vectors.shape[1]))
+    try:
+        for start in range(0, len(vectors), batch_size):
+            batch = vectors[start:start + batch_size]
+            client.upsert(name, points=[
+                PointStruct(id=start + i, vector=vector.tolist()) for i, vector in enumerate(batch)
+            ], wait=True)
+        # Wait for the optimizer to build the index before timing searches
+        while client.get_collection(name).status != CollectionStatus.GREEN:
+            time.sleep(0.5)
+
+        found, latencies = [], []
+        for query in queries:
+            start = time.perf_counter()
+            results = client.search(name, query_vector=query.tolist(), limit=k, search_params=profile.search_params())
+            latencies.append(time.perf_counter() - start)
+            found.append([result.id for result in results])
+        return found, latencies
+    finally:
+        client.delete_collection(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--profiles", default=",".join(PROFILES))
+    parser.add_argument("--url", help="Qdrant server to benchmark against, instead of emulating")
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.points, args.dimension)
+    queries = make_queries(vectors, args.queries)
+    truth = exact_top_k(vectors, queries, args.k)
+
+    for name in args.profiles.split(","):
+        profile = PROFILES[name]
+        if args.url:
+            found, latencies = run_on_server(args.url, profile, vectors, queries, args.k)
+        else:
+            found, latencies = emulate(profile, vectors, queries, args.k)
+        memory = profile.estimate_memory(args.points, args.dimension)
+        print(json.dumps({
+            "profile": name,
+            "mode": "server" if args.url else "emulated",
+            f"recall@{args.k}": round(recall(found, truth), 4),
+            "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 3),
+            "est_ram_mb": round(memory["ram_bytes"] / 2**20, 1),
+            "est_disk_mb": round(memory["disk_bytes"] / 2**20, 1),
+        }))
+
+
+if __name__ == "__main__":
+    main()
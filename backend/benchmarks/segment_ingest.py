@@ -0,0 +1,131 @@
+"""
+Transcript segment ingest through POST /meetings/{id}/segments, with and
+without the segment batcher.
+
+Each meeting posts its segments one after another, as a recording does, and
+all meetings post at once. The unbatched run writes every request on its own
+(one embed call and one upsert each), like the old per-chunk path. After each
+run, every request is sent again to check that retries don't add points.
+With --storage shared, a batch's meetings share one upsert. Run from the
+backend directory:
+
+    python -m benchmarks.segment_ingest --meetings 20 --segments 30 --embed-latency 0.1
+    python -m benchmarks.segment_ingest --storage shared
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import time
+
+from bson import ObjectId
+import httpx
+
+from benchmarks.fakes import install_fake_services
+from offload import run_ingest
+from segment_ingest import SegmentBatcher
+
+
+class CountingClient:
+    """Qdrant client proxy that counts upserts and adds `latency` to each."""
+
+    def __init__(self, client, latency: float):
+        self._client = client
+        self.latency = latency
+        self.upserts = 0
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def upsert(self, *args, **kwargs):
+        self.upserts += 1
+        time.sleep(self.latency)
+        return self._client.upsert(*args, **kwargs)
+
+
+class Unbatched:
+    """The endpoint's write without batching: one embed call and upsert per request."""
+
+    def __init__(self, qdrant_manager):
+        self.qdrant_manager = qdrant_manager
+
+    async def submit(self, meeting_id: str, segments: list) -> list:
+        return await run_ingest(self.qdrant_manager.add_segments, meeting_id, segments)
+
+    def stats(self) -> dict:
+        return {}
+
+
+async def post_meeting(client, meeting_id: str, count: int) -> list:
+    latencies = []
+    for seq in range(count):
+        start = time.perf_counter()
+        response = await client.post(f"/meetings/{meeting_id}/segments", json={
+            "text": f"meeting {meeting_id[-4:]} segment {seq} about the pricing roadmap",
+            "start_time": seq * 10.0, "end_time": seq * 10.0 + 9.5, "seq": seq,
+        })
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run(main, args, mode: str) -> dict:
+    manager = main.qdrant_manager
+    client_proxy = CountingClient(manager.client, args.upsert_latency)
+    manager.client = manager.collections.client = client_proxy
+    main.segment_batcher = Unbatched(manager) if mode == "unbatched" else SegmentBatcher(manager)
+    meeting_ids = [str(ObjectId()) for _ in range(args.meetings)]
+    for meeting_id in meeting_ids:
+        manager.create_collection(meeting_id)
+    embed_calls = manager.embed_fn.calls
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+        start = time.perf_counter()
+        runs = await asyncio.gather(*[post_meeting(client, meeting_id, args.segments) for meeting_id in meeting_ids])
+        elapsed = time.perf_counter() - start
+        upserts, embeds = client_proxy.upserts, manager.embed_fn.calls - embed_calls
+        # Retry everything; ids are derived from (meeting, seq), so counts must not change
+        await asyncio.gather(*[post_meeting(client, meeting_id, args.segments) for meeting_id in meeting_ids])
+
+    latencies = sorted(latency for latencies in runs for latency in latencies)
+    total = args.meetings * args.segments
+    stored = sum(manager.transcript_version(meeting_id) for meeting_id in meeting_ids)
+    manager.client = manager.collections.client = client_proxy._client
+    return {
+        "mode": mode,
+        "storage": args.storage,
+        "segments": total,
+        "seconds": round(elapsed, 2),
+        "segments_per_second": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p99_ms": round(latencies[int(0.99 * (len(latencies) - 1))] * 1000, 1),
+        "embed_calls": embeds,
+        "upserts": upserts,
+        "stored_after_retry": stored,
+        **({"batcher": main.segment_batcher.stats()} if mode == "batched" else {}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=20)
+    parser.add_argument("--segments", type=int, default=30)
+    parser.add_argument("--embed-latency", type=float, default=0.1)
+    parser.add_argument("--upsert-latency", type=float, default=0.01)
+    parser.add_argument("--storage", default="per_meeting", help="per_meeting or shared")
+    args = parser.parse_args()
+
+    results = []
+    for mode in ("unbatched", "batched"):
+        # The handlers print liberally
+        with contextlib.redirect_stdout(io.StringIO()):
+            app = install_fake_services(embed_latency=args.embed_latency, storage=args.storage)
+            results.append(asyncio.run(run(app, args, mode)))
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Stress test for point id allocation under concurrent writers.
+
+Several threads add transcript segments to the same collection while PDFs are
+ingested into it, mirroring a PDF upload during live transcription. Exits with
+status 1 if any point is lost or two segments share a time slot. Run from the
+backend directory:
+
+    python -m benchmarks.stress_point_ids --writers 8 --segments 200 --pdfs 4
+"""
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import FakeEmbedder, make_qdrant_manager, synthetic_lines
+from pdf_ingest import PdfIngestor
+
+COLLECTION = "stress"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--segments", type=int, default=200, help="segments per transcript writer")
+    parser.add_argument("--pdfs", type=int, default=4)
+    parser.add_argument("--pdf-lines", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.001)
+    args = parser.parse_args()
+
+    manager = make_qdrant_manager(FakeEmbedder(dimension=64, latency=args.latency))
+    manager.create_collection(COLLECTION, vector_size=64)
+    ingestor = PdfIngestor(manager, chunk_chars=200, embed_batch_size=16, upsert_batch_size=32)
+
+    def write_segments(writer):
+        for i in range(args.segments):
+            manager.add_text(COLLECTION, f"writer {writer} segment {i}")
+
+    def ingest_pdf(pdf):
+        lines = [f"{line} (pdf {pdf})" for line in synthetic_lines(args.pdf_lines)]
+        return ingestor.ingest(COLLECTION, lines, document_key=f"pdf-{pdf}").chunks
+
+    with ThreadPoolExecutor(max_workers=args.writers + args.pdfs) as pool:
+        segment_jobs = [pool.submit(write_segments, w) for w in range(args.writers)]
+        pdf_jobs = [pool.submit(ingest_pdf, p) for p in range(args.pdfs)]
+        for job in segment_jobs:
+            job.result()
+        pdf_chunks = sum(job.result() for job in pdf_jobs)
+
+    expected_segments = args.writers * args.segments
+    stored = manager.client.count(COLLECTION).count
+    transcriptions = manager.get_transcriptions(COLLECTION)
+    start_times = {t["start_time"] for t in transcriptions}
+
+    print(f"expected points: {expected_segments + pdf_chunks} "
+          f"({expected_segments} segments, {pdf_chunks} pdf chunks)")
+    print(f"stored points:   {stored}")
+    print(f"distinct segment start times: {len(start_times)}")
+
+    if stored != expected_segments + pdf_chunks or len(start_times) != expected_segments:
+        print("FAIL: points were lost or time slots were reused")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+Offline benchmark suite for the backend's hot paths.
+
+Drives the FastAPI app in process (httpx ASGI transport) with Mongo replaced
+by mongomock, Qdrant by the embedded in-memory client and Gemini by stubs
+with fixed latency, so it runs anywhere without keys or network. Data is
+built at realistic sizes first: hundreds of teams with meetings, one meeting
+with a long transcript, and a long PDF to upload. Then each scenario sends
+its requests and reports:
+
+- requests, errors, throughput and p50/p99/mean latency
+- calls to the external services: embed calls and texts, LLM calls, and
+  Qdrant client calls by method (Mongo calls aren't counted)
+- peak Python memory allocated during the scenario, from tracemalloc. PDF
+  text extraction runs in worker processes and isn't included. tracemalloc
+  slows Python code down, so only compare latencies between runs with the
+  same --no-tracemalloc setting.
+
+mongomock can't run the org tree aggregation, so that scenario is skipped
+unless --mongo-url points at a local Mongo server. The suite then works in a
+scratch database there and drops it afterwards.
+
+Results are written as JSON, by default to benchmarks/results/<commit>.json.
+--compare prints the change from an earlier results file. Run from the
+backend directory:
+
+    python -m benchmarks.suite                      # full sizes, ~10 minutes on one core
+    python -m benchmarks.suite --scale small        # quick check
+    python -m benchmarks.suite --mongo-url mongodb://localhost:27017
+    python -m benchmarks.suite --only chat,transcriptions --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from bson import ObjectId
+import httpx
+
+from benchmarks.concept_graph import StubGraphModel
+from benchmarks.fakes import FakeChatModel, FakeGenerativeModel, install_fake_services, synthetic_lines, synthetic_pdf
+
+SCALES = {
+    "small": {"segments": 1000, "pdf_pages": 50, "teams": 30, "meetings_per_team": 4, "requests": 20},
+    "full": {"segments": 10000, "pdf_pages": 500, "teams": 300, "meetings_per_team": 5, "requests": 50},
+}
+
+SCENARIOS = ("meeting", "team_meetings", "org_tree", "transcriptions", "chat", "segments", "upload_pdf",
+             "summary_cold", "summary_refresh", "conceptgraph_cold", "conceptgraph_cached")
+
+# Scenarios mongomock can't run, and why
+NEEDS_MONGO_SERVER = {"org_tree": "mongomock doesn't implement $lookup with a pipeline"}
+
+# Metrics compared by --compare, and whether higher is better
+COMPARED = {"p50_ms": False, "p99_ms": False, "requests_per_second": True, "embed_calls": False,
+            "llm_calls": False, "qdrant_calls": False, "peak_memory_mb": False}
+
+
+class CallCounter:
+    """Proxy that counts calls to a client's methods by name."""
+
+    def __init__(self, client):
+        self._client = client
+        self.calls = collections.Counter()
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self.calls[name] += 1
+            return attr(*args, **kwargs)
+        return call
+
+
+class Bench:
+    """The app with fakes installed, the data built for it and the call counters."""
+
+    def __init__(self, args):
+        self.args = args
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.main = install_fake_services(llm_latency=args.llm_latency, embed_latency=args.embed_latency,
+                                              bag_of_words=True, mongo_url=args.mongo_url,
+                                              mongo_database=f"bench_{ObjectId()}")
+        self.manager = self.main.qdrant_manager
+        self.embedder = self.manager.embed_fn
+        self.qdrant = CallCounter(self.manager.client)
+        self.manager.client = self.manager.collections.client = self.qdrant
+
+        # Concept graph prompts get a parseable graph, everything else a short answer
+        graph_model = StubGraphModel(0.0)
+        FakeGenerativeModel.respond = lambda prompt: graph_model(prompt) if '"nodes"' in prompt else (
+            f"Answer for a {len(prompt)} character prompt.")
+        from summarize import Summarizer
+        self.chat_model = FakeChatModel(latency=args.llm_latency)
+        self.main.summarizer = Summarizer(llm=self.chat_model, map_store=self.main.summary_map_store)
+
+        self.rng = random.Random(5)
+        self.teams, self.meetings = [], []
+        self.transcript = []
+        self.meeting_id = None
+        self.pdf = b""
+
+    def build(self):
+        """Org data in Mongo, the long transcript in Qdrant and the PDF to upload."""
+        db, args = self.main.db, self.args
+        departments = [str(db["departments"].insert_one({"name": f"Department {i}", "company_id": "bench"}).inserted_id)
+                       for i in range(max(1, args.teams // 20))]
+        for i in range(args.teams):
+            team_id = str(db["teams"].insert_one({
+                "name": f"Team {i}", "departmentId": departments[i % len(departments)],
+            }).inserted_id)
+            self.teams.append(team_id)
+            result = db["meetings"].insert_many([
+                {"title": f"Meeting {j} of team {i}", "teamId": team_id,
+                 "meeting_date": datetime.datetime(2024, 1, 1 + j % 28).isoformat()}
+                for j in range(args.meetings_per_team)
+            ])
+            self.meetings.extend(str(meeting_id) for meeting_id in result.inserted_ids)
+
+        self.meeting_id = self.meetings[0]
+        self.transcript = synthetic_lines(args.segments, words_per_line=20)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for start in range(0, len(self.transcript), 500):
+                self.manager.add_segments(self.meeting_id, [
+                    {"text": text, "start_time": (start + i) * 10.0, "end_time": (start + i) * 10.0 + 9.5, "seq": start + i}
+                    for i, text in enumerate(self.transcript[start:start + 500])
+                ])
+        self.pdf = synthetic_pdf(args.pdf_pages)
+
+    def counters(self) -> dict:
+        return {
+            "embed_calls": self.embedder.calls,
+            "embed_texts": self.embedder.texts,
+            "llm_calls": FakeGenerativeModel.calls + self.chat_model.calls,
+            "qdrant": collections.Counter(self.qdrant.calls),
+        }
+
+
+async def drive(requests: int, concurrency: int, one) -> tuple:
+    """Run `one(i)` for i in range(requests), `concurrency` at a time. Returns latencies and errors."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def timed(i):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await one(i)
+            except Exception as e:
+                errors.append(repr(e))
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(timed(i) for i in range(requests)))
+    return latencies, errors
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def check(response):
+    response.raise_for_status()
+    return response.json()
+
+
+async def wait_for_summary(client, meeting_id: str):
+    job = check(await client.get(f"/meetings/{meeting_id}/summary"))["job"]
+    while job["status"] not in ("done", "failed", "cancelled"):
+        await asyncio.sleep(0.02)
+        job = check(await client.get(f"/summary-jobs/{job['job_id']}"))
+    if job["status"] != "done":
+        raise RuntimeError(f"Summary job {job['status']}: {job['error']}")
+
+
+def scenarios(bench, client, requests: int) -> dict:
+    """Scenario name -> (requests, concurrency, one(i))."""
+    meeting_id, rng = bench.meeting_id, bench.rng
+    others = bench.meetings[1:]
+
+    async def meeting(i):
+        check(await client.get(f"/meetings/{rng.choice(bench.meetings)}"))
+
+    async def team_meetings(i):
+        check(await client.get(f"/teams/{rng.choice(bench.teams)}/meetings"))
+
+    async def org_tree(i):
+        check(await client.get("/org-tree"))
+
+    async def transcriptions(i):
+        result = check(await client.get(f"/meetings/{meeting_id}/transcriptions"))
+        if len(result["transcriptions"]) < len(bench.transcript):
+            raise RuntimeError(f"{len(result['transcriptions'])} of {len(bench.transcript)} segments")
+
+    async def chat(i):
+        # A different transcript line each time, so the answer cache doesn't answer
+        question = bench.transcript[(i * 7919) % len(bench.transcript)]
+        check(await client.post(f"/meetings/{meeting_id}/chat", json={"message": question}))
+
+    async def segments(i):
+        check(await client.post(f"/meetings/{others[i % len(others)]}/segments", json={
+            "text": f"live segment {i} about the launch plan", "start_time": i * 10.0, "end_time": i * 10.0 + 9.5,
+            "seq": i,
+        }))
+
+    async def upload_pdf(i):
+        result = check(await client.post(f"/meetings/{others[i]}/upload-pdf", files={
+            "file": (f"bench-{i}.pdf", bench.pdf, "application/pdf"),
+        }))
+        if not result["ingest"]:
+            raise RuntimeError("PDF text wasn't ingested")
+
+    async def summary_cold(i):
+        await wait_for_summary(client, meeting_id)
+
+    async def summary_refresh(i):
+        # A few new segments, then only their chunks are mapped again
+        check(await client.post(f"/meetings/{meeting_id}/segments", json=[
+            {"text": f"refresh {i} segment {j} on hiring", "start_time": 1e6 + i * 100 + j * 10,
+             "end_time": 1e6 + i * 100 + j * 10 + 9.5, "seq": len(bench.transcript) + i * 5 + j}
+            for j in range(5)
+        ]))
+        await wait_for_summary(client, meeting_id)
+
+    async def conceptgraph(i):
+        result = check(await client.get(f"/meetings/{meeting_id}/conceptgraph"))
+        if result["conceptgraph"].get("fallback") or not result["conceptgraph"]["nodes"]:
+            raise RuntimeError("Concept graph fell back")
+
+    return {
+        "meeting": (requests * 4, 8, meeting),
+        "team_meetings": (requests * 2, 8, team_meetings),
+        "org_tree": (max(5, requests // 5), 2, org_tree),
+        "transcriptions": (max(5, requests // 5), 2, transcriptions),
+        "chat": (requests, 8, chat),
+        "segments": (requests * 4, 16, segments),
+        "upload_pdf": (bench.args.pdf_uploads, 1, upload_pdf),
+        "summary_cold": (1, 1, summary_cold),
+        "summary_refresh": (3, 1, summary_refresh),
+        "conceptgraph_cold": (1, 1, conceptgraph),
+        "conceptgraph_cached": (requests, 8, conceptgraph),
+    }
+
+
+async def run_scenario(bench, name: str, count: int, concurrency: int, one, trace: bool) -> dict:
+    before = bench.counters()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        latencies, errors = await drive(count, concurrency, one)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    after = bench.counters()
+
+    qdrant_calls = after["qdrant"] - before["qdrant"]
+    return {
+        "requests": count,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(count / elapsed, 4),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "embed_calls": after["embed_calls"] - before["embed_calls"],
+        "embed_texts": after["embed_texts"] - before["embed_texts"],
+        "llm_calls": after["llm_calls"] - before["llm_calls"],
+        "qdrant_calls": sum(qdrant_calls.values()),
+        "qdrant_calls_by_method": dict(qdrant_calls.most_common()),
+        "peak_memory_mb": round(peak / 2**20, 2) if peak is not None else None,
+    }
+
+
+async def run(args) -> dict:
+    bench = Bench(args)
+    started = time.perf_counter()
+    bench.build()
+    print(f"Built data in {time.perf_counter() - started:.1f}s: {len(bench.teams)} teams, "
+          f"{len(bench.meetings)} meetings, {len(bench.transcript)} segments, {len(bench.pdf) // 1024} KB PDF",
+          file=sys.stderr)
+
+    results = {}
+    transport = httpx.ASGITransport(app=bench.main.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name, (count, concurrency, one) in scenarios(bench, client, args.requests).items():
+                if args.only and name not in args.only:
+                    continue
+                if name in NEEDS_MONGO_SERVER and not args.mongo_url:
+                    results[name] = {"skipped": NEEDS_MONGO_SERVER[name]}
+                    print(f"{name:20} skipped: {NEEDS_MONGO_SERVER[name]}", file=sys.stderr)
+                    continue
+                results[name] = await run_scenario(bench, name, count, concurrency, one, not args.no_tracemalloc)
+                result = results[name]
+                print(f"{name:20} {result['requests_per_second']:9.2f} req/s  p50 {result['p50_ms']:9.1f} ms  "
+                      f"p99 {result['p99_ms']:9.1f} ms  errors {result['errors']}", file=sys.stderr)
+    finally:
+        if args.mongo_url:
+            bench.main.db.client.drop_database(bench.main.db.name)
+    return results
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old: dict, new: dict):
+    """Print each compared metric's change from an earlier results file."""
+    print(f"Compared with {old.get('commit')} ({old.get('created')})")
+    for name, result in new["scenarios"].items():
+        previous = old.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if "skipped" in result or "skipped" in previous:
+            print(f"{name:20} skipped")
+            continue
+        changes = []
+        for metric, higher_is_better in COMPARED.items():
+            before, after = previous.get(metric), result.get(metric)
+            if before is None or after is None or before == after:
+                continue
+            change = (after - before) / before * 100 if before else float("inf")
+            better = (change > 0) == higher_is_better
+            changes.append(f"{metric} {before} -> {after} ({change:+.0f}%{'' if better else ' worse'})")
+        print(f"{name:20} " + ("; ".join(changes) or "unchanged"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="full")
+    parser.add_argument("--segments", type=int, help="transcript segments of the long meeting")
+    parser.add_argument("--pdf-pages", type=int)
+    parser.add_argument("--pdf-uploads", type=int, default=1)
+    parser.add_argument("--teams", type=int)
+    parser.add_argument("--meetings-per-team", type=int)
+    parser.add_argument("--requests", type=int, help="base request count, scaled per scenario")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per LLM call")
+    parser.add_argument("--embed-latency", type=float, default=0.02, help="seconds per embed call")
+    parser.add_argument("--mongo-url", help="local Mongo server to use instead of mongomock")
+    parser.add_argument("--only", type=lambda value: value.split(","), help=f"comma-separated: {','.join(SCENARIOS)}")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip peak memory, for undistorted latency")
+    parser.add_argument("--output", help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare with")
+    args = parser.parse_args()
+    for key, value in SCALES[args.scale].items():
+        if getattr(args, key) is None:
+            setattr(args, key, value)
+
+    scenario_results = asyncio.run(run(args))
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "scenarios": scenario_results,
+    }
+
+    output = args.output or os.path.join(os.path.dirname(__file__), "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
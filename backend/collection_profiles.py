@@ -0,0 +1,118 @@
+"""
+Qdrant collection profiles: vector storage, quantization, HNSW and search
+settings chosen together per deployment with QDRANT_PROFILE.
+
+- default: full float32 vectors and HNSW graph in RAM, as before.
+- balanced: int8 scalar quantization kept in RAM, originals on disk and
+  rescored, so about a quarter of the vector memory for a small recall cost.
+- low_memory: as balanced, but the graph and payload go to disk too, so only
+  the int8 vectors stay in RAM.
+- binary: 1-bit quantization, a 32nd of the vector memory. It needs heavy
+  oversampling to recover recall at 768 dimensions, so check it with
+  benchmarks.qdrant_profiles on real data before using it.
+- high_recall: a denser graph and a wider search beam, vectors in RAM.
+
+Profiles only take effect when a collection is created, or when applied to an
+existing one with `python -m db.apply_qdrant_profile`.
+"""
+from qdrant_client.http.models import (
+    BinaryQuantization, BinaryQuantizationConfig, CollectionParamsDiff, Disabled, Distance, HnswConfigDiff,
+    QuantizationSearchParams, ScalarQuantization, ScalarQuantizationConfig, ScalarType, SearchParams, VectorParams,
+    VectorParamsDiff,
+)
+
+
+class CollectionProfile:
+    def __init__(self, name: str, quantization: str = None, vectors_on_disk: bool = False,
+                 payload_on_disk: bool = None, hnsw_on_disk: bool = False, m: int = 16, ef_construct: int = 100,
+                 hnsw_ef: int = None, oversampling: float = None, rescore: bool = True):
+        self.name = name
+        self.quantization = quantization
+        self.vectors_on_disk = vectors_on_disk
+        self.payload_on_disk = payload_on_disk
+        self.hnsw_on_disk = hnsw_on_disk
+        self.m = m
+        self.ef_construct = ef_construct
+        self.hnsw_ef = hnsw_ef
+        self.oversampling = oversampling
+        self.rescore = rescore
+
+    def vectors_config(self, size: int) -> VectorParams:
+        return VectorParams(size=size, distance=Distance.COSINE, on_disk=self.vectors_on_disk or None)
+
+    def hnsw_config(self, **overrides) -> HnswConfigDiff:
+        settings = {"m": self.m, "ef_construct": self.ef_construct, "on_disk": self.hnsw_on_disk}
+        settings.update(overrides)
+        return HnswConfigDiff(**settings)
+
+    def quantization_config(self):
+        if self.quantization == "scalar":
+            return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True))
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        return None
+
+    def create_args(self, size: int, **hnsw_overrides) -> dict:
+        """Keyword arguments for client.create_collection."""
+        return {
+            "vectors_config": self.vectors_config(size),
+            "hnsw_config": self.hnsw_config(**hnsw_overrides),
+            "quantization_config": self.quantization_config(),
+            # None leaves the server's own default
+            "on_disk_payload": self.payload_on_disk,
+        }
+
+    def update_args(self, **hnsw_overrides) -> dict:
+        """Keyword arguments for client.update_collection, to move an existing collection to this profile."""
+        args = {
+            "vectors_config": {"": VectorParamsDiff(on_disk=self.vectors_on_disk)},
+            "hnsw_config": self.hnsw_config(**hnsw_overrides),
+            "quantization_config": self.quantization_config() or Disabled.DISABLED,
+        }
+        if self.payload_on_disk is not None:
+            args["collection_params"] = CollectionParamsDiff(on_disk_payload=self.payload_on_disk)
+        return args
+
+    def search_params(self):
+        """`search_params` for client.search, or None to use the server defaults."""
+        quantization = None
+        if self.quantization:
+            quantization = QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+        if self.hnsw_ef is None and quantization is None:
+            return None
+        return SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+    def estimate_memory(self, points: int, size: int) -> dict:
+        """
+        Rough RAM and disk use in bytes for `points` vectors of `size` floats,
+        following Qdrant's sizing guidance (payload and overheads not included).
+        """
+        vectors = points * size * 4
+        # Links on the base graph layer, two per neighbour, 4 bytes each
+        graph = points * self.m * 2 * 4
+        quantized = {"scalar": points * size, "binary": points * size // 8}.get(self.quantization, 0)
+        ram = quantized
+        ram += 0 if self.vectors_on_disk else vectors
+        ram += 0 if self.hnsw_on_disk else graph
+        return {"ram_bytes": ram, "disk_bytes": vectors + graph + quantized}
+
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        CollectionProfile("default"),
+        CollectionProfile("balanced", quantization="scalar", vectors_on_disk=True, hnsw_ef=128, oversampling=2.0),
+        CollectionProfile("low_memory", quantization="scalar", vectors_on_disk=True, payload_on_disk=True,
+                          hnsw_on_disk=True, hnsw_ef=128, oversampling=2.0),
+        CollectionProfile("binary", quantization="binary", vectors_on_disk=True, payload_on_disk=True,
+                          hnsw_ef=128, oversampling=10.0),
+        CollectionProfile("high_recall", m=32, ef_construct=256, hnsw_ef=256),
+    )
+}
+
+
+def get_profile(name: str = None) -> CollectionProfile:
+    name = name or "default"
+    if name not in PROFILES:
+        raise ValueError(f"Unknown Qdrant profile '{name}', expected one of {', '.join(PROFILES)}")
+    return PROFILES[name]
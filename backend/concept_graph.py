@@ -0,0 +1,326 @@
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import json
+import re
+import threading
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SegmentIndex:
+    """
+    Inverted token index over transcript segments.
+
+    `find` returns every segment containing a phrase that starts on a word
+    boundary. The phrase's tokens narrow the candidates through the index, with
+    the last token matched as a prefix (so "plan" finds "planning"), and only
+    the candidates are checked against the text.
+    """
+
+    def __init__(self, segments: list):
+        self.segments = segments
+        self._texts = [segment.get("text", "").lower() for segment in segments]
+        self._postings = {}
+        for i, text in enumerate(self._texts):
+            for token in set(tokenize(text)):
+                self._postings.setdefault(token, []).append(i)
+        self._tokens = sorted(self._postings)
+
+    def find(self, phrase: str) -> list:
+        tokens = tokenize(phrase)
+        if not tokens:
+            return []
+
+        candidates = None
+        for token in tokens[:-1]:
+            matches = set(self._postings.get(token, ()))
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+
+        prefix_matches = set()
+        start = bisect_left(self._tokens, tokens[-1])
+        for token in self._tokens[start:]:
+            if not token.startswith(tokens[-1]):
+                break
+            prefix_matches.update(self._postings[token])
+        candidates = prefix_matches if candidates is None else candidates & prefix_matches
+
+        pattern = re.compile(r"\b" + re.escape(phrase.lower().strip()))
+        return [self.segments[i] for i in sorted(candidates) if pattern.search(self._texts[i])]
+
+
+def link_segments(nodes: list, transcriptions: list):
+    """
+    Attach the transcript segments mentioning each node. `occurrences` lists
+    all of them; `start_time`, `end_time` and `text_snippet` describe the first.
+    """
+    index = SegmentIndex(transcriptions)
+    for node in nodes:
+        related_segments = index.find(str(node.get("text", "")))
+        if related_segments:
+            node["start_time"] = related_segments[0].get("start_time", 0)
+            node["end_time"] = related_segments[0].get("end_time", 0)
+            node["text_snippet"] = related_segments[0].get("text", "")[:100] + "..."
+            node["occurrences"] = [
+                {"start_time": segment.get("start_time", 0), "end_time": segment.get("end_time", 0)}
+                for segment in related_segments
+            ]
+
+
+class ConceptGraphCache:
+    """
+    Generated concept graphs keyed by meeting and transcript version (see
+    QdrantManager.transcript_revision). The latest graph per
+    meeting is kept in memory and, if a Mongo collection is given, persisted
+    so restarts don't trigger regeneration.
+    """
+
+    def __init__(self, collection=None):
+        self.collection = collection
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, meeting_id: str, version: str):
+        with self._lock:
+            entry = self._entries.get(meeting_id)
+        if entry is None and self.collection is not None:
+            doc = self.collection.find_one({"_id": meeting_id})
+            if doc:
+                # Graphs stored under older kinds of version don't match, and are rebuilt
+                entry = (doc.get("transcript_version"), doc["graph"])
+                with self._lock:
+                    self._entries[meeting_id] = entry
+
+        with self._lock:
+            if entry and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, meeting_id: str, version: str, graph: dict):
+        with self._lock:
+            self._entries[meeting_id] = (version, graph)
+        if self.collection is not None:
+            self.collection.update_one(
+                {"_id": meeting_id},
+                {"$set": {"transcript_version": version, "graph": graph,
+                          "created_at": datetime.datetime.now().isoformat()},
+                 "$unset": {"transcript_hash": ""}},
+                upsert=True,
+            )
+
+    def invalidate(self, meeting_id: str):
+        """Drop a meeting's graph, e.g. when its transcript is deleted and a new one is started."""
+        with self._lock:
+            self._entries.pop(meeting_id, None)
+        if self.collection is not None:
+            self.collection.delete_one({"_id": meeting_id})
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"meetings": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Characters of transcript sent to the model per window
+WINDOW_CHARS = 10000
+
+GRAPH_SCHEMA = """
+            Output the result as a JSON object with the following structure:
+            {
+                "nodes": [
+                {
+                    "id": "unique_id_1",
+                    "text": "concept_name",
+                    "type": "concept|topic|action",
+                    "importance": number from 1-10
+                },
+                ...
+                ],
+                "edges": [
+                {
+                    "source": "unique_id_of_source_node",
+                    "target": "unique_id_of_target_node",
+                    "type": "related|subTopic|implies",
+                    "strength": number from 1-10
+                },
+                ...
+                ]
+            }
+            
+            Ensure that:
+            - Each node has a unique ID (can be a simple number)
+            - Each edge connects existing nodes by their IDs
+            - Node types are one of: "concept", "topic", or "action"
+            - Edge types are one of: "related", "subTopic", or "implies"
+            - The graph is well-connected and represents the key relationships in the transcript
+            - Only return the JSON, with no additional explanation
+            """
+
+
+def transcript_prompt(transcript: str, node_count: int = 8) -> str:
+    return f"""
+            Analyze the following meeting transcript and extract key concepts and their relationships.
+            
+            TRANSCRIPT:
+            {transcript}
+            
+            Create a concept graph with the following structure:
+            1. Nodes: Identify {node_count} key concepts, topics, or entities from the transcript.
+            2. Edges: Identify relationships between these concepts.
+            {GRAPH_SCHEMA}"""
+
+
+def consolidation_prompt(graph: dict, node_count: int) -> str:
+    return f"""
+            The following concept graph was merged from graphs of consecutive parts of one long
+            meeting. "mentions" is how many parts a concept appeared in.
+            
+            MERGED GRAPH:
+            {json.dumps(graph)}
+            
+            Create a single concept graph for the whole meeting with the following structure:
+            1. Nodes: Keep the {node_count} most important concepts, combining ones that mean the same thing.
+            2. Edges: Keep the relationships between the remaining concepts.
+            {GRAPH_SCHEMA}"""
+
+
+def parse_graph(content: str) -> dict:
+    # Extract JSON from possible markdown or surrounding text
+    json_match = re.search(r'```(?:json)?(.*?)```', content, re.DOTALL)
+    if json_match:
+        json_str = json_match.group(1).strip()
+    else:
+        json_str = content
+
+    # Remove any non-JSON text before or after
+    json_str = re.sub(r'^[^{]*', '', json_str)
+    json_str = re.sub(r'[^}]*$', '', json_str)
+
+    concept_graph = json.loads(json_str)
+
+    # Ensure we have the expected structure
+    if 'nodes' not in concept_graph or 'edges' not in concept_graph:
+        raise ValueError("Invalid concept graph structure")
+    return concept_graph
+
+
+def split_windows(transcriptions: list, window_chars: int = WINDOW_CHARS) -> list:
+    """Group segment texts into windows of up to `window_chars`, breaking between segments."""
+    windows, current, size = [], [], 0
+    for segment in transcriptions:
+        text = segment.get("text", "")
+        if current and size + len(text) + 1 > window_chars:
+            windows.append("\n".join(current))
+            current, size = [], 0
+        current.append(text[:window_chars])
+        size += len(text) + 1
+    if current:
+        windows.append("\n".join(current))
+    return windows
+
+
+def normalize_concept(text: str) -> str:
+    tokens = tokenize(text)
+    # Cheap singularization so "Deadlines" and "deadline" merge
+    tokens = [token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith("ss") else token
+              for token in tokens]
+    return " ".join(tokens)
+
+
+def merge_graphs(graphs: list) -> dict:
+    """
+    Merge sub-graphs, deduplicating nodes by normalized text. A merged node
+    keeps its highest importance and counts the sub-graphs mentioning it; edges
+    between the same merged nodes have their strengths added, capped at 10.
+    """
+    nodes, edges = {}, {}
+    for graph in graphs:
+        local_ids = {}
+        for node in graph.get("nodes", []):
+            key = normalize_concept(str(node.get("text", "")))
+            if not key:
+                continue
+            local_ids[str(node.get("id"))] = key
+            merged = nodes.get(key)
+            if merged is None:
+                nodes[key] = {
+                    "id": str(len(nodes) + 1),
+                    "text": node.get("text", ""),
+                    "type": node.get("type", "concept"),
+                    "importance": node.get("importance", 5),
+                    "mentions": 1,
+                }
+            else:
+                merged["importance"] = max(merged["importance"], node.get("importance", 5))
+                merged["mentions"] += 1
+
+        for edge in graph.get("edges", []):
+            source = local_ids.get(str(edge.get("source")))
+            target = local_ids.get(str(edge.get("target")))
+            if not source or not target or source == target:
+                continue
+            key = (source, target, edge.get("type", "related"))
+            edges[key] = min(10, edges.get(key, 0) + edge.get("strength", 5))
+
+    return {
+        "nodes": list(nodes.values()),
+        "edges": [
+            {"source": nodes[source]["id"], "target": nodes[target]["id"], "type": edge_type, "strength": strength}
+            for (source, target, edge_type), strength in edges.items()
+        ],
+    }
+
+
+def top_nodes(graph: dict, node_count: int) -> dict:
+    """Keep the `node_count` most important, most mentioned nodes and their edges."""
+    nodes = sorted(graph["nodes"], key=lambda n: (n.get("importance", 5) * n.get("mentions", 1)), reverse=True)
+    nodes = nodes[:node_count]
+    kept = {node["id"] for node in nodes}
+    edges = [edge for edge in graph["edges"] if edge["source"] in kept and edge["target"] in kept]
+    return {"nodes": nodes, "edges": edges}
+
+
+def extract_concept_graph(transcriptions: list, generate, window_chars: int = WINDOW_CHARS,
+                          max_concurrency: int = 4, node_count: int = 8) -> dict:
+    """
+    Build a concept graph with `generate(prompt) -> str`.
+
+    Transcripts that fit in one window get a single pass. Longer ones are split
+    into windows whose sub-graphs are extracted concurrently (at most
+    `max_concurrency` at a time), merged, and consolidated by one final pass
+    over the merged graph, so wall-clock time grows with
+    windows / max_concurrency rather than with the whole transcript.
+    """
+    windows = split_windows(transcriptions, window_chars)
+    if len(windows) == 1:
+        return parse_graph(generate(transcript_prompt(windows[0], node_count)))
+
+    def window_graph(window):
+        try:
+            return parse_graph(generate(transcript_prompt(window, node_count)))
+        except Exception as e:
+            print(f"Error extracting concept graph for a transcript window: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        graphs = [graph for graph in pool.map(window_graph, windows) if graph]
+    if not graphs:
+        raise ValueError("No transcript window produced a concept graph")
+
+    merged = merge_graphs(graphs)
+    # Bound the final prompt no matter how long the meeting was
+    candidates = top_nodes(merged, node_count * 4)
+    try:
+        return parse_graph(generate(consolidation_prompt(candidates, node_count)))
+    except Exception as e:
+        print(f"Error consolidating concept graph, using merged graph: {e}")
+        return top_nodes(merged, node_count)
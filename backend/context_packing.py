@@ -0,0 +1,174 @@
+"""
+Packs chat search results into a prompt context under a token budget.
+
+Search returns up to 30 hits, and many of them are near copies: neighbouring
+transcript segments that repeat each other, or the same line appearing on
+several PDF pages. `ContextPacker` drops exact repeats, then picks hits by
+maximal marginal relevance (MMR) over the vectors Qdrant returns with them.
+It stops when the budget is used up, merges adjacent transcript segments into
+one time range, and orders the blocks by relevance.
+"""
+import re
+import threading
+
+import numpy as np
+
+# Rough Gemini tokens per character for English text, good enough for a budget
+CHARS_PER_TOKEN = 4
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_text(text: str) -> str:
+    return WHITESPACE.sub(" ", text).strip().lower()
+
+
+def is_pdf(result) -> bool:
+    return 'isPDF' in result.payload
+
+
+def render_result(result) -> str:
+    """A single hit in the prompt format chat has always used."""
+    if is_pdf(result):
+        return f"From PDF: {result.payload['text']}\n"
+    return f"From Transcription: {result.payload['start_time']} - {result.payload['end_time']}: {result.payload['text']}\n"
+
+
+class ContextPacker:
+    """
+    `token_budget` caps the packed context. `mmr_lambda` trades relevance (1.0)
+    against novelty (0.0). Hits whose cosine similarity to one already chosen
+    is at least `duplicate_threshold` are dropped. Transcript segments less
+    than `merge_gap` seconds apart are merged.
+    """
+
+    def __init__(self, token_budget: int = 2000, mmr_lambda: float = 0.7,
+                 duplicate_threshold: float = 0.95, merge_gap: float = 0.0):
+        self.token_budget = token_budget
+        self.mmr_lambda = mmr_lambda
+        self.duplicate_threshold = duplicate_threshold
+        self.merge_gap = merge_gap
+        self._lock = threading.Lock()
+        self._counts = {
+            "requests": 0, "candidates": 0, "selected": 0, "duplicates_dropped": 0,
+            "over_budget_dropped": 0, "segments_merged": 0,
+            "candidate_tokens": 0, "packed_tokens": 0,
+        }
+
+    def pack(self, results: list):
+        """
+        (selected results, context text). The selected results are in prompt
+        order, for citing; the text has one line per PDF hit or merged
+        transcript range.
+        """
+        unique, repeats = self._drop_repeats(results)
+        selected, near_duplicates, over_budget = self._select(unique)
+        blocks, merged = self._merge_segments(selected)
+
+        # Most relevant block first
+        blocks.sort(key=lambda block: -max(result.score for result in block))
+        text = "".join(self._render_block(block) for block in blocks)
+        ordered = [result for block in blocks for result in block]
+
+        with self._lock:
+            counts = self._counts
+            counts["requests"] += 1
+            counts["candidates"] += len(results)
+            counts["selected"] += len(ordered)
+            counts["duplicates_dropped"] += repeats + near_duplicates
+            counts["over_budget_dropped"] += over_budget
+            counts["segments_merged"] += merged
+            counts["candidate_tokens"] += sum(estimate_tokens(render_result(result)) for result in results)
+            counts["packed_tokens"] += estimate_tokens(text)
+        return ordered, text
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        saved = counts["candidate_tokens"] - counts["packed_tokens"]
+        return {
+            "token_budget": self.token_budget,
+            **counts,
+            "tokens_saved": saved,
+            "tokens_saved_ratio": saved / counts["candidate_tokens"] if counts["candidate_tokens"] else 0.0,
+        }
+
+    def _drop_repeats(self, results: list):
+        """Results with exact text repeats removed, keeping the best scored copy."""
+        seen = set()
+        unique = []
+        for result in sorted(results, key=lambda result: -result.score):
+            key = normalize_text(result.payload.get("text", ""))
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(result)
+        return unique, len(results) - len(unique)
+
+    def _select(self, candidates: list):
+        """MMR selection within the token budget. Returns (selected, near duplicates, over budget)."""
+        vectors = self._unit_vectors(candidates)
+        scores = np.array([result.score for result in candidates], dtype=np.float32)
+        costs = [estimate_tokens(render_result(result)) for result in candidates]
+
+        remaining = list(range(len(candidates)))
+        # Highest similarity of each candidate to anything selected so far
+        redundancy = np.zeros(len(candidates), dtype=np.float32)
+        selected = []
+        near_duplicates = over_budget = 0
+        budget = self.token_budget
+
+        while remaining:
+            mmr = self.mmr_lambda * scores[remaining] - (1 - self.mmr_lambda) * redundancy[remaining]
+            best = remaining.pop(int(np.argmax(mmr)))
+
+            if selected and redundancy[best] >= self.duplicate_threshold:
+                near_duplicates += 1
+                continue
+            if costs[best] > budget:
+                # A shorter hit further down may still fit
+                over_budget += 1
+                continue
+
+            selected.append(candidates[best])
+            budget -= costs[best]
+            if vectors is not None:
+                redundancy = np.maximum(redundancy, vectors @ vectors[best])
+        return selected, near_duplicates, over_budget
+
+    @staticmethod
+    def _unit_vectors(candidates: list):
+        # Without vectors (search run without with_vectors) MMR is plain relevance order
+        if not candidates or any(result.vector is None for result in candidates):
+            return None
+        vectors = np.array([result.vector for result in candidates], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def _merge_segments(self, selected: list):
+        """Blocks of results: each PDF hit alone, adjacent transcript segments together."""
+        blocks = [[result] for result in selected if is_pdf(result)]
+        segments = sorted((result for result in selected if not is_pdf(result)),
+                          key=lambda result: result.payload.get("start_time", 0))
+        merged = 0
+        for segment in segments:
+            previous = blocks[-1] if blocks and not is_pdf(blocks[-1][-1]) else None
+            if previous and segment.payload.get("start_time", 0) <= previous[-1].payload.get("end_time", 0) + self.merge_gap:
+                previous.append(segment)
+                merged += 1
+            else:
+                blocks.append([segment])
+        return blocks, merged
+
+    @staticmethod
+    def _render_block(block: list) -> str:
+        if len(block) == 1:
+            return render_result(block[0])
+        start = block[0].payload.get("start_time")
+        end = max(result.payload.get("end_time", 0) for result in block)
+        text = " ".join(result.payload["text"] for result in block)
+        return f"From Transcription: {start} - {end}: {text}\n"
@@ -0,0 +1,62 @@
+"""
+Apply the QDRANT_PROFILE collection profile to existing Qdrant collections.
+
+New collections get the profile when they're created; this moves the ones
+that already exist, e.g. to turn on quantization. Qdrant rebuilds indexes
+and moves vectors in the background, and the collections stay searchable
+while it does. Run from the backend directory:
+
+    QDRANT_PROFILE=balanced python -m db.apply_qdrant_profile [--dry-run] [--collection NAME ...]
+"""
+import argparse
+import os
+
+from bson import ObjectId
+from dotenv import load_dotenv
+
+from qdrant_layout import SHARED_COLLECTION
+from qdrant_manager import QdrantManager
+
+
+def apply(manager, names: list = None, dry_run: bool = False) -> dict:
+    counts = {"updated": 0, "failed": 0}
+    shared = getattr(manager.layout, "collection_name", None)
+    if not names:
+        names = [collection.name for collection in manager.client.get_collections().collections]
+        # Meeting collections and the shared collection, nothing else on the server
+        names = sorted(name for name in names if ObjectId.is_valid(name) or name == shared)
+
+    for name in names:
+        if dry_run:
+            print(f"Would apply profile '{manager.profile.name}' to {name}")
+            counts["updated"] += 1
+            continue
+        try:
+            manager.apply_profile(name)
+            counts["updated"] += 1
+            print(f"Applied profile '{manager.profile.name}' to {name}")
+        except Exception as e:
+            counts["failed"] += 1
+            print(f"Error applying profile to {name}: {e}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="list the collections that would be updated")
+    parser.add_argument("--collection", action="append", dest="collections", help="only this collection (repeatable)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    manager = QdrantManager(
+        qdrant_api_key=os.getenv('QDRANT_API_KEY'), google_api_key=os.getenv('GOOGLE_API_KEY'),
+        host=os.getenv('QDRANT_LINK'), port=6333,
+        storage=os.getenv('QDRANT_STORAGE', 'per_meeting'),
+        shared_collection=os.getenv('QDRANT_SHARED_COLLECTION', SHARED_COLLECTION),
+        profile=os.getenv('QDRANT_PROFILE'),
+    )
+    print(apply(manager, names=args.collections, dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
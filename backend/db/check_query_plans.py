@@ -0,0 +1,64 @@
+"""
+Fail if any read endpoint's query is planned as a collection scan.
+
+Runs explain() on every query in `db.indexes.HOT_QUERIES`, with its sort, and
+prints the winning plan's stages. Exits with status 1 if any plan contains a
+COLLSCAN or a blocking SORT, so it can gate a deploy or run after index
+changes. Needs a real MongoDB
+(MONGODB_URI). Run from the backend directory:
+
+    python -m db.check_query_plans [--ensure-indexes]
+"""
+import argparse
+import sys
+
+from db.mongo import db
+from db.indexes import HOT_QUERIES, ensure_indexes
+
+
+def plan_stages(plan: dict) -> list:
+    """Stage names of a query plan tree, root first."""
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    # Sharded clusters report one winning plan per shard
+    for shard in plan.get("shards", []):
+        stages += plan_stages(shard.get("winningPlan", {}))
+    return [stage for stage in stages if stage]
+
+
+def check(database) -> list:
+    """Names of the endpoints whose query plans scan a whole collection or sort in memory."""
+    regressions = []
+    for endpoint, collection_name, query, sort in HOT_QUERIES:
+        cursor = database[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        stages = plan_stages(cursor.explain()["queryPlanner"]["winningPlan"])
+        scans = "COLLSCAN" in stages or "SORT" in stages
+        if scans:
+            regressions.append(endpoint)
+        print(f"{'FAIL' if scans else 'ok  '}  {endpoint:40} {collection_name:15} {' <- '.join(stages)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ensure-indexes", action="store_true", help="create missing indexes first")
+    args = parser.parse_args()
+
+    if args.ensure_indexes:
+        ensure_indexes(db)
+
+    regressions = check(db)
+    if regressions:
+        print(f"{len(regressions)} queries use a collection scan or in-memory sort: {', '.join(regressions)}")
+        sys.exit(1)
+    print("All queries use an index")
+
+
+if __name__ == "__main__":
+    main()
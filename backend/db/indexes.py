@@ -0,0 +1,94 @@
+"""
+Index definitions for the biz_data collections, applied at startup.
+
+`INDEXES` lists every index the API's queries rely on. `HOT_QUERIES` holds the
+filter and sort each read endpoint sends, and `db.check_query_plans` uses them
+to make sure none of them falls back to a collection scan or an in-memory sort.
+"""
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+INDEXES = {
+    # List endpoints filter on the parent id; _id second keeps results in
+    # insertion order straight from the index
+    "departments": [
+        IndexModel([("company_id", ASCENDING), ("_id", ASCENDING)], name="company_id__id"),
+    ],
+    "teams": [
+        IndexModel([("departmentId", ASCENDING), ("_id", ASCENDING)], name="departmentId__id"),
+    ],
+    "meetings": [
+        IndexModel([("teamId", ASCENDING), ("_id", ASCENDING)], name="teamId__id"),
+    ],
+    "pdf_documents": [
+        IndexModel([("meeting_id", ASCENDING), ("_id", ASCENDING)], name="meeting_id__id"),
+    ],
+    "actions": [
+        IndexModel([("meeting_id", ASCENDING), ("_id", ASCENDING)], name="meeting_id__id"),
+    ],
+    # One summary per meeting, so saving a summary is a single upsert
+    "summaries": [
+        IndexModel([("meeting_id", ASCENDING)], name="meeting_id_unique", unique=True),
+    ],
+}
+
+# (endpoint, collection, filter, sort) for each read the API serves, with sample values.
+# List endpoints page by _id (see pagination.py), so their first and later pages are both here
+BY_ID = [("_id", ASCENDING)]
+AFTER = {"$gt": ObjectId("000000000000000000000000")}
+
+HOT_QUERIES = [
+    ("GET /departments", "departments", {"company_id": "67fa9eb53d8faa5288cf5a43"}, BY_ID),
+    ("GET /departments?after=", "departments", {"company_id": "67fa9eb53d8faa5288cf5a43", "_id": AFTER}, BY_ID),
+    ("GET /departments/{id}/teams", "teams", {"departmentId": "000000000000000000000000"}, BY_ID),
+    ("GET /departments/{id}/teams?after=", "teams", {"departmentId": "000000000000000000000000", "_id": AFTER}, BY_ID),
+    ("GET /teams/{id}/meetings", "meetings", {"teamId": "000000000000000000000000"}, BY_ID),
+    ("GET /teams/{id}/meetings?after=", "meetings", {"teamId": "000000000000000000000000", "_id": AFTER}, BY_ID),
+    ("GET /meetings/{id}/pdf-documents", "pdf_documents", {"meeting_id": "000000000000000000000000"}, BY_ID),
+    ("GET /meetings/{id}/pdf-documents?after=", "pdf_documents",
+     {"meeting_id": "000000000000000000000000", "_id": AFTER}, BY_ID),
+    ("GET /meetings/{id}/actions", "actions", {"meeting_id": "000000000000000000000000"}, BY_ID),
+    ("GET /meetings/{id}/actions?after=", "actions", {"meeting_id": "000000000000000000000000", "_id": AFTER}, BY_ID),
+    ("GET /summaries/{id}/fetch_summary", "summaries", {"meeting_id": "000000000000000000000000"}, None),
+]
+
+
+def dedupe_summaries(database) -> int:
+    """
+    Delete extra summaries of a meeting, which racing summarize runs could
+    insert before the unique index existed. Keeps the one the API has been
+    reading and updating since, i.e. the one find_one returns, which holds the
+    newest summary. Returns the number deleted.
+    """
+    collection = database["summaries"]
+    duplicates = collection.aggregate([
+        {"$group": {"_id": "$meeting_id", "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ])
+    deleted = 0
+    for group in duplicates:
+        kept = collection.find_one({"meeting_id": group["_id"]}, {"_id": 1})
+        deleted += collection.delete_many({"meeting_id": group["_id"], "_id": {"$ne": kept["_id"]}}).deleted_count
+    if deleted:
+        print(f"Deleted {deleted} duplicate summaries")
+    return deleted
+
+
+def ensure_indexes(database) -> dict:
+    """
+    Create any missing indexes. Returns the index names per collection.
+    Duplicate summaries are removed first so the unique index can be built. A
+    unique index that still can't be built raises, since writes rely on it; any
+    other index that fails is reported and skipped so the API still starts.
+    """
+    dedupe_summaries(database)
+    created = {}
+    for collection_name, indexes in INDEXES.items():
+        try:
+            created[collection_name] = database[collection_name].create_indexes(indexes)
+        except OperationFailure as e:
+            if any(index.document.get("unique") for index in indexes):
+                raise RuntimeError(f"Unique index on {collection_name} could not be created: {e}") from e
+            print(f"Error creating indexes on {collection_name}: {e}")
+    return created
@@ -0,0 +1,72 @@
+"""
+Move PDFs stored as base64 `file_content` in `pdf_documents` into GridFS.
+
+Each file is written under its document's id, then the document loses its
+`file_content` and gains `storage`, `size` and `sha256`. Documents are
+migrated one at a time and the script can be re-run after an interruption;
+the content endpoint serves unmigrated documents from base64 in the meantime.
+Run from the backend directory:
+
+    python -m db.migrate_pdf_gridfs [--dry-run] [--limit N]
+"""
+import argparse
+import base64
+import io
+
+from db.mongo import db
+from pdf_storage import PdfStorage
+
+
+def migrate(database, dry_run: bool = False, limit: int = 0) -> dict:
+    storage = PdfStorage(database)
+    documents = database["pdf_documents"]
+    counts = {"migrated": 0, "failed": 0, "bytes": 0}
+
+    # Only ids up front, so the base64 blobs are loaded one document at a time
+    pending = documents.find({"file_content": {"$exists": True}}, {"_id": 1}).limit(limit)
+    for document_id in [doc["_id"] for doc in pending]:
+        document = documents.find_one({"_id": document_id})
+        if not document or "file_content" not in document:
+            continue
+        try:
+            content = base64.b64decode(document["file_content"])
+            if dry_run:
+                print(f"Would migrate {document_id} ({len(content)} bytes)")
+                counts["migrated"] += 1
+                counts["bytes"] += len(content)
+                continue
+
+            # A previous run may have stopped between writing the file and updating the document
+            if storage.open(document_id) is not None:
+                storage.delete(document_id)
+            stored = storage.save(
+                document_id, io.BytesIO(content), document.get("filename", "document.pdf"),
+                {"meeting_id": document.get("meeting_id"),
+                 "content_type": document.get("content_type", "application/pdf")},
+            )
+            documents.update_one(
+                {"_id": document_id},
+                {"$set": {"storage": "gridfs", "size": stored["size"], "sha256": stored["sha256"]},
+                 "$unset": {"file_content": ""}},
+            )
+            counts["migrated"] += 1
+            counts["bytes"] += stored["size"]
+            print(f"Migrated {document_id} ({stored['size']} bytes)")
+        except Exception as e:
+            counts["failed"] += 1
+            print(f"Error migrating PDF document {document_id}: {e}")
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="list what would be migrated")
+    parser.add_argument("--limit", type=int, default=0, help="migrate at most N documents")
+    args = parser.parse_args()
+
+    print(migrate(db, dry_run=args.dry_run, limit=args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Copy per-meeting Qdrant collections into the shared collection.
+
+Every point keeps its vector and gains its meeting's tenant keys. Ids are
+made unique across meetings: legacy integer ids (0..n-1 in every meeting)
+become `point_id(meeting_id, "legacy", id)`, while UUIDs from point_id()
+already include the meeting and are kept. Ids are deterministic, so the copy
+can run while the API is serving and be re-run at any time: points already
+copied are overwritten with the same data. To switch layouts:
+
+1. Run the migration while the API still uses QDRANT_STORAGE=per_meeting.
+2. Restart the API with QDRANT_STORAGE=shared.
+3. Run the migration again, to copy points written between 1 and 2.
+4. Run it with --delete-source to drop the per-meeting collections. They
+   are only dropped after every meeting has been copied, and only if the
+   shared collection holds at least as many points for that meeting and
+   every one of the source's points is among them.
+
+Run from the backend directory:
+
+    python -m db.migrate_qdrant_shared [--dry-run] [--meeting ID ...] [--delete-source]
+"""
+import argparse
+import os
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from qdrant_client.http.models import PointStruct
+
+from qdrant_layout import PDF, SHARED_COLLECTION, TRANSCRIPT, TenantResolver, mongo_tenant_lookup
+from qdrant_manager import QdrantManager, point_id
+
+
+def meeting_collections(client, target: str, meeting_ids: list = None) -> list:
+    """Names of per-meeting collections, i.e. those named by a meeting id."""
+    names = [collection.name for collection in client.get_collections().collections]
+    names = [name for name in names if name != target and ObjectId.is_valid(name)]
+    if meeting_ids:
+        names = [name for name in names if name in meeting_ids]
+    return sorted(names)
+
+
+def shared_id(meeting_id: str, source_id):
+    """Id of a per-meeting point in the shared collection."""
+    if isinstance(source_id, int):
+        return point_id(meeting_id, "legacy", source_id)
+    return source_id
+
+
+def scroll_source(client, meeting_id: str, batch_size: int, with_vectors: bool = True):
+    """A per-meeting collection's points, `batch_size` at a time."""
+    next_offset = None
+    while True:
+        points, next_offset = client.scroll(
+            collection_name=meeting_id,
+            limit=batch_size,
+            with_payload=True,
+            with_vectors=with_vectors,
+            offset=next_offset,
+        )
+        if points:
+            yield points
+        if next_offset is None:
+            return
+
+
+def copy_meeting(manager, meeting_id: str, batch_size: int = 256) -> int:
+    client, layout = manager.client, manager.layout
+    copied = 0
+    for points in scroll_source(client, meeting_id, batch_size):
+        client.upsert(
+            collection_name=layout.collection_name,
+            points=[
+                PointStruct(
+                    id=shared_id(meeting_id, point.id),
+                    vector=point.vector,
+                    payload=layout.payload(
+                        meeting_id, PDF if 'isPDF' in point.payload else TRANSCRIPT, point.payload,
+                    ),
+                )
+                for point in points
+            ],
+            wait=True,
+        )
+        copied += len(points)
+    return copied
+
+
+def verify_meeting(manager, meeting_id: str, batch_size: int = 256) -> int:
+    """Number of the source's points that are in the shared collection under this meeting."""
+    client, layout = manager.client, manager.layout
+    found = 0
+    for points in scroll_source(client, meeting_id, batch_size, with_vectors=False):
+        copies = client.retrieve(layout.collection_name, ids=[shared_id(meeting_id, point.id) for point in points],
+                                 with_payload=["meeting_id"], with_vectors=False)
+        found += sum(1 for copy in copies if copy.payload.get("meeting_id") == meeting_id)
+    return found
+
+
+def migrate(manager, meeting_ids: list = None, batch_size: int = 256, dry_run: bool = False,
+            delete_source: bool = False) -> dict:
+    client, layout = manager.client, manager.layout
+    counts = {"meetings": 0, "points": 0, "failed": 0, "deleted": 0}
+    if not dry_run:
+        manager.ensure_shared_collection()
+
+    copied = []
+    for meeting_id in meeting_collections(client, layout.collection_name, meeting_ids):
+        source_count = client.count(meeting_id, exact=True).count
+        if dry_run:
+            print(f"Would copy {source_count} points of meeting {meeting_id}")
+            counts["meetings"] += 1
+            counts["points"] += source_count
+            continue
+
+        try:
+            points = copy_meeting(manager, meeting_id, batch_size)
+            counts["meetings"] += 1
+            counts["points"] += points
+            copied.append(meeting_id)
+            print(f"Copied {points} points of meeting {meeting_id}")
+        except Exception as e:
+            counts["failed"] += 1
+            print(f"Error migrating meeting {meeting_id}: {e}")
+
+    # Only once every meeting is copied, so each check sees the final shared collection
+    if delete_source:
+        for meeting_id in copied:
+            try:
+                source_count = client.count(meeting_id, exact=True).count
+                target_count = manager.points_version(meeting_id)
+                found = verify_meeting(manager, meeting_id, batch_size) if target_count >= source_count else 0
+                if found < source_count:
+                    print(f"Kept collection {meeting_id}: {target_count} points and {found} of its {source_count} "
+                          f"in the shared collection")
+                    continue
+                client.delete_collection(meeting_id)
+                manager.collections.invalidate(meeting_id)
+                counts["deleted"] += 1
+                print(f"Deleted collection {meeting_id}")
+            except Exception as e:
+                counts["failed"] += 1
+                print(f"Error deleting collection {meeting_id}: {e}")
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="list what would be copied")
+    parser.add_argument("--meeting", action="append", dest="meetings", help="only this meeting (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--delete-source", action="store_true",
+                        help="drop each per-meeting collection once the shared collection has its points")
+    args = parser.parse_args()
+
+    load_dotenv()
+    from db.mongo import db
+
+    manager = QdrantManager(
+        qdrant_api_key=os.getenv('QDRANT_API_KEY'), google_api_key=os.getenv('GOOGLE_API_KEY'),
+        host=os.getenv('QDRANT_LINK'), port=6333,
+        storage="shared",
+        tenant_resolver=TenantResolver(mongo_tenant_lookup(db)),
+        shared_collection=os.getenv('QDRANT_SHARED_COLLECTION', SHARED_COLLECTION),
+        profile=os.getenv('QDRANT_PROFILE'),
+    )
+    print(migrate(manager, meeting_ids=args.meetings, batch_size=args.batch_size, dry_run=args.dry_run,
+                  delete_source=args.delete_source))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+from array import array
+from collections import OrderedDict
+import hashlib
+import sqlite3
+import threading
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache.
+
+    Entries are keyed by a hash of the model name and the text. The in-memory
+    tier is an LRU bounded to `max_entries`; if `path` is given, embeddings are
+    also written to a sqlite file so they survive restarts. Vectors are held as
+    float32 arrays, which is a fraction of the size of a list of Python floats.
+    """
+
+    def __init__(self, model: str, max_entries: int = 10000, path: str = None):
+        self.model = model
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+            self._db.commit()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: list) -> list:
+        """Return the cached embedding for each text, or None where there is none."""
+        keys = [self.key(text) for text in texts]
+        results = [None] * len(texts)
+        disk_lookups = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    results[i] = vector.tolist()
+                    self.memory_hits += 1
+                else:
+                    disk_lookups.setdefault(key, []).append(i)
+
+            if disk_lookups and self._db is not None:
+                for key, blob in self._read_disk(list(disk_lookups)):
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    self._remember(key, vector)
+                    for i in disk_lookups.pop(key):
+                        results[i] = vector.tolist()
+                        self.disk_hits += 1
+
+            self.misses += sum(len(indexes) for indexes in disk_lookups.values())
+
+        return results
+
+    def put_many(self, texts: list, embeddings: list):
+        rows = []
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                key = self.key(text)
+                vector = array("f", embedding)
+                self._remember(key, vector)
+                rows.append((key, vector.tobytes()))
+
+            if self._db is not None and rows:
+                self._db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+                self._db.commit()
+
+    def wrap(self, embed_fn):
+        """Return an embed function that only calls `embed_fn` for uncached texts."""
+        def cached_embed(texts: list) -> list:
+            embeddings = self.get_many(texts)
+
+            # Embed each distinct missing text once, even if repeated in the batch
+            missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+            if missing:
+                fresh = dict(zip(missing, embed_fn(missing)))
+                self.put_many(list(fresh), list(fresh.values()))
+                embeddings = [fresh[text] if embedding is None else embedding
+                              for text, embedding in zip(texts, embeddings)]
+
+            return embeddings
+
+        return cached_embed
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "model": self.model,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self._db is not None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def _remember(self, key, vector):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, keys):
+        rows = []
+        # Stay under sqlite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows.extend(self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            ).fetchall())
+        return rows
@@ -0,0 +1,189 @@
+"""
+Embedding providers behind one interface.
+
+An `Embedder` is called with a list of texts and returns one vector per text,
+splitting the list into batches of at most `max_batch`. It also keeps
+per-provider latency and throughput counters. Providers:
+
+- gemini: the Gemini embedding API (remote, the default).
+- local: a sentence-transformers model run on the CPU in this process (needs
+  the optional `sentence-transformers` package, and `onnxruntime` for the onnx
+  backend). Works offline.
+- hashing: feature hashing of words and word pairs. Deterministic and free,
+  for tests and benchmarks; similar only in vocabulary, not in meaning.
+
+Vectors from different providers (or dimensions) aren't comparable, so
+collections must be re-embedded when switching.
+"""
+import abc
+from collections import deque
+import hashlib
+import re
+import threading
+import time
+
+import numpy as np
+
+GEMINI_MODEL = "models/text-embedding-004"
+LOCAL_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class Embedder(abc.ABC):
+    provider = "embedder"
+    # Identifies the vector space, e.g. as the embedding cache key
+    name = "embedder"
+    dimension = 768
+    # Largest number of texts sent to the backend at once
+    max_batch = 100
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self._counts = {"calls": 0, "batches": 0, "texts": 0, "errors": 0}
+        self._seconds = 0.0
+        # Recent batch latencies, for percentiles
+        self._latencies = deque(maxlen=1000)
+
+    def __call__(self, texts: list) -> list:
+        return self.embed(texts)
+
+    def embed(self, texts: list) -> list:
+        texts = list(texts)
+        with self._stats_lock:
+            self._counts["calls"] += 1
+        embeddings = []
+        for i in range(0, len(texts), self.max_batch):
+            batch = texts[i:i + self.max_batch]
+            start = time.perf_counter()
+            try:
+                vectors = self._embed_batch(batch)
+            except Exception:
+                with self._stats_lock:
+                    self._counts["errors"] += 1
+                raise
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self._counts["batches"] += 1
+                self._counts["texts"] += len(batch)
+                self._seconds += elapsed
+                self._latencies.append(elapsed)
+            embeddings.extend(vectors)
+        return embeddings
+
+    def embed_one(self, text: str) -> list:
+        return self.embed([text])[0]
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            counts = dict(self._counts)
+            seconds = self._seconds
+
+        def percentile(q):
+            return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 2) if latencies else None
+
+        return {
+            "provider": self.provider,
+            "name": self.name,
+            "dimension": self.dimension,
+            **counts,
+            "seconds": round(seconds, 3),
+            "texts_per_second": round(counts["texts"] / seconds, 1) if seconds else None,
+            "batch_p50_ms": percentile(0.5),
+            "batch_p99_ms": percentile(0.99),
+        }
+
+    @abc.abstractmethod
+    def _embed_batch(self, texts: list) -> list:
+        """One vector per text, for at most `max_batch` texts."""
+
+
+class GeminiEmbedder(Embedder):
+    provider = "gemini"
+    # Gemini rejects batch embedding requests with more than 100 texts
+    max_batch = 100
+
+    def __init__(self, model: str = GEMINI_MODEL, dimension: int = 768):
+        super().__init__()
+        self.model = model
+        self.dimension = dimension
+        # The bare model name at full size, so existing embedding caches stay valid
+        self.name = model if dimension == 768 else f"{model}/{dimension}"
+
+    def _embed_batch(self, texts: list) -> list:
+        import google.generativeai as genai
+        kwargs = {}
+        if self.dimension != 768:
+            # text-embedding-004 can return shorter (truncated) vectors
+            kwargs["output_dimensionality"] = self.dimension
+        return genai.embed_content(model=self.model, content=texts, **kwargs)['embedding']
+
+
+class LocalEmbedder(Embedder):
+    """
+    sentence-transformers model on the CPU. One batch runs at a time and uses
+    `threads` cores, instead of concurrent batches competing for them.
+    """
+
+    provider = "local"
+    max_batch = 256
+
+    def __init__(self, model: str = LOCAL_MODEL, batch_size: int = 64, threads: int = None, backend: str = "torch",
+                 dimension: int = None):
+        super().__init__()
+        # Optional dependency, only needed for the local provider
+        from sentence_transformers import SentenceTransformer
+        if threads and backend == "torch":
+            import torch
+            torch.set_num_threads(threads)
+
+        # With `dimension`, vectors are truncated to it (meaningful for Matryoshka-trained models)
+        self.model = SentenceTransformer(model, device="cpu", backend=backend, truncate_dim=dimension)
+        self.batch_size = batch_size
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        if dimension and self.dimension != dimension:
+            raise ValueError(f"Model '{model}' makes {self.dimension}-dimensional vectors, "
+                             f"it can't make {dimension}-dimensional ones")
+        self.name = f"local/{model}/{backend}/{self.dimension}"
+        self._lock = threading.Lock()
+
+    def _embed_batch(self, texts: list) -> list:
+        with self._lock:
+            vectors = self.model.encode(texts, batch_size=self.batch_size, normalize_embeddings=True,
+                                        convert_to_numpy=True, show_progress_bar=False)
+        return vectors.tolist()
+
+
+class HashingEmbedder(Embedder):
+    provider = "hashing"
+    max_batch = 1000
+
+    def __init__(self, dimension: int = 768):
+        super().__init__()
+        self.dimension = dimension
+        self.name = f"hashing/{dimension}"
+
+    def _embed_batch(self, texts: list) -> list:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = TOKEN_PATTERN.findall(text.lower())
+            # Words, plus adjacent pairs for a little word order
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features or [""]:
+                digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                vectors[row, digest % self.dimension] += 1.0 if digest >> 63 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.where(norms == 0, 1, norms)).tolist()
+
+
+def make_embedder(provider: str = "gemini", dimension: int = None, model: str = None, threads: int = None,
+                  backend: str = "torch") -> Embedder:
+    """Embedder for an EMBEDDING_PROVIDER name."""
+    if provider == "gemini":
+        return GeminiEmbedder(model or GEMINI_MODEL, dimension or 768)
+    if provider == "local":
+        return LocalEmbedder(model or LOCAL_MODEL, threads=threads, backend=backend, dimension=dimension)
+    if provider == "hashing":
+        return HashingEmbedder(dimension or 768)
+    raise ValueError(f"Unknown embedding provider '{provider}', expected gemini, local or hashing")
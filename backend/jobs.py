@@ -0,0 +1,189 @@
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import statistics
+import threading
+import time
+import uuid
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, meeting_id: str, transcript_version):
+        self.id = uuid.uuid4().hex
+        self.meeting_id = meeting_id
+        self.transcript_version = transcript_version
+        self.status = "queued"
+        self.stage = "queued"
+        self.progress = 0.0
+        self.error = None
+        self.superseded_by = None
+        self.created_at = datetime.datetime.now().isoformat()
+        # Orders a meeting's jobs, newest highest, also across worker processes
+        self.generation = time.time_ns()
+        self.started_at = None
+        self.finished_at = None
+        self._cancelled = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    def set_stage(self, stage: str, progress: float):
+        """Record progress and stop here if the job has been cancelled."""
+        self.check_cancelled()
+        self.stage = stage
+        self.progress = progress
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def cancel(self, superseded_by: str = None):
+        self.superseded_by = superseded_by
+        self._cancelled.set()
+
+    def as_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "meeting_id": self.meeting_id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "transcript_version": self.transcript_version,
+            "error": self.error,
+            "superseded_by": self.superseded_by,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class SummaryScheduler:
+    """
+    Runs summary jobs on a bounded worker pool.
+
+    Requests for a meeting whose transcript hasn't changed since the last job
+    get that job back (queued, running or done) instead of starting another
+    run. When the transcript has changed, the meeting's unfinished job is
+    cancelled and superseded by a new one. `run_fn(job)` does the work and
+    should call `job.set_stage` between steps so cancellation takes effect.
+
+    A meeting's latest job is kept while it is queued or running, and once
+    finished for `finished_ttl` seconds, at most `history` of them.
+    """
+
+    def __init__(self, run_fn, version_fn, max_workers: int = 2, history: int = 500, finished_ttl: float = 3600):
+        self.run_fn = run_fn
+        self.version_fn = version_fn
+        self.max_workers = max_workers
+        self.finished_ttl = finished_ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="summary-worker")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._latest = {}
+        # Latest jobs not finished yet, which stats counts, and the finished
+        # ones by meeting in the order they finished, for eviction
+        self._active = {}
+        self._finished = OrderedDict()
+        self._history = deque(maxlen=history)
+        self._run_times = deque(maxlen=100)
+        self._counts = {"done": 0, "failed": 0, "cancelled": 0, "coalesced": 0}
+
+    def submit(self, meeting_id: str) -> Job:
+        try:
+            version = self.version_fn(meeting_id)
+        except Exception:
+            version = None
+
+        with self._lock:
+            self._evict()
+            latest = self._latest.get(meeting_id)
+            if latest and latest.transcript_version == version and latest.status != "failed" \
+                    and not latest._cancelled.is_set():
+                self._counts["coalesced"] += 1
+                return latest
+
+            job = Job(meeting_id, version)
+            if latest and not latest.finished:
+                latest.cancel(superseded_by=job.id)
+
+            self._remember(job)
+            self._latest[meeting_id] = job
+            self._active[meeting_id] = job
+            self._finished.pop(meeting_id, None)
+
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def latest(self, meeting_id: str):
+        with self._lock:
+            self._evict()
+            return self._latest.get(meeting_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._evict()
+            queued = sum(job.status == "queued" for job in self._active.values())
+            running = sum(job.status == "running" for job in self._active.values())
+            run_times = list(self._run_times)
+
+        return {
+            "workers": self.max_workers,
+            "queue_depth": queued,
+            "running": running,
+            "tracked_meetings": len(self._latest),
+            **self._counts,
+            "run_seconds_p50": statistics.median(run_times) if run_times else None,
+            "run_seconds_max": max(run_times) if run_times else None,
+        }
+
+    def _evict(self):
+        # Called with the lock held
+        expire_before = time.monotonic() - self.finished_ttl
+        while self._finished:
+            meeting_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > expire_before and len(self._finished) <= self._history.maxlen:
+                break
+            del self._finished[meeting_id]
+            del self._latest[meeting_id]
+
+    def _remember(self, job: Job):
+        # Keep a bounded history of jobs for the status endpoint
+        if len(self._history) == self._history.maxlen:
+            self._jobs.pop(self._history[0].id, None)
+        self._history.append(job)
+        self._jobs[job.id] = job
+
+    def _run(self, job: Job):
+        start = time.perf_counter()
+        try:
+            job.check_cancelled()
+            job.status = "running"
+            job.started_at = datetime.datetime.now().isoformat()
+            self.run_fn(job)
+            job.status = "done"
+            job.stage = "done"
+            job.progress = 1.0
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            print(f"Summary job {job.id} for meeting {job.meeting_id} failed: {e}")
+        finally:
+            job.finished_at = datetime.datetime.now().isoformat()
+            with self._lock:
+                self._counts[job.status] += 1
+                if job.started_at:
+                    self._run_times.append(time.perf_counter() - start)
+                if self._active.get(job.meeting_id) is job:
+                    del self._active[job.meeting_id]
+                    self._finished[job.meeting_id] = time.monotonic()
+                    self._evict()
@@ -0,0 +1,181 @@
+import asyncio
+import os
+
+from offload import run_qdrant
+
+# How often a meeting's watcher checks Qdrant for new segments
+POLL_SECONDS = float(os.getenv("TRANSCRIPT_POLL_SECONDS", 2.0))
+
+# Polls re-read this many seconds before the newest segment seen, to catch
+# segments that were written late (e.g. chunks transcribed out of order)
+LATE_SECONDS = float(os.getenv("TRANSCRIPT_LATE_SECONDS", 60.0))
+
+# Idle SSE connections get a comment line this often so proxies keep them open
+HEARTBEAT_SECONDS = 15.0
+
+
+class _Channel:
+    def __init__(self):
+        self.subscribers = set()
+        self.segments = []
+        self.seen_ids = set()
+        self.last_start_time = None
+        # Bumped by reset, so a poll that was already running when the transcript was deleted is dropped
+        self.generation = 0
+        self.loaded = asyncio.Event()
+        self.task = None
+
+
+class Subscription:
+    def __init__(self, feed, meeting_id, channel):
+        self.feed = feed
+        self.meeting_id = meeting_id
+        self.channel = channel
+        self.queue = asyncio.Queue()
+        # Taken now so that segments queued after joining aren't also in it
+        self._snapshot = list(channel.segments) if channel.loaded.is_set() else None
+
+    async def snapshot(self) -> list:
+        """Segments the meeting already had when this viewer joined."""
+        if self._snapshot is None:
+            await self.channel.loaded.wait()
+        return self._snapshot
+
+    async def next(self, timeout: float = None) -> tuple:
+        """
+        Wait for the next event: ("segments", new segments), or ("reset", [])
+        when the transcript was deleted and everything shown so far should be
+        dropped. Returns (None, []) after `timeout` seconds.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None, []
+
+    def close(self):
+        self.feed._unsubscribe(self)
+
+
+class TranscriptFeed:
+    """
+    Per-meeting fan-out of newly ingested transcript segments.
+
+    A meeting with at least one viewer has a single watcher task that reads only
+    recent segments (from `late_seconds` before the newest one it has seen)
+    and pushes those it hasn't delivered yet to every viewer. Segments are
+    delivered once each, by point id. A segment written later still, with an
+    older start time, is noticed by the meeting's segment count exceeding the
+    number delivered, and found by one full read. The transcript so far is
+    kept in memory, so viewers who join later get it without another scan.
+    Server work grows with new data, not with the number of viewers, and the
+    watcher stops when the last viewer leaves.
+    """
+
+    def __init__(self, qdrant_manager, poll_seconds: float = POLL_SECONDS, late_seconds: float = LATE_SECONDS):
+        self.qdrant_manager = qdrant_manager
+        self.poll_seconds = poll_seconds
+        self.late_seconds = late_seconds
+        self._channels = {}
+
+    def subscribe(self, meeting_id: str) -> Subscription:
+        channel = self._channels.get(meeting_id)
+        if channel is None:
+            channel = self._channels[meeting_id] = _Channel()
+            channel.task = asyncio.create_task(self._watch(meeting_id, channel))
+
+        subscription = Subscription(self, meeting_id, channel)
+        channel.subscribers.add(subscription)
+        return subscription
+
+    def publish(self, meeting_id: str, segments: list):
+        """
+        Push segments this process just wrote to the meeting's viewers now,
+        rather than at the watcher's next poll.
+        """
+        channel = self._channels.get(meeting_id)
+        if channel is not None and channel.loaded.is_set():
+            # Segments from other writers may still be older than these, so
+            # the watcher keeps reading from where its own polls got to
+            self._append(channel, segments, advance=False)
+
+    def reset(self, meeting_id: str):
+        """
+        Drop a meeting's transcript after it was deleted: viewers are told to
+        clear theirs, later viewers get an empty snapshot, and a new transcript
+        is sent in full even though it reuses the old segment ids.
+        """
+        channel = self._channels.get(meeting_id)
+        if channel is None:
+            return
+        channel.generation += 1
+        channel.segments = []
+        channel.seen_ids.clear()
+        channel.last_start_time = None
+        if channel.loaded.is_set():
+            for subscriber in channel.subscribers:
+                subscriber.queue.put_nowait(("reset", []))
+
+    def stats(self) -> dict:
+        return {
+            "meetings": len(self._channels),
+            "viewers": sum(len(channel.subscribers) for channel in self._channels.values()),
+        }
+
+    def _unsubscribe(self, subscription):
+        channel = subscription.channel
+        channel.subscribers.discard(subscription)
+        if not channel.subscribers and self._channels.get(subscription.meeting_id) is channel:
+            channel.task.cancel()
+            del self._channels[subscription.meeting_id]
+
+    async def _watch(self, meeting_id: str, channel: _Channel):
+        while True:
+            generation = channel.generation
+            try:
+                # Counted first, so segments written during the read below don't trigger a full read
+                count = await run_qdrant(self.qdrant_manager.transcript_version, meeting_id)
+                read_from = None
+                if channel.last_start_time is not None:
+                    read_from = max(0, channel.last_start_time - self.late_seconds)
+                segments = await run_qdrant(self.qdrant_manager.get_transcriptions, meeting_id,
+                                            start_time_from=read_from)
+                if generation != channel.generation:
+                    continue
+                self._append(channel, segments)
+
+                if count > len(channel.seen_ids):
+                    # Some arrived later than late_seconds allows for
+                    segments = await run_qdrant(self.qdrant_manager.get_transcriptions, meeting_id)
+                    if generation != channel.generation:
+                        continue
+                    self._append(channel, segments)
+            except Exception as e:
+                # The collection may not exist until transcription starts
+                print(f"Error polling transcriptions for meeting {meeting_id}: {e}")
+
+            if not channel.loaded.is_set():
+                for subscriber in channel.subscribers:
+                    subscriber._snapshot = list(channel.segments)
+                channel.loaded.set()
+            await asyncio.sleep(self.poll_seconds)
+
+    def _append(self, channel: _Channel, segments: list, advance: bool = True):
+        # Reads overlap what was already delivered, so skip repeats
+        new_segments = [segment for segment in segments if segment["id"] not in channel.seen_ids]
+        if not new_segments:
+            return
+
+        channel.seen_ids.update(segment["id"] for segment in new_segments)
+        out_of_order = channel.segments and new_segments[0]["start_time"] < channel.segments[-1]["start_time"]
+        channel.segments.extend(new_segments)
+        if out_of_order:
+            # Keep the snapshot for later viewers in transcript order
+            channel.segments.sort(key=lambda segment: segment["start_time"])
+        if advance:
+            channel.last_start_time = max(channel.last_start_time or 0,
+                                          max(segment["start_time"] for segment in new_segments))
+
+        # Viewers that haven't taken their snapshot yet will get these in it
+        if channel.loaded.is_set():
+            for subscriber in channel.subscribers:
+                subscriber.queue.put_nowait(("segments", new_segments))
@@ -0,0 +1,263 @@
+"""
+Process-wide access to Gemini text generation.
+
+Every generation call in the backend (chat, concept graphs, summaries, action
+items) goes through the shared `gateway`, so they draw on one rate budget
+instead of each caller limiting itself, or not at all.
+"""
+from contextlib import contextmanager
+import heapq
+import itertools
+import os
+import queue
+import threading
+import time
+from typing import Any
+
+import google.generativeai as genai
+from langchain_core.language_models.chat_models import BaseChatModel
+
+# Priority lanes, lower goes first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+LANES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# How often a stream waiting for its next chunk checks whether it was cancelled
+CANCEL_POLL_SECONDS = 0.1
+
+
+def is_quota_error(error: Exception) -> bool:
+    # google.api_core raises ResourceExhausted, LangChain wraps it in its own error
+    text = f"{type(error).__name__} {error}"
+    return "ResourceExhausted" in text or "429" in text or "quota" in text.lower()
+
+
+class LLMGateway:
+    """
+    Token bucket, concurrency cap and priority lanes shared by all LLM callers.
+
+    A call needs a token from the bucket (refilled at `requests_per_second`, up
+    to `burst`) and one of `max_concurrency` slots. Waiting callers are served
+    in priority order, so interactive requests overtake queued background work.
+    Quota errors empty the bucket and are retried with backoff.
+    """
+
+    def __init__(self, requests_per_second: float = 5.0, burst: int = 10, max_concurrency: int = 8,
+                 max_retries: int = 3, backoff_seconds: float = 2.0):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._active = 0
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._models = {}
+
+        self._counts = {name: {"requests": 0, "wait_seconds": 0.0} for name in LANES.values()}
+        self._quota_errors = 0
+
+    @contextmanager
+    def slot(self, priority: int = INTERACTIVE):
+        """Hold a rate-limited concurrency slot for the duration of the block."""
+        self._acquire(priority)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def call(self, fn, priority: int = INTERACTIVE):
+        """Run `fn` inside a slot, retrying quota errors."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.slot(priority):
+                    return fn()
+            except Exception as e:
+                if not is_quota_error(e) or attempt == self.max_retries:
+                    raise
+                with self._cond:
+                    self._quota_errors += 1
+                    self._tokens = 0.0
+                time.sleep(self.backoff_seconds * 2 ** attempt)
+
+    def generate(self, prompt, model_name: str = "gemini-1.5-flash", priority: int = INTERACTIVE, **kwargs):
+        model = self.model(model_name)
+        return self.call(lambda: model.generate_content(prompt, **kwargs), priority)
+
+    def stream(self, prompt, model_name: str = "gemini-1.5-flash", priority: int = INTERACTIVE, cancel=None, **kwargs):
+        """
+        Yield text chunks of a streamed generation while holding one slot.
+        Quota errors are retried until the first chunk arrives. Setting the
+        `cancel` event, even while waiting for a chunk, or closing this
+        generator cancels the upstream request and frees the slot.
+        """
+        model = self.model(model_name)
+        for attempt in range(self.max_retries + 1):
+            started = False
+            try:
+                with self.slot(priority):
+                    response = model.generate_content(prompt, stream=True, **kwargs)
+                    chunks = _StreamReader(response) if cancel is not None else None
+                    try:
+                        for chunk in chunks.read(cancel) if chunks else response:
+                            started = True
+                            text = chunk.text
+                            if text:
+                                yield text
+                    finally:
+                        # Stopped early (cancelled, closed or failed): don't let the request run on
+                        if chunks:
+                            chunks.stop()
+                        _cancel_stream(response)
+                    return
+            except Exception as e:
+                if started or not is_quota_error(e) or attempt == self.max_retries:
+                    raise
+                with self._cond:
+                    self._quota_errors += 1
+                    self._tokens = 0.0
+                time.sleep(self.backoff_seconds * 2 ** attempt)
+
+    def model(self, model_name: str):
+        if model_name not in self._models:
+            self._models[model_name] = genai.GenerativeModel(model_name)
+        return self._models[model_name]
+
+    def chat_model(self, inner: BaseChatModel, priority: int = BACKGROUND) -> BaseChatModel:
+        """Wrap a LangChain chat model so its calls go through this gateway."""
+        return GatedChatModel(inner=inner, gateway=self, priority=priority)
+
+    def stats(self) -> dict:
+        with self._cond:
+            waiting = {name: 0 for name in LANES.values()}
+            for priority, _ in self._waiting:
+                waiting[LANES[priority]] += 1
+            return {
+                "requests_per_second": self.requests_per_second,
+                "max_concurrency": self.max_concurrency,
+                "active": self._active,
+                "waiting": waiting,
+                "quota_errors": self._quota_errors,
+                "lanes": {name: dict(counts) for name, counts in self._counts.items()},
+            }
+
+    def _acquire(self, priority: int):
+        ticket = (priority, next(self._sequence))
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                self._refill()
+                if self._waiting[0] == ticket and self._active < self.max_concurrency and self._tokens >= 1:
+                    heapq.heappop(self._waiting)
+                    self._tokens -= 1
+                    self._active += 1
+                    lane = self._counts[LANES[priority]]
+                    lane["requests"] += 1
+                    lane["wait_seconds"] += time.monotonic() - start
+                    # The next ticket in line may be able to go too
+                    self._cond.notify_all()
+                    return
+
+                timeout = None
+                if self._tokens < 1:
+                    timeout = (1 - self._tokens) / self.requests_per_second
+                self._cond.wait(timeout)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.requests_per_second)
+        self._refilled_at = now
+
+
+def _cancel_stream(response):
+    """Cancel a streamed generation's upstream call, if it's still running."""
+    # The gRPC stream is the response's iterator; cancelling a finished one does nothing
+    for stream in (response, getattr(response, "_iterator", None)):
+        cancel = getattr(stream, "cancel", None)
+        if callable(cancel):
+            try:
+                cancel()
+            except Exception as e:
+                print(f"Error cancelling LLM stream: {e}")
+
+
+class _StreamReader:
+    """
+    Reads a streamed response on its own thread, so the consumer can notice a
+    cancel while the next chunk is still on its way.
+    """
+
+    def __init__(self, response):
+        self.response = response
+        self._chunks = queue.Queue()
+        self._stopped = threading.Event()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def read(self, cancel):
+        while True:
+            try:
+                kind, item = self._chunks.get(timeout=CANCEL_POLL_SECONDS)
+            except queue.Empty:
+                kind = None
+            if cancel.is_set():
+                return
+            if kind == "chunk":
+                yield item
+            elif kind == "error":
+                raise item
+            elif kind == "done":
+                return
+
+    def stop(self):
+        self._stopped.set()
+
+    def _read(self):
+        try:
+            for chunk in self.response:
+                if self._stopped.is_set():
+                    break
+                self._chunks.put(("chunk", chunk))
+            self._chunks.put(("done", None))
+        except Exception as e:
+            self._chunks.put(("error", e))
+        finally:
+            close = getattr(self.response, "close", None)
+            if callable(close):
+                close()
+
+
+class GatedChatModel(BaseChatModel):
+    """LangChain chat model that runs another chat model's calls through an LLMGateway."""
+
+    inner: BaseChatModel
+    gateway: Any
+    priority: int = BACKGROUND
+
+    @property
+    def _llm_type(self) -> str:
+        return f"gated-{self.inner._llm_type}"
+
+    @property
+    def model(self) -> str:
+        return getattr(self.inner, "model", self.inner._llm_type)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return self.gateway.call(lambda: self.inner._generate(messages, stop=stop, **kwargs), self.priority)
+
+    def get_num_tokens(self, text: str) -> int:
+        return self.inner.get_num_tokens(text)
+
+
+gateway = LLMGateway(
+    requests_per_second=float(os.getenv("LLM_REQUESTS_PER_SECOND", 5.0)),
+    burst=int(os.getenv("LLM_BURST", 10)),
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 8)),
+)
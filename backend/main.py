@@ -1,23 +1,108 @@
 from fastapi import FastAPI, Request, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from db.mongo import db
+from db.indexes import ensure_indexes
 from bson import ObjectId #vedant import
+from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError
 import datetime
 from dotenv import load_dotenv
 import os
-from qdrant_manager import QdrantManager
+from qdrant_manager import QdrantManager, NO_CONTEXT_REPLY
+from embeddings import make_embedder
+from qdrant_layout import TenantResolver, mongo_tenant_lookup, SHARED_COLLECTION
+from embedding_cache import EmbeddingCache
+from pdf_ingest import PdfIngestor
+from pdf_storage import PdfStorage, parse_range, iter_file, content_disposition
+from pdf_extract import PdfExtractor, PdfExtractionError, PdfParseError
+from offload import run_mongo, run_qdrant, run_llm, run_ingest, run_cache, iterate_in_pool
+import offload
+from live_feed import TranscriptFeed, HEARTBEAT_SECONDS
+from segment_ingest import SegmentBatcher, parse_segments
+import json
 import base64
+import hashlib
 from fastapi import UploadFile, File, Form
+from fastapi.responses import StreamingResponse, Response
 import io
-import pdfplumber
-from summarize import Summarizer
+from summarize import Summarizer, MongoMapStore
+from jobs import SummaryScheduler, JobCancelled
+from llm import gateway, BACKGROUND
+from concept_graph import ConceptGraphCache
+from org_tree import org_tree_pipeline, parse_fields
+from pagination import list_response, is_full_list, load_all, NEXT_CURSOR_HEADER
+from response_cache import ResponseCache, make_backend
+import asyncio
 import threading
 import google.generativeai as genai
 load_dotenv()
 
 app = FastAPI()
 
-qdrant_manager = QdrantManager(qdrant_api_key=os.getenv('QDRANT_API_KEY'), google_api_key= os.getenv('GOOGLE_API_KEY'), host=os.getenv('QDRANT_LINK'), port=6333)
+# EMBEDDING_PROVIDER: gemini (default), local (sentence-transformers on the CPU) or hashing (tests), see embeddings
+embedder = make_embedder(
+    os.getenv('EMBEDDING_PROVIDER', 'gemini'),
+    dimension=int(os.getenv('EMBEDDING_DIMENSION', 0)) or None,
+    model=os.getenv('EMBEDDING_MODEL'),
+    threads=int(os.getenv('LOCAL_EMBED_THREADS', 0)) or None,
+    backend=os.getenv('LOCAL_EMBED_BACKEND', 'torch'),
+)
+# Set EMBEDDING_CACHE_PATH to a sqlite file to keep embeddings across restarts
+embedding_cache = EmbeddingCache(
+    embedder.name,
+    max_entries=int(os.getenv('EMBEDDING_CACHE_SIZE', 10000)),
+    path=os.getenv('EMBEDDING_CACHE_PATH'),
+)
+# QDRANT_STORAGE=shared keeps every meeting in one collection, tagged with its team and department
+qdrant_manager = QdrantManager(
+    qdrant_api_key=os.getenv('QDRANT_API_KEY'), google_api_key= os.getenv('GOOGLE_API_KEY'), host=os.getenv('QDRANT_LINK'), port=6333,
+    embed_fn=embedding_cache.wrap(embedder),
+    vector_size=embedder.dimension,
+    storage=os.getenv('QDRANT_STORAGE', 'per_meeting'),
+    tenant_resolver=TenantResolver(mongo_tenant_lookup(db)),
+    shared_collection=os.getenv('QDRANT_SHARED_COLLECTION', SHARED_COLLECTION),
+    # default, balanced, low_memory or high_recall, see collection_profiles
+    profile=os.getenv('QDRANT_PROFILE'),
+)
+pdf_ingestor = PdfIngestor(
+    qdrant_manager,
+    embed_batch_size=int(os.getenv('PDF_EMBED_BATCH_SIZE', 64)),
+    upsert_batch_size=int(os.getenv('PDF_UPSERT_BATCH_SIZE', 256)),
+    max_concurrency=int(os.getenv('PDF_EMBED_CONCURRENCY', 4)),
+)
+pdf_extractor = PdfExtractor(
+    workers=int(os.getenv('PDF_EXTRACT_WORKERS', os.cpu_count() or 1)),
+    max_pages=int(os.getenv('PDF_MAX_PAGES', 2000)),
+    timeout_seconds=float(os.getenv('PDF_EXTRACT_TIMEOUT_SECONDS', 300)),
+    memory_mb=int(os.getenv('PDF_WORKER_MEMORY_MB', 1024)),
+)
+pdf_storage = PdfStorage(db)
+# Set RESPONSE_CACHE_URL (redis://... or "local") to share cached responses between workers.
+# Other workers' in-process copies aren't invalidated, so they expire quickly when sharing.
+response_cache_backend = make_backend(os.getenv('RESPONSE_CACHE_URL'))
+response_cache = ResponseCache(
+    max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', 2000)),
+    ttl=float(os.getenv('RESPONSE_CACHE_LOCAL_TTL', 5 if response_cache_backend else 300)),
+    backend=response_cache_backend,
+    backend_ttl=float(os.getenv('RESPONSE_CACHE_TTL', 300)),
+)
+transcript_feed = TranscriptFeed(qdrant_manager)
+# Transcript segments posted within SEGMENT_BATCH_WAIT_SECONDS of each other share one embed call and upsert
+segment_batcher = SegmentBatcher(
+    qdrant_manager,
+    max_batch=int(os.getenv('SEGMENT_BATCH_SIZE', 64)),
+    max_wait=float(os.getenv('SEGMENT_BATCH_WAIT_SECONDS', 0.02)),
+)
+concept_graph_cache = ConceptGraphCache(db["concept_graphs"])
+# Concept graph generations in progress, keyed by (meeting_id, transcript version)
+concept_graph_builds = {}
+# Created below run_generate_summary, which it runs
+summary_scheduler = None
+# Map-step outputs shared by all summary runs, so refreshes only map new chunks
+summary_map_store = MongoMapStore(db["summary_map_outputs"])
+# One Summarizer for every run, created on first use since it needs Gemini credentials
+summarizer = None
+summarizer_lock = threading.Lock()
 
 # Enable CORS (adjust allowed origins as needed)
 app.add_middleware(
@@ -26,16 +111,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Configure Gemini API
 genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
 
+@app.on_event("startup")
+async def create_indexes():
+    await run_mongo(ensure_indexes, db)
+
+@app.on_event("startup")
+async def create_shared_collection():
+    if qdrant_manager.layout.shared:
+        await run_qdrant(qdrant_manager.ensure_shared_collection)
+
+@app.on_event("shutdown")
+def stop_pdf_workers():
+    pdf_extractor.shutdown()
+
+@app.get("/metrics")
+async def get_metrics():
+    return {
+        "embeddings": embedder.stats(),
+        "embedding_cache": embedding_cache.stats(),
+        "executors": offload.stats(),
+        "transcript_feed": transcript_feed.stats(),
+        "segment_ingest": segment_batcher.stats(),
+        "summary_jobs": summary_scheduler.stats(),
+        "llm": gateway.stats(),
+        "concept_graph_cache": concept_graph_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "chat_context": qdrant_manager.context_packer.stats(),
+        "answer_cache": qdrant_manager.answer_cache.stats(),
+    }
+
 @app.post("/add-user")
 async def add_user(request: Request):
     data = await request.json()
     # Example expected: { "name": "Alice", "email": "alice@example.com" }
-    result = db["users"].insert_one(data)
+    result = await run_mongo(db["users"].insert_one, data)
     return {"inserted_id": str(result.inserted_id)}
 
 @app.post("/departments")
@@ -46,7 +161,7 @@ async def add_department(request: Request):
         data["company_id"] = "67fa9eb53d8faa5288cf5a43"
     
     # Insert the department
-    result = db["departments"].insert_one(data)
+    result = await run_mongo(db["departments"].insert_one, data)
     
     # Return the created department with string ID
     created_department = {
@@ -56,22 +171,20 @@ async def add_department(request: Request):
     return created_department
 
 @app.get("/departments")
-async def get_departments():
+async def get_departments(request: Request, limit: int = None, after: str = None, format: str = None):
     # Get all departments for the company
     company_id = "67fa9eb53d8faa5288cf5a43"
-    departments = list(db["departments"].find({"company_id": company_id}))
-    
-    # Convert ObjectId to string
-    for dept in departments:
-        dept["_id"] = str(dept["_id"])
-    
-    return departments
+    try:
+        return await list_response(db["departments"], {"company_id": company_id}, request,
+                                   limit=limit, after=after, format=format)
+    except (InvalidId, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pagination parameters: {str(e)}")
 
 @app.delete("/departments/{department_id}")
 async def delete_department(department_id: str):
     try:
         # Convert string ID to ObjectId
-        result = db["departments"].delete_one({"_id": ObjectId(department_id)})
+        result = await run_mongo(db["departments"].delete_one, {"_id": ObjectId(department_id)})
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Department not found")
@@ -81,13 +194,13 @@ async def delete_department(department_id: str):
         raise HTTPException(status_code=400, detail=f"Error deleting department: {str(e)}")
 
 @app.get("/departments/{department_id}/teams")
-async def get_teams_by_department(department_id: str):
+async def get_teams_by_department(department_id: str, request: Request, limit: int = None, after: str = None,
+                                  format: str = None):
     try:
-        teams = list(db["teams"].find({"departmentId": department_id}))
-        print(teams)
-        for team in teams:
-            team["_id"] = str(team["_id"])
-        return teams
+        return await list_response(db["teams"], {"departmentId": department_id}, request,
+                                   limit=limit, after=after, format=format)
+    except (InvalidId, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pagination parameters: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -95,18 +208,20 @@ async def get_teams_by_department(department_id: str):
 async def add_team(department_id: str, request: Request):
     data = await request.json()
     data["departmentId"] = department_id
-    result = db["teams"].insert_one(data)
+    result = await run_mongo(db["teams"].insert_one, data)
     return {"inserted_id": str(result.inserted_id)}
 
 @app.get("/teams/{team_id}/meetings")
-async def get_meetings_by_team(team_id: str):
+async def get_meetings_by_team(team_id: str, request: Request, limit: int = None, after: str = None,
+                               format: str = None):
     try:
-        meetings = list(db["meetings"].find({"teamId": team_id}))
-        print(meetings)
-        # Convert ObjectId to string
-        for meeting in meetings:
-            meeting["_id"] = str(meeting["_id"])
-        return meetings
+        if is_full_list(request, limit, after, format):
+            return await response_cache.respond(request, f"team_meetings:{team_id}",
+                                                lambda: load_all(db["meetings"], {"teamId": team_id}))
+        return await list_response(db["meetings"], {"teamId": team_id}, request,
+                                   limit=limit, after=after, format=format)
+    except (InvalidId, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pagination parameters: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -118,7 +233,8 @@ async def add_meeting(team_id: str, request: Request):
         # The frontend will send meeting_date as an ISO string that includes both date and time
         # Each meeting will have a default duration of 60 minutes (not stored explicitly)
         data["teamId"] = team_id
-        result = db["meetings"].insert_one(data)
+        result = await run_mongo(db["meetings"].insert_one, data)
+        await run_cache(response_cache.invalidate, f"team_meetings:{team_id}")
         return {"inserted_id": str(result.inserted_id)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -126,21 +242,35 @@ async def add_meeting(team_id: str, request: Request):
 @app.delete("/meetings/{meeting_id}")
 async def delete_meeting(meeting_id: str):
     try:
-        # Convert string ID to ObjectId
-        result = db["meetings"].delete_one({"_id": ObjectId(meeting_id)})
+        # Convert string ID to ObjectId, and keep the team id to invalidate its meeting list
+        meeting = await run_mongo(db["meetings"].find_one_and_delete, {"_id": ObjectId(meeting_id)}, {"teamId": 1})
         
-        if result.deleted_count == 0:
+        if meeting is None:
             raise HTTPException(status_code=404, detail="Meeting not found")
+        
+        await run_cache(
+            response_cache.invalidate,
+            f"meeting:{meeting_id}", f"team_meetings:{meeting.get('teamId')}", f"summary:{meeting_id}",
+            f"actions:{meeting_id}", f"pdf_documents:{meeting_id}",
+        )
+
+        # Its transcript and PDF points, which team-wide search would otherwise still find
+        try:
+            if await run_qdrant(qdrant_manager.collection_exists, meeting_id):
+                await run_qdrant(qdrant_manager.delete_collection, meeting_id)
+        except Exception as e:
+            print(f"Error deleting vectors of meeting {meeting_id}: {str(e)}")
+        await run_mongo(concept_graph_cache.invalidate, meeting_id)
             
         return {"success": True, "message": "Meeting deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error deleting meeting: {str(e)}")
 
 @app.get("/meetings/{meeting_id}")
-async def get_meeting_by_id(meeting_id: str):
-    try:
+async def get_meeting_by_id(meeting_id: str, request: Request):
+    async def load():
         # Convert string ID to ObjectId
-        meeting = db["meetings"].find_one({"_id": ObjectId(meeting_id)})
+        meeting = await run_mongo(db["meetings"].find_one, {"_id": ObjectId(meeting_id)})
         
         if not meeting:
             raise HTTPException(status_code=404, detail="Meeting not found")
@@ -149,16 +279,21 @@ async def get_meeting_by_id(meeting_id: str):
         meeting["_id"] = str(meeting["_id"])
         
         return meeting
-    except ValueError:
+
+    try:
+        return await response_cache.respond(request, f"meeting:{meeting_id}", load)
+    except HTTPException as e:
+        raise e
+    except InvalidId:
         raise HTTPException(status_code=400, detail="Invalid meeting ID format")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving meeting: {str(e)}")
 
 @app.get("/teams/{team_id}")
-async def get_team_by_id(team_id: str):
-    try:
+async def get_team_by_id(team_id: str, request: Request):
+    async def load():
         # Convert string ID to ObjectId
-        team = db["teams"].find_one({"_id": ObjectId(team_id)})
+        team = await run_mongo(db["teams"].find_one, {"_id": ObjectId(team_id)})
         
         if not team:
             raise HTTPException(status_code=404, detail="Team not found")
@@ -167,29 +302,148 @@ async def get_team_by_id(team_id: str):
         team["_id"] = str(team["_id"])
         
         return team
-    except ValueError:
+
+    try:
+        return await response_cache.respond(request, f"team:{team_id}", load)
+    except HTTPException as e:
+        raise e
+    except InvalidId:
         raise HTTPException(status_code=400, detail="Invalid team ID format")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving team: {str(e)}")
 
+async def search_meetings_response(q: str, limit: int, team_id: str = None, department_id: str = None):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="q is required")
+    if not 1 <= limit <= 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+
+    meeting_ids = None
+    if not qdrant_manager.layout.shared:
+        # Without the shared collection, search each of the scope's meetings
+        team_ids = [team_id] if team_id else [
+            str(team["_id"]) for team in await run_mongo(lambda: list(db["teams"].find({"departmentId": department_id}, {"_id": 1})))
+        ]
+        meetings = await run_mongo(lambda: list(db["meetings"].find({"teamId": {"$in": team_ids}}, {"_id": 1})))
+        meeting_ids = [str(meeting["_id"]) for meeting in meetings]
+        if not meeting_ids:
+            return {"results": []}
+
+    try:
+        results = await run_qdrant(qdrant_manager.search_meetings, q, team_id=team_id, department_id=department_id,
+                                   meeting_ids=meeting_ids, limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching meetings: {str(e)}")
+    return {"results": results}
+
+@app.get("/teams/{team_id}/search")
+async def search_team_meetings(team_id: str, q: str, limit: int = 10):
+    """Transcript and PDF passages from all of a team's meetings, most similar to `q` first."""
+    return await search_meetings_response(q, limit, team_id=team_id)
+
+@app.get("/departments/{department_id}/search")
+async def search_department_meetings(department_id: str, q: str, limit: int = 10):
+    return await search_meetings_response(q, limit, department_id=department_id)
+
+@app.get("/org-tree")
+async def get_org_tree(department_id: str = None, team_id: str = None, depth: str = "meetings", fields: str = None):
+    """
+    Departments -> teams -> meetings in one aggregation. Pass department_id or
+    team_id for a subtree, depth to stop nesting at a level (deeper levels are
+    only counted), and fields as "level.field,..." to pick projected fields.
+    """
+    try:
+        root, pipeline = org_tree_pipeline(department_id, team_id, depth, parse_fields(fields))
+    except InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid department or team ID format")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        tree = await run_mongo(lambda: list(db[root].aggregate(pipeline)))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving organisation tree: {str(e)}")
+
+    if not tree and (department_id or team_id):
+        raise HTTPException(status_code=404, detail=f"{'Team' if team_id else 'Department'} not found")
+    return {root: tree}
+
 @app.post("/meetings/{meeting_id}/transcription")
 async def update_meeting_transcription_status(meeting_id: str, request: Request):
     try:
         data = await request.json()
         
-        # Update the meeting with transcription status
-        result = db["meetings"].update_one(
+        # Update the meeting with transcription status, keeping its team id to invalidate the team's meeting list
+        meeting = await run_mongo(
+            db["meetings"].find_one_and_update,
             {"_id": ObjectId(meeting_id)},
-            {"$set": {"hasTranscription": data.get("hasTranscription", True)}}
+            {"$set": {"hasTranscription": data.get("hasTranscription", True)}},
+            {"teamId": 1},
         )
         
-        if result.matched_count == 0:
+        if meeting is None:
             raise HTTPException(status_code=404, detail="Meeting not found")
+        
+        await run_cache(response_cache.invalidate, f"meeting:{meeting_id}", f"team_meetings:{meeting.get('teamId')}")
             
         return {"success": True, "message": "Meeting transcription status updated"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error updating meeting transcription status: {str(e)}")
 
+@app.post("/meetings/{meeting_id}/collection")
+async def initialize_meeting_collection(meeting_id: str):
+    """
+    Create the meeting's Qdrant collection if needed and return where its
+    transcript continues from: the last segment's end time and the next
+    sequence number for POST /segments.
+    """
+    if not ObjectId.is_valid(meeting_id):
+        raise HTTPException(status_code=400, detail="Invalid meeting ID format")
+    try:
+        await run_qdrant(qdrant_manager.create_collection, meeting_id)
+        position = await run_qdrant(qdrant_manager.transcript_position, meeting_id)
+        return {"success": True, "next_start_time": position["end_time"], "next_seq": position["seq"]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error initializing meeting collection: {str(e)}")
+
+@app.delete("/meetings/{meeting_id}/collection")
+async def delete_meeting_collection(meeting_id: str):
+    """Delete the meeting's transcript and PDF points, e.g. to restart its transcription."""
+    if not ObjectId.is_valid(meeting_id):
+        raise HTTPException(status_code=400, detail="Invalid meeting ID format")
+    try:
+        await run_qdrant(qdrant_manager.delete_collection, meeting_id)
+        # A new transcript can reach the old one's revision, which is the graph's version
+        await run_mongo(concept_graph_cache.invalidate, meeting_id)
+        # And reuses its segment ids, which live viewers were already sent
+        transcript_feed.reset(meeting_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting meeting collection: {str(e)}")
+    return {"success": True}
+
+@app.post("/meetings/{meeting_id}/segments")
+async def add_transcript_segments(meeting_id: str, request: Request):
+    """
+    Add transcript segments: one {text, start_time, end_time, seq}, a list,
+    or {"segments": [...]}. Times are seconds from the start of the meeting.
+    Segment ids come from the meeting and `seq`, so retrying a request is safe.
+    """
+    if not ObjectId.is_valid(meeting_id):
+        raise HTTPException(status_code=400, detail="Invalid meeting ID format")
+    try:
+        segments = parse_segments(await request.json())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        written = await segment_batcher.submit(meeting_id, segments)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error adding transcript segments: {str(e)}")
+    transcript_feed.publish(meeting_id, written)
+    return {"success": True, "ids": [segment["id"] for segment in written]}
+
 @app.post("/meetings/{meeting_id}/chat")
 async def chat_with_meeting(meeting_id: str, request: Request):
     try:
@@ -198,7 +452,7 @@ async def chat_with_meeting(meeting_id: str, request: Request):
         
         # Mock response for now
         print(meeting_id)
-        message = qdrant_manager.chat(collection_name=meeting_id, prompt=user_message)
+        message = await run_llm(qdrant_manager.chat, collection_name=meeting_id, prompt=user_message)
 
         response = {
             "message": str(message),
@@ -210,17 +464,114 @@ async def chat_with_meeting(meeting_id: str, request: Request):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
 
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/meetings/{meeting_id}/chat/stream")
+async def stream_chat_with_meeting(meeting_id: str, request: Request):
+    """
+    Server-Sent Events version of /chat: a `citations` event with the retrieved
+    context, `token` events as the answer is generated, then `done` (or
+    `error`). Closing the connection stops the generation upstream.
+    """
+    data = await request.json()
+    user_message = data.get("message", "")
+    history = data.get("history", [])
+    try:
+        cached, lookup = await run_qdrant(qdrant_manager.cached_answer, meeting_id, user_message, history)
+        if cached is None:
+            results, input_text = await run_qdrant(
+                qdrant_manager.chat_context, meeting_id, user_message, history, embedding=lookup[0]
+            )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
+
+    async def events():
+        message = ""
+        try:
+            if cached is not None:
+                yield sse_event("citations", cached.citations)
+                message = cached.answer
+                yield sse_event("token", {"text": message})
+            else:
+                citations = qdrant_manager.citations(results)
+                yield sse_event("citations", citations)
+                if input_text is None:
+                    message = NO_CONTEXT_REPLY
+                    yield sse_event("token", {"text": message})
+                else:
+                    async for text in iterate_in_pool("llm", qdrant_manager.chat_stream, input_text):
+                        message += text
+                        yield sse_event("token", {"text": text})
+                    # Only complete answers are cached, a disconnect never gets here
+                    qdrant_manager.remember_answer(meeting_id, lookup, user_message, message, citations)
+            yield sse_event("done", {
+                "message": message,
+                "meeting_id": meeting_id,
+                "timestamp": datetime.datetime.now().isoformat()
+            })
+        except Exception as e:
+            print(f"Error streaming chat for meeting {meeting_id}: {str(e)}")
+            yield sse_event("error", {"detail": f"Error processing chat request: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/meetings/{meeting_id}/transcriptions")
 async def get_transcriptions(meeting_id: str):
     try:
         # Get transcriptions from Qdrant
-        transcriptions = qdrant_manager.get_transcriptions(collection_name=meeting_id)
+        transcriptions = await run_qdrant(qdrant_manager.get_transcriptions, collection_name=meeting_id)
         
         # Return the transcriptions
         return {"transcriptions": transcriptions}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving transcriptions: {str(e)}")
 
+@app.get("/meetings/{meeting_id}/transcriptions/stream")
+async def stream_transcriptions(meeting_id: str, request: Request):
+    # Server-Sent Events: a "snapshot" event with the transcript so far, then a
+    # "segments" event for each batch of newly ingested segments, or a "reset"
+    # event when the transcript was deleted and the viewer should clear it
+    subscription = transcript_feed.subscribe(meeting_id)
+
+    async def events():
+        try:
+            segments = await subscription.snapshot()
+            yield sse_event("snapshot", {'transcriptions': segments})
+
+            while not await request.is_disconnected():
+                event, segments = await subscription.next(timeout=HEARTBEAT_SECONDS)
+                if event:
+                    yield sse_event(event, {'transcriptions': segments})
+                else:
+                    yield ": keep-alive\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Blocking: parses the PDF in worker processes and embeds its text as pages arrive, run through the ingest pool
+def ingest_pdf(meeting_id: str, pdf_file, filename: str, document_key: str):
+    ingest_stats = pdf_ingestor.ingest(meeting_id, pdf_extractor.iter_lines(pdf_file), document_key)
+    print(f"Ingested PDF '{filename}': {ingest_stats.as_dict()}")
+    return ingest_stats
+
+def discard_pdf_upload(meeting_id: str, document_id: ObjectId, document_key: str):
+    """Remove what a failed upload stored: its record, its GridFS file and any chunks it ingested."""
+    db["pdf_documents"].delete_one({"_id": document_id})
+    # Chunks are shared with an earlier upload of the same file, which still needs them
+    if not db["pdf_documents"].find_one({"meeting_id": meeting_id, "sha256": document_key}, {"_id": 1}):
+        qdrant_manager.delete_pdf_points(meeting_id, document_key)
+    pdf_storage.delete(document_id)
+
 @app.post("/meetings/{meeting_id}/upload-pdf")
 async def upload_pdf_to_meeting(meeting_id: str, file: UploadFile = File(...)):
     try:
@@ -228,126 +579,251 @@ async def upload_pdf_to_meeting(meeting_id: str, file: UploadFile = File(...)):
         if not file.content_type == "application/pdf":
             raise HTTPException(status_code=400, detail="Only PDF files are allowed")
         
-        # Read the entire file content
-        pdf_content = await file.read()
-        
-        # Extract and log text from PDF using pdfplumber
-        try:
-            with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
-                for _, page in enumerate(pdf.pages, start=1):
-                    
-                    # Extract text from the page
-                    text = page.extract_text()
-                    if text:
-                        # Split into lines and print each line with line number
-                        lines = text.splitlines()
-                        for _, line in enumerate(lines, start=1):
-                            if line.strip():  # Skip empty lines
-                                # print(f"Line {line_index}: {line.strip()}")
-                                qdrant_manager.add_text_pdf(collection_name=meeting_id, text=line.strip())
-
-        except Exception as e:
-            print(f"Error extracting PDF content: {str(e)}")
-        
         # Verify meeting exists
-        meeting = db["meetings"].find_one({"_id": ObjectId(meeting_id)})
+        meeting = await run_mongo(db["meetings"].find_one, {"_id": ObjectId(meeting_id)})
         if not meeting:
             raise HTTPException(status_code=404, detail="Meeting not found")
         
-        # Encode the PDF file as base64 to store in MongoDB
-        base64_pdf = base64.b64encode(pdf_content).decode('utf-8')
-        
-        # Store PDF in MongoDB
-        pdf_document = {
-            "meeting_id": meeting_id,
-            "filename": file.filename,
-            "content_type": file.content_type,
-            "uploaded_at": datetime.datetime.now().isoformat(),
-            "file_content": base64_pdf
-        }
+        # Copy the spooled upload into GridFS in chunks, never holding it all in memory
+        document_id = ObjectId()
+        stored = await run_ingest(
+            pdf_storage.save, document_id, file.file, file.filename,
+            {"meeting_id": meeting_id, "content_type": file.content_type},
+        )
         
-        result = db["pdf_documents"].insert_one(pdf_document)
+        try:
+            # Extract text from PDF using pdfplumber and embed it in bulk
+            ingest_stats = await run_ingest(ingest_pdf, meeting_id, file.file, file.filename, stored["sha256"])
+
+            # Store the PDF's details in MongoDB, the content lives in GridFS under the same id
+            pdf_document = {
+                "_id": document_id,
+                "meeting_id": meeting_id,
+                "filename": file.filename,
+                "content_type": file.content_type,
+                "uploaded_at": datetime.datetime.now().isoformat(),
+                "storage": "gridfs",
+                "size": stored["size"],
+                "sha256": stored["sha256"]
+            }
+
+            result = await run_mongo(db["pdf_documents"].insert_one, pdf_document)
+        except Exception:
+            try:
+                await run_mongo(discard_pdf_upload, meeting_id, document_id, stored["sha256"])
+            except Exception as e:
+                print(f"Error cleaning up failed PDF upload {document_id}: {str(e)}")
+            raise
         
         # Update the meeting to track associated PDFs
-        db["meetings"].update_one(
+        await run_mongo(
+            db["meetings"].update_one,
             {"_id": ObjectId(meeting_id)},
             {"$addToSet": {"pdf_documents": str(result.inserted_id)}}
         )
+        await run_cache(
+            response_cache.invalidate,
+            f"meeting:{meeting_id}", f"team_meetings:{meeting.get('teamId')}", f"pdf_documents:{meeting_id}",
+        )
         
         return {
             "success": True,
             "message": "PDF uploaded successfully",
             "document_id": str(result.inserted_id),
             "filename": file.filename,
+            "ingest": ingest_stats.as_dict(),
             "ok": True
         }
     except HTTPException as e:
         raise e
+    except PdfParseError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except PdfExtractionError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error uploading PDF: {str(e)}")
 
+def with_content_url(doc: dict) -> dict:
+    doc["content_url"] = f"/pdf-documents/{doc['_id']}/content"
+    return doc
+
 @app.get("/meetings/{meeting_id}/pdf-documents")
-async def get_meeting_pdf_documents(meeting_id: str):
+async def get_meeting_pdf_documents(meeting_id: str, request: Request, limit: int = None, after: str = None,
+                                    format: str = None):
     try:
-        # Get all PDFs associated with this meeting
-        documents = list(db["pdf_documents"].find({"meeting_id": meeting_id}, {"file_content": 0}))
-        
-        # Convert ObjectIds to strings
-        for doc in documents:
-            doc["_id"] = str(doc["_id"])
-        
-        return documents
+        # Get the PDFs associated with this meeting, without any legacy base64 content
+        if is_full_list(request, limit, after, format):
+            return await response_cache.respond(
+                request, f"pdf_documents:{meeting_id}",
+                lambda: load_all(db["pdf_documents"], {"meeting_id": meeting_id}, {"file_content": 0}, with_content_url),
+            )
+        return await list_response(db["pdf_documents"], {"meeting_id": meeting_id}, request,
+                                   projection={"file_content": 0}, limit=limit, after=after, format=format,
+                                   transform=with_content_url)
+    except (InvalidId, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pagination parameters: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving PDF documents: {str(e)}")
 
 @app.get("/pdf-documents/{document_id}")
 async def get_pdf_document(document_id: str):
     try:
-        # Get the PDF document by ID
-        document = db["pdf_documents"].find_one({"_id": ObjectId(document_id)})
+        # Get the PDF document's details, the file itself is served by /content
+        document = await run_mongo(db["pdf_documents"].find_one, {"_id": ObjectId(document_id)}, {"file_content": 0})
         if not document:
             raise HTTPException(status_code=404, detail="PDF document not found")
         
         document["_id"] = str(document["_id"])
-        return document
-    except ValueError:
+        return with_content_url(document)
+    except HTTPException as e:
+        raise e
+    except InvalidId:
         raise HTTPException(status_code=400, detail="Invalid document ID format")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving PDF document: {str(e)}")
 
+def open_pdf_content(document_id: ObjectId):
+    """
+    (file, size, etag, filename, content_type) for a stored PDF, or None.
+    Falls back to the base64 `file_content` of documents not migrated yet.
+    """
+    grid_out = pdf_storage.open(document_id)
+    if grid_out is not None:
+        metadata = grid_out.metadata or {}
+        etag = getattr(grid_out, "sha256", None) or f"{document_id}-{grid_out.length}"
+        return grid_out, grid_out.length, etag, grid_out.filename, metadata.get("content_type", "application/pdf")
+
+    document = db["pdf_documents"].find_one({"_id": document_id})
+    if not document or not document.get("file_content"):
+        return None
+    content = base64.b64decode(document["file_content"])
+    return (io.BytesIO(content), len(content), hashlib.sha256(content).hexdigest(),
+            document.get("filename", "document.pdf"), document.get("content_type", "application/pdf"))
+
+@app.get("/pdf-documents/{document_id}/content")
+async def get_pdf_content(document_id: str, request: Request):
+    try:
+        content = await run_mongo(open_pdf_content, ObjectId(document_id))
+        if content is None:
+            raise HTTPException(status_code=404, detail="PDF document not found")
+        pdf_file, size, etag, filename, content_type = content
+        etag = f'"{etag}"'
+
+        headers = {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "private, max-age=3600",
+            "Content-Disposition": content_disposition(filename),
+        }
+
+        # Conditional GET, the content of a document id never changes
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+            return Response(status_code=304, headers=headers)
+
+        # A Range only applies if the client's copy is still current
+        byte_range = None
+        if_range = request.headers.get("if-range")
+        if not if_range or if_range.strip() == etag:
+            try:
+                byte_range = parse_range(request.headers.get("range"), size)
+            except ValueError:
+                return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+        status_code = 200
+        start, end = 0, size - 1
+        if byte_range:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(max(end - start + 1, 0))
+
+        # Starlette runs the blocking reads of this generator in its threadpool
+        return StreamingResponse(iter_file(pdf_file, start, end), status_code=status_code,
+                                 media_type=content_type, headers=headers)
+    except HTTPException as e:
+        raise e
+    except InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid document ID format")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving PDF content: {str(e)}")
+
 @app.delete("/pdf-documents/{document_id}")
 async def delete_pdf_document(document_id: str):
     try:
         # Find the document to get the meeting_id
-        document = db["pdf_documents"].find_one({"_id": ObjectId(document_id)})
+        document = await run_mongo(db["pdf_documents"].find_one, {"_id": ObjectId(document_id)}, {"file_content": 0})
         if not document:
             raise HTTPException(status_code=404, detail="PDF document not found")
         
         meeting_id = document["meeting_id"]
         
         # Delete the document from the pdf_documents collection
-        result = db["pdf_documents"].delete_one({"_id": ObjectId(document_id)})
+        result = await run_mongo(db["pdf_documents"].delete_one, {"_id": ObjectId(document_id)})
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="PDF document not found")
         
+        # Delete the file's chunks, legacy documents have none
+        await run_mongo(pdf_storage.delete, ObjectId(document_id))
+
+        # And its text from the meeting's vectors, unless the same file is uploaded to the meeting again
+        # (copies share points). Search and cached answers would otherwise keep citing it
+        document_key = document.get("sha256")
+        if document_key and not await run_mongo(
+            db["pdf_documents"].find_one, {"meeting_id": meeting_id, "sha256": document_key}, {"_id": 1},
+        ):
+            try:
+                await run_qdrant(qdrant_manager.delete_pdf_points, meeting_id, document_key)
+            except Exception as e:
+                print(f"Error deleting vectors of PDF document {document_id}: {str(e)}")
+        
         # Update the meeting to remove the reference to the deleted PDF
-        db["meetings"].update_one(
+        meeting = await run_mongo(
+            db["meetings"].find_one_and_update,
             {"_id": ObjectId(meeting_id)},
-            {"$pull": {"pdf_documents": document_id}}
+            {"$pull": {"pdf_documents": document_id}},
+            {"teamId": 1},
+        )
+        await run_cache(
+            response_cache.invalidate,
+            f"meeting:{meeting_id}", f"team_meetings:{meeting.get('teamId') if meeting else None}",
+            f"pdf_documents:{meeting_id}",
         )
         
         return {"success": True, "message": "PDF document deleted successfully"}
-    except ValueError:
+    except HTTPException as e:
+        raise e
+    except InvalidId:
         raise HTTPException(status_code=400, detail="Invalid document ID format")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting PDF document: {str(e)}")
 
+async def build_concept_graph(meeting_id: str, version: str):
+    transcriptions = await run_qdrant(qdrant_manager.get_transcriptions, collection_name=meeting_id)
+    concept_graph = await run_llm(qdrant_manager.generate_concept_graph, meeting_id, transcriptions)
+
+    # Fallback and empty graphs come from failures, so try again next time
+    if concept_graph["nodes"] and not concept_graph.get("fallback"):
+        await run_mongo(concept_graph_cache.put, meeting_id, version, concept_graph)
+    return concept_graph
+
 @app.get("/meetings/{meeting_id}/conceptgraph")
 async def get_concept_graph(meeting_id: str):
    try:
-       # Generate concept graph from transcriptions
-       concept_graph = qdrant_manager.generate_concept_graph(collection_name=meeting_id)
+       # Serve the cached graph unless the transcript changed since it was built. The
+       # revision is a count and one point's timestamp, so the transcript itself is only read to build one
+       version = await run_qdrant(qdrant_manager.transcript_revision, meeting_id)
+       concept_graph = await run_mongo(concept_graph_cache.get, meeting_id, version)
+
+       if concept_graph is None:
+           # Viewers arriving during a build wait for it instead of starting another
+           key = (meeting_id, version)
+           if key not in concept_graph_builds:
+               build = asyncio.ensure_future(build_concept_graph(meeting_id, version))
+               build.add_done_callback(lambda _: concept_graph_builds.pop(key, None))
+               concept_graph_builds[key] = build
+           concept_graph = await asyncio.shield(concept_graph_builds[key])
       
        # Return the concept graph
        return {"conceptgraph": concept_graph}
@@ -356,21 +832,30 @@ async def get_concept_graph(meeting_id: str):
 
 @app.get("/meetings/{meeting_id}/summary")
 async def get_summary(meeting_id: str):
-    # Start a completely separate thread for summarization
-    # This is more isolated than background_tasks and won't block the main application
-    thread = threading.Thread(target=run_generate_summary, args=(meeting_id,))
-    thread.daemon = True  # Set as daemon so it doesn't prevent app shutdown
-    thread.start()
+    # Queue summarization on the summary worker pool. Repeated requests while the
+    # transcript is unchanged share one job instead of starting new runs.
+    job = await run_qdrant(summary_scheduler.submit, meeting_id)
     
     # Return immediately
-    return {"success": True, "message": "Summary generation started in separate thread"}
+    return {"success": True, "message": f"Summary job {job.status}", "job": job.as_dict()}
+
+@app.get("/meetings/{meeting_id}/summary/status")
+async def get_summary_status(meeting_id: str):
+    job = summary_scheduler.latest(meeting_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No summary job for this meeting")
+    return job.as_dict()
+
+@app.get("/summary-jobs/{job_id}")
+async def get_summary_job(job_id: str):
+    job = summary_scheduler.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Summary job not found")
+    return job.as_dict()
 
 # Function to generate action items from summary using Gemini
 def generate_action_items(summary):
     try:
-        # Configure the model
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
         # Create a prompt for generating 2 short action items
         prompt = f"""
         Based on the following meeting summary, generate exactly 2 action items.
@@ -386,8 +871,8 @@ def generate_action_items(summary):
         ]
         """
         
-        # Generate response
-        response = model.generate_content(prompt)
+        # Generate response, behind interactive requests
+        response = gateway.generate(prompt, 'gemini-1.5-flash', priority=BACKGROUND)
         
         # Try to extract JSON content
         text_response = response.text
@@ -414,42 +899,87 @@ def generate_action_items(summary):
             {"description": "Schedule next steps", "isCompleted": False}
         ]
 
-# Non-async function to run in a separate thread
-def run_generate_summary(meeting_id: str):
+def get_summarizer():
+    global summarizer
+    with summarizer_lock:
+        if summarizer is None:
+            summarizer = Summarizer(map_store=summary_map_store)
+        return summarizer
+
+def save_summary(meeting_id: str, generation: int, summary: str, action_items: list):
+    """
+    Save a summary job's results unless a newer job (higher `generation`) of
+    the meeting has saved already, in which case raise JobCancelled. A job can
+    be superseded right up to these writes, so they check for themselves.
+    """
+    # The filter can't match a newer job's summary, and the upsert's insert then
+    # fails on the unique meeting_id index
     try:
+        db["summaries"].update_one(
+            {"meeting_id": meeting_id, "job_generation": {"$not": {"$gt": generation}}},
+            {"$set": {"summary": summary, "job_generation": generation}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        raise JobCancelled()
+
+    # Add this job's action items, then drop older jobs' ones
+    for item in action_items:
+        item["meeting_id"] = meeting_id
+        item["job_generation"] = generation
+    if action_items:
+        db["actions"].insert_many(action_items)
+    db["actions"].delete_many({"meeting_id": meeting_id, "job_generation": {"$not": {"$gte": generation}}})
+
+    # A newer job that saved meanwhile keeps its action items instead
+    if db["summaries"].find_one({"meeting_id": meeting_id, "job_generation": {"$gt": generation}}, {"_id": 1}):
+        db["actions"].delete_many({"meeting_id": meeting_id, "job_generation": generation})
+        raise JobCancelled()
+
+# Non-async function, run by summary_scheduler on its worker threads
+def run_generate_summary(job):
+    meeting_id = job.meeting_id
+    try:
+        job.set_stage("reading transcript", 0.1)
         all_transcriptions = qdrant_manager.get_transcriptions(collection_name=meeting_id)
         all_text = ""
         for transcription in all_transcriptions:
             all_text += transcription['text']
-        summary = Summarizer().summarize(all_text)['summary']
+
+        job.set_stage("summarizing", 0.3)
+        summary = get_summarizer().summarize(all_text)['summary']
         
         # Generate action items based on the summary
+        job.set_stage("generating action items", 0.7)
         action_items = generate_action_items(summary)
         
-        # Database operations for summary
-        if db["summaries"].find_one({"meeting_id": meeting_id}):
-            db["summaries"].update_one({"meeting_id": meeting_id}, {"$set": {"summary": summary}})
-        else:
-            db["summaries"].insert_one({"meeting_id": meeting_id, "summary": summary})
-            
-        # Database operations for action items
-        # First delete any existing action items for this meeting
-        db["actions"].delete_many({"meeting_id": meeting_id})
-        
-        # Then insert the new action items
-        for item in action_items:
-            item["meeting_id"] = meeting_id
-            db["actions"].insert_one(item)
+        job.set_stage("saving", 0.9)
+        save_summary(meeting_id, job.generation, summary, action_items)
+        response_cache.invalidate(f"summary:{meeting_id}", f"actions:{meeting_id}")
             
         print(f"Summary and action items for meeting {meeting_id} generated and saved successfully")
+    except JobCancelled:
+        print(f"Summary job {job.id} for meeting {meeting_id} was superseded")
+        raise
     except Exception as e:
         print(f"Error generating summary for meeting {meeting_id}: {str(e)}")
+        raise
+
+summary_scheduler = SummaryScheduler(
+    run_generate_summary,
+    qdrant_manager.transcript_revision,
+    max_workers=int(os.getenv('SUMMARY_WORKERS', 2)),
+    finished_ttl=float(os.getenv('SUMMARY_JOB_TTL_SECONDS', 3600)),
+)
 
 @app.get("/summaries/{meeting_id}/fetch_summary")
-async def fetch_summary(meeting_id: str):
-    try:
-        summary = db["summaries"].find_one({"meeting_id": meeting_id})
+async def fetch_summary(meeting_id: str, request: Request):
+    async def load():
+        summary = await run_mongo(db["summaries"].find_one, {"meeting_id": meeting_id})
         return {"summary": summary['summary']}
+
+    try:
+        return await response_cache.respond(request, f"summary:{meeting_id}", load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching summary: {str(e)}")
 
@@ -458,7 +988,7 @@ async def fetch_summary(meeting_id: str):
 async def toggle_action_item(action_id: str):
     try:
         # Find the action item
-        action = db["actions"].find_one({"_id": ObjectId(action_id)})
+        action = await run_mongo(db["actions"].find_one, {"_id": ObjectId(action_id)})
         
         if not action:
             raise HTTPException(status_code=404, detail="Action item not found")
@@ -467,10 +997,12 @@ async def toggle_action_item(action_id: str):
         new_status = not action.get("isCompleted", False)
         
         # Update the action item
-        db["actions"].update_one(
+        await run_mongo(
+            db["actions"].update_one,
             {"_id": ObjectId(action_id)},
             {"$set": {"isCompleted": new_status}}
         )
+        await run_cache(response_cache.invalidate, f"actions:{action.get('meeting_id')}")
         
         return {"success": True, "message": "Action item status updated", "isCompleted": new_status}
     except Exception as e:
@@ -478,15 +1010,17 @@ async def toggle_action_item(action_id: str):
 
 # Add a new endpoint to get action items for a meeting
 @app.get("/meetings/{meeting_id}/actions")
-async def get_meeting_actions(meeting_id: str):
+async def get_meeting_actions(meeting_id: str, request: Request, limit: int = None, after: str = None,
+                              format: str = None):
     try:
-        # Get all action items for this meeting
-        actions = list(db["actions"].find({"meeting_id": meeting_id}))
-        
-        # Convert ObjectIds to strings
-        for action in actions:
-            action["_id"] = str(action["_id"])
-        
-        return {"actions": actions}
+        # Get the action items for this meeting
+        if is_full_list(request, limit, after, format):
+            async def load():
+                return {"actions": await load_all(db["actions"], {"meeting_id": meeting_id})}
+            return await response_cache.respond(request, f"actions:{meeting_id}", load)
+        return await list_response(db["actions"], {"meeting_id": meeting_id}, request,
+                                   limit=limit, after=after, format=format, wrap="actions")
+    except (InvalidId, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pagination parameters: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving action items: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Bounded executors for the blocking clients used by the API handlers.
+
+pymongo, QdrantClient and the Gemini SDK are synchronous, so calling them from
+an `async def` route stalls the event loop for every other request. Handlers
+run those calls through the pools below instead. Each service has its own pool
+so that slow LLM calls or a PDF upload can't use up the threads cheap Mongo
+reads need.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import os
+import threading
+
+POOL_SIZES = {
+    "mongo": int(os.getenv("MONGO_WORKERS", 32)),
+    "qdrant": int(os.getenv("QDRANT_WORKERS", 16)),
+    "llm": int(os.getenv("LLM_WORKERS", 8)),
+    "ingest": int(os.getenv("INGEST_WORKERS", 2)),
+    "cache": int(os.getenv("CACHE_WORKERS", 8)),
+}
+
+_pools = {
+    name: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"{name}-worker")
+    for name, size in POOL_SIZES.items()
+}
+
+
+async def run_in_pool(pool: str, fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pools[pool], functools.partial(fn, *args, **kwargs))
+
+
+async def run_mongo(fn, *args, **kwargs):
+    return await run_in_pool("mongo", fn, *args, **kwargs)
+
+
+async def run_qdrant(fn, *args, **kwargs):
+    return await run_in_pool("qdrant", fn, *args, **kwargs)
+
+
+async def run_llm(fn, *args, **kwargs):
+    return await run_in_pool("llm", fn, *args, **kwargs)
+
+
+async def run_ingest(fn, *args, **kwargs):
+    return await run_in_pool("ingest", fn, *args, **kwargs)
+
+
+async def run_cache(fn, *args, **kwargs):
+    return await run_in_pool("cache", fn, *args, **kwargs)
+
+
+async def iterate_in_pool(pool: str, iterator_fn, *args, **kwargs):
+    """
+    Run a blocking generator on a pool and yield its items as they are
+    produced. `iterator_fn` is called with a `cancel` threading.Event, which is
+    set when the consumer stops early (e.g. the client disconnected) so the
+    generator can stop its own work.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    cancel = threading.Event()
+    finished = object()
+
+    def put(item, error=None):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+        except RuntimeError:
+            # The loop has closed, nobody is listening any more
+            cancel.set()
+
+    def produce():
+        try:
+            for item in iterator_fn(*args, cancel=cancel, **kwargs):
+                if cancel.is_set():
+                    break
+                put(item)
+            put(finished)
+        except Exception as e:
+            put(finished, e)
+
+    loop.run_in_executor(_pools[pool], produce)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is finished:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        cancel.set()
+
+
+def stats() -> dict:
+    return {
+        name: {"workers": POOL_SIZES[name], "queued": pool._work_queue.qsize()}
+        for name, pool in _pools.items()
+    }
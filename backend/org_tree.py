@@ -0,0 +1,113 @@
+"""
+Aggregation pipelines for the department -> team -> meeting hierarchy.
+
+Teams reference departments and meetings reference teams by the string form
+of the parent's `_id`, so each level adds that string and `$lookup`s its
+children on it, which uses the (departmentId, _id) and (teamId, _id) indexes.
+The whole tree, or a subtree, comes back from one `aggregate` call with only
+the requested fields and per-level counts. `$lookup` with both localField and
+a sub-pipeline needs MongoDB 5.0 or later.
+"""
+from bson import ObjectId
+
+COMPANY_ID = "67fa9eb53d8faa5288cf5a43"
+
+LEVELS = ("departments", "teams", "meetings")
+
+DEFAULT_FIELDS = {
+    "departments": ["name", "description", "company_id"],
+    "teams": ["name", "description", "departmentId"],
+    "meetings": ["title", "description", "meeting_date", "meeting_time", "teamId", "hasTranscription"],
+}
+
+
+def parse_fields(fields: str = None) -> dict:
+    """
+    Projected fields per level from a "level.field,..." list, e.g.
+    "teams.name,meetings.title". Levels not mentioned keep their defaults.
+    """
+    selected = {level: list(names) for level, names in DEFAULT_FIELDS.items()}
+    if not fields:
+        return selected
+
+    overrides = {}
+    for item in fields.split(","):
+        level, _, name = item.strip().partition(".")
+        if level not in LEVELS or not name:
+            raise ValueError(f"Invalid field '{item.strip()}', expected <level>.<field> with level in {', '.join(LEVELS)}")
+        overrides.setdefault(level, []).append(name)
+    selected.update(overrides)
+    return selected
+
+
+def _project(fields: list, extra: dict = None) -> dict:
+    projection = {"_id": {"$toString": "$_id"}}
+    projection.update({name: 1 for name in fields if name != "_id"})
+    projection.update(extra or {})
+    return {"$project": projection}
+
+
+def _children(level: str, depth: str, fields: dict) -> list:
+    """Stages that attach `level`'s children (and their counts) to each document."""
+    child = LEVELS[LEVELS.index(level) + 1] if level != "meetings" else None
+    if child is None:
+        return []
+
+    parent_field = "departmentId" if child == "teams" else "teamId"
+    include = LEVELS.index(child) <= LEVELS.index(depth)
+
+    if include:
+        pipeline = [{"$sort": {"_id": 1}}] + _children(child, depth, fields)
+        pipeline.append(_project(fields[child], _count_fields(child, depth)))
+    else:
+        # Below the requested depth only the counts are needed
+        pipeline = [{"$project": {"_id": 1}}]
+        if child == "teams":
+            pipeline += _children(child, depth, fields)
+            pipeline.append({"$project": {"meetingCount": 1}})
+
+    count_field = "teamCount" if child == "teams" else "meetingCount"
+    stages = [
+        {"$addFields": {"_parent_id": {"$toString": "$_id"}}},
+        {"$lookup": {"from": child, "localField": "_parent_id", "foreignField": parent_field,
+                     "pipeline": pipeline, "as": child}},
+        {"$addFields": {count_field: {"$size": f"${child}"}}},
+    ]
+    if child == "teams":
+        stages.append({"$addFields": {"meetingCount": {"$sum": "$teams.meetingCount"}}})
+    return stages
+
+
+def _count_fields(level: str, depth: str) -> dict:
+    """Counts kept on `level`'s documents, plus its children if they are returned."""
+    extra = {
+        "departments": {"teamCount": 1, "meetingCount": 1},
+        "teams": {"meetingCount": 1},
+    }.get(level, {})
+    if level != "meetings" and LEVELS.index(level) < LEVELS.index(depth):
+        extra = {**extra, LEVELS[LEVELS.index(level) + 1]: 1}
+    return extra
+
+
+def org_tree_pipeline(department_id: str = None, team_id: str = None, depth: str = "meetings",
+                      fields: dict = None, company_id: str = COMPANY_ID):
+    """
+    (collection, pipeline) for the tree under a team, a department or the
+    whole company. `depth` is the deepest level returned in full; the levels
+    between the root and `depth` are nested, deeper ones only counted.
+    """
+    if depth not in LEVELS:
+        raise ValueError(f"Invalid depth '{depth}', expected one of {', '.join(LEVELS)}")
+    fields = fields or parse_fields()
+
+    if team_id:
+        root, match = "teams", {"_id": ObjectId(team_id)}
+    elif department_id:
+        root, match = "departments", {"_id": ObjectId(department_id)}
+    else:
+        root, match = "departments", {"company_id": company_id}
+
+    pipeline = [{"$match": match}, {"$sort": {"_id": 1}}]
+    pipeline += _children(root, depth, fields)
+    pipeline.append(_project(fields[root], _count_fields(root, depth)))
+    return root, pipeline
@@ -0,0 +1,104 @@
+"""
+Keyset pagination and NDJSON streaming for the list endpoints.
+
+Lists are ordered by `_id`. `limit` caps a page, and the `_id` of its last
+document comes back in the `X-Next-Cursor` header when there are more; passing
+it as `after` continues from there with an index range scan instead of a
+skip. With `?format=ndjson` (or `Accept: application/x-ndjson`) documents are
+written one per line as they come off the cursor, so the full list is never
+held in memory.
+"""
+import itertools
+import json
+
+from bson import ObjectId
+from fastapi.responses import Response, StreamingResponse
+
+from offload import run_mongo
+
+MAX_LIMIT = 1000
+
+# Documents read from the cursor per trip to the Mongo pool when streaming
+STREAM_BATCH_SIZE = 200
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def wants_ndjson(request, format: str = None) -> bool:
+    if format:
+        return format == "ndjson"
+    return "application/x-ndjson" in request.headers.get("accept", "")
+
+
+def is_full_list(request, limit: int = None, after: str = None, format: str = None) -> bool:
+    """True for a plain, unpaginated JSON list request."""
+    return limit is None and not after and not wants_ndjson(request, format)
+
+
+async def load_all(collection, query: dict, projection: dict = None, transform=None) -> list:
+    """Every matching document in _id order, for responses that are cached whole."""
+    docs = await run_mongo(lambda: list(collection.find(query, projection).sort("_id", 1)))
+    return [transform(doc) for doc in docs] if transform else docs
+
+
+def keyset_query(query: dict, after: str = None) -> dict:
+    """`query` restricted to documents after the `after` cursor. Raises InvalidId for a bad cursor."""
+    if not after:
+        return query
+    return {**query, "_id": {"$gt": ObjectId(after)}}
+
+
+def _encode(doc: dict) -> str:
+    # ObjectIds (and any dates) become strings
+    return json.dumps(doc, default=str)
+
+
+def _take(cursor, count: int) -> list:
+    return list(itertools.islice(cursor, count))
+
+
+async def list_response(collection, query: dict, request, projection: dict = None, limit: int = None,
+                        after: str = None, format: str = None, transform=None, wrap: str = None):
+    """
+    Response for a list endpoint: a JSON list (or `{wrap: list}`) of one page,
+    or an NDJSON stream. `transform(doc)` is applied to each document before
+    it is written.
+    """
+    if limit is not None and not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+
+    cursor = collection.find(keyset_query(query, after), projection).sort("_id", 1)
+    transform = transform or (lambda doc: doc)
+
+    if wants_ndjson(request, format):
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        cursor = cursor.batch_size(STREAM_BATCH_SIZE)
+
+        async def lines():
+            try:
+                while True:
+                    batch = await run_mongo(_take, cursor, STREAM_BATCH_SIZE)
+                    if not batch:
+                        break
+                    yield "".join(_encode(transform(doc)) + "\n" for doc in batch)
+            finally:
+                cursor.close()
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    headers = {}
+    if limit is not None:
+        # One extra document tells us whether there is a next page
+        docs = await run_mongo(lambda: list(cursor.limit(limit + 1)))
+        if len(docs) > limit:
+            docs = docs[:limit]
+            headers[NEXT_CURSOR_HEADER] = str(docs[-1]["_id"])
+    else:
+        docs = await run_mongo(lambda: list(cursor))
+
+    body = "[" + ",".join(_encode(transform(doc)) for doc in docs) + "]"
+    if wrap:
+        body = f'{{"{wrap}": {body}}}'
+    # Already encoded, so skip JSONResponse's own serialisation pass
+    return Response(content=body, media_type="application/json", headers=headers)
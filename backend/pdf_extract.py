@@ -0,0 +1,181 @@
+"""
+PDF text extraction in a process pool.
+
+pdfplumber is pure Python and CPU-bound, so threads can't parse pages in
+parallel. `PdfExtractor` splits a document into page ranges, parses them in
+worker processes and yields the text range by range, in page order, as soon as
+each range is ready, so the embed stage starts before the last page is parsed.
+Workers run with a memory cap, and each document has a page and time limit.
+A document that runs out of time may be stuck inside one page, so its workers
+are killed and the pool replaced; other documents' unfinished ranges are
+resubmitted to the new pool.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+
+import pdfplumber
+
+
+class PdfExtractionError(Exception):
+    """The PDF is over a page, time or memory limit."""
+
+
+class PdfParseError(PdfExtractionError):
+    """The file could not be read as a PDF."""
+
+
+def _limit_memory(memory_mb: int):
+    # Address space cap for the worker process, where the platform supports it
+    try:
+        import resource
+    except ImportError:
+        return
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _count_pages(path: str) -> int:
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_pages(path: str, first: int, last: int, deadline: float) -> list:
+    """Text of pages first..last-1, one string per page."""
+    texts = []
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages[first:last]:
+            if time.time() > deadline:
+                raise PdfExtractionError("Time limit exceeded")
+            texts.append(page.extract_text() or "")
+            # Parsed layout objects are cached on the page, drop them as we go
+            page.flush_cache()
+    return texts
+
+
+class PdfExtractor:
+    def __init__(self, workers: int = None, pages_per_task: int = 8, max_pages: int = 2000,
+                 timeout_seconds: float = 300.0, memory_mb: int = 1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+        self.max_pages = max_pages
+        self.timeout_seconds = timeout_seconds
+        self.memory_mb = memory_mb
+        self._pool = None
+        self._lock = threading.Lock()
+        # Pools whose workers were killed after a timeout, see _terminate_pool
+        self._terminated = weakref.WeakSet()
+
+    def iter_lines(self, pdf_file):
+        """
+        Yield the text lines of a PDF file object, in page order. Raises
+        PdfExtractionError if the document breaks a limit or can't be parsed.
+        """
+        # Workers open the document by path, so copy it to disk once
+        pdf_file.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            shutil.copyfileobj(pdf_file, tmp)
+        try:
+            for text in self.iter_pages(tmp.name):
+                yield from text.splitlines()
+        finally:
+            os.remove(tmp.name)
+
+    def iter_pages(self, path: str):
+        deadline = time.time() + self.timeout_seconds
+        pool = self._get_pool()
+        ranges = None
+        # (first, last, future) of submitted ranges, in page order
+        in_flight = deque()
+        try:
+            while True:
+                try:
+                    if ranges is None:
+                        page_count = self._result(pool, pool.submit(_count_pages, path), deadline)
+                        if page_count > self.max_pages:
+                            raise PdfExtractionError(f"PDF has {page_count} pages, the limit is {self.max_pages}")
+                        ranges = deque(
+                            (first, min(first + self.pages_per_task, page_count))
+                            for first in range(0, page_count, self.pages_per_task)
+                        )
+
+                    # Keep a couple of ranges per worker queued, not the whole document
+                    while ranges or in_flight:
+                        while ranges and len(in_flight) < self.workers * 2:
+                            first, last = ranges.popleft()
+                            in_flight.append((first, last, pool.submit(_extract_pages, path, first, last, deadline)))
+                        yield from self._result(pool, in_flight[0][2], deadline)
+                        in_flight.popleft()
+                    return
+                except BrokenProcessPool:
+                    if pool not in self._terminated:
+                        # A worker died, most likely by hitting its memory limit
+                        self._reset_pool(pool)
+                        raise PdfExtractionError(
+                            "PDF extraction worker crashed, the document may exceed the memory limit")
+                    # Killed because another document timed out; carry on in the new pool
+                    if ranges is not None:
+                        ranges.extendleft((first, last) for first, last, _ in reversed(in_flight))
+                    in_flight.clear()
+                    pool = self._get_pool()
+        finally:
+            for _, _, future in in_flight:
+                future.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def _result(self, pool: ProcessPoolExecutor, future, deadline: float):
+        try:
+            return future.result(timeout=max(deadline - time.time(), 0))
+        except FutureTimeoutError:
+            # The worker may be stuck in a single page and would hold its slot
+            # until it finishes, so kill it rather than leave it running
+            self._terminate_pool(pool)
+            raise PdfExtractionError(f"PDF extraction took longer than {self.timeout_seconds} seconds")
+        except MemoryError:
+            raise PdfExtractionError(f"PDF extraction exceeded the {self.memory_mb} MB memory limit")
+        except (PdfExtractionError, BrokenProcessPool):
+            raise
+        except Exception as e:
+            raise PdfParseError(f"Could not parse PDF: {e}")
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn, since forking the threaded server process isn't safe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_limit_memory,
+                    initargs=(self.memory_mb,),
+                )
+            return self._pool
+
+    def _reset_pool(self, pool: ProcessPoolExecutor):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _terminate_pool(self, pool: ProcessPoolExecutor):
+        """Kill a pool's workers and replace it for the next document."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+            self._terminated.add(pool)
+        # ProcessPoolExecutor has no public way to stop a running task
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
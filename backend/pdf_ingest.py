@@ -0,0 +1,123 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+import time
+
+
+@dataclass
+class IngestStats:
+    lines: int = 0
+    chunks: int = 0
+    embed_batches: int = 0
+    upsert_batches: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        stats = asdict(self)
+        stats["lines_per_second"] = self.lines / self.seconds if self.seconds else 0.0
+        return stats
+
+
+class PdfIngestor:
+    """
+    Bulk ingestion path for PDF text.
+
+    Lines are grouped into chunks of up to `chunk_chars` characters, chunks are
+    embedded `embed_batch_size` at a time with at most `max_concurrency` embed
+    requests in flight, and embedded chunks are written with one upsert per
+    `upsert_batch_size` points. Upserts run on the calling thread while the next
+    embed batches are still in flight.
+    """
+
+    def __init__(self, qdrant_manager, chunk_chars: int = 500, embed_batch_size: int = 64,
+                 upsert_batch_size: int = 256, max_concurrency: int = 4):
+        self.qdrant_manager = qdrant_manager
+        self.chunk_chars = chunk_chars
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.max_concurrency = max_concurrency
+
+    def ingest(self, collection_name: str, lines, document_key: str) -> IngestStats:
+        """
+        Embed and store `lines` (any iterable, consumed lazily) in `collection_name`.
+        `document_key` identifies the source document and keeps point ids stable
+        across retries.
+        """
+        stats = IngestStats()
+        start = time.perf_counter()
+
+        if not self.qdrant_manager.has_storage(collection_name):
+            self.qdrant_manager.create_collection(collection_name)
+
+        next_index = 0
+        pending_texts, pending_embeddings = [], []
+        in_flight = deque()
+
+        def collect_oldest():
+            nonlocal next_index
+            texts, future = in_flight.popleft()
+            pending_texts.extend(texts)
+            pending_embeddings.extend(future.result())
+
+            while len(pending_texts) >= self.upsert_batch_size:
+                next_index = self._upsert(collection_name, pending_texts, pending_embeddings,
+                                          self.upsert_batch_size, document_key, next_index, stats)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            for batch in self._batches(self._chunks(lines, stats), self.embed_batch_size):
+                in_flight.append((batch, pool.submit(self.qdrant_manager.embed_texts, batch)))
+                stats.embed_batches += 1
+
+                # Bound the number of outstanding batches so a large PDF isn't
+                # buffered in memory ahead of the embedder
+                if len(in_flight) >= self.max_concurrency:
+                    collect_oldest()
+
+            while in_flight:
+                collect_oldest()
+
+        if pending_texts:
+            self._upsert(collection_name, pending_texts, pending_embeddings,
+                         len(pending_texts), document_key, next_index, stats)
+
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def _upsert(self, collection_name, texts, embeddings, count, document_key, next_index, stats) -> int:
+        self.qdrant_manager.add_pdf_chunks(collection_name, texts[:count], embeddings[:count],
+                                           document_key, next_index)
+        del texts[:count]
+        del embeddings[:count]
+        stats.upsert_batches += 1
+        return next_index + count
+
+    def _chunks(self, lines, stats):
+        chunk, size = [], 0
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            stats.lines += 1
+
+            if chunk and size + len(line) + 1 > self.chunk_chars:
+                stats.chunks += 1
+                yield "\n".join(chunk)
+                chunk, size = [], 0
+
+            chunk.append(line)
+            size += len(line) + 1
+
+        if chunk:
+            stats.chunks += 1
+            yield "\n".join(chunk)
+
+    @staticmethod
+    def _batches(items, size):
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
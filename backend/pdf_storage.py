@@ -0,0 +1,102 @@
+"""
+Binary PDF storage in GridFS.
+
+Uploads are copied into the "pdfs" bucket a chunk at a time, so a file never
+has to fit in memory or in a single 16 MB Mongo document. Each file is stored
+under the id of its `pdf_documents` record, with the SHA-256 of its content
+saved alongside for use as an ETag.
+"""
+import hashlib
+from urllib.parse import quote
+
+from gridfs import GridFSBucket
+from gridfs.errors import NoFile
+
+BUCKET_NAME = "pdfs"
+
+# GridFS default chunk size, also used for reads when streaming a file out
+CHUNK_SIZE = 255 * 1024
+
+
+class PdfStorage:
+    def __init__(self, database, bucket_name: str = BUCKET_NAME, chunk_size: int = CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.bucket = GridFSBucket(database, bucket_name=bucket_name, chunk_size_bytes=chunk_size)
+
+    def save(self, file_id, fileobj, filename: str, metadata: dict = None) -> dict:
+        """Copy `fileobj` into GridFS under `file_id`. Returns its size and SHA-256."""
+        digest = hashlib.sha256()
+        size = 0
+        with self.bucket.open_upload_stream_with_id(file_id, filename, metadata=metadata) as stream:
+            while True:
+                chunk = fileobj.read(self.chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                stream.write(chunk)
+                size += len(chunk)
+            # Saved on the files document when the stream closes
+            stream.sha256 = digest.hexdigest()
+        return {"size": size, "sha256": digest.hexdigest()}
+
+    def open(self, file_id):
+        """GridOut for the file, or None if it isn't stored in GridFS."""
+        try:
+            return self.bucket.open_download_stream(file_id)
+        except NoFile:
+            return None
+
+    def delete(self, file_id) -> bool:
+        try:
+            self.bucket.delete(file_id)
+            return True
+        except NoFile:
+            return False
+
+
+def parse_range(header: str, size: int):
+    """
+    (start, end) for a single-range `Range: bytes=...` header, end inclusive.
+    Returns None when the header should be ignored and raises ValueError when
+    the range can't be satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range, the last N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        raise ValueError(f"Range not satisfiable for {size} bytes")
+    return start, min(end, size - 1)
+
+
+def content_disposition(filename: str, disposition: str = "inline") -> str:
+    """
+    Content-Disposition header value for `filename`. Headers are latin-1, so
+    the plain `filename=` is an ASCII fallback and the real name is sent
+    percent-encoded as `filename*=` (RFC 6266 / RFC 5987).
+    """
+    fallback = filename.encode("ascii", "replace").decode("ascii")
+    fallback = "".join("_" if char in '"\\?' or ord(char) < 32 else char for char in fallback)
+    return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def iter_file(fileobj, start: int, end: int, chunk_size: int = CHUNK_SIZE):
+    """Yield bytes start..end (inclusive) of a seekable file."""
+    fileobj.seek(start)
+    remaining = end - start + 1
+    while remaining > 0:
+        chunk = fileobj.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
@@ -0,0 +1,142 @@
+"""
+Where a meeting's points live in Qdrant.
+
+`PerMeetingLayout` is the original layout: one collection per meeting, named
+by the meeting id. `SharedLayout` keeps every meeting in one collection and
+tags each point with its tenant keys (`meeting_id`, `team_id`,
+`department_id`) and its `source`. The tenant keys are indexed keyword
+fields, so per-meeting reads are filtered scans of the meeting's points, and
+one filtered search can span a team or a department. QdrantManager methods
+take the meeting id either way; the layout turns it into a collection name,
+a filter and the extra payload to write.
+"""
+from collections import OrderedDict
+import threading
+
+from qdrant_client.http.models import (
+    FieldCondition, Filter, KeywordIndexParams, MatchAny, MatchValue, PayloadSchemaType,
+)
+
+SHARED_COLLECTION = "meetings"
+
+TRANSCRIPT = "transcript"
+PDF = "pdf"
+
+
+def _filter(conditions) -> Filter:
+    conditions = [condition for condition in conditions if condition is not None]
+    return Filter(must=conditions) if conditions else None
+
+
+class PerMeetingLayout:
+    shared = False
+
+    def collection(self, meeting_id: str) -> str:
+        return meeting_id
+
+    def filter(self, meeting_id: str, *conditions) -> Filter:
+        return _filter(conditions)
+
+    def payload(self, meeting_id: str, source: str, payload: dict) -> dict:
+        return {**payload, "source": source}
+
+
+class SharedLayout:
+    shared = True
+
+    def __init__(self, tenant_resolver, collection_name: str = SHARED_COLLECTION):
+        self.tenant_resolver = tenant_resolver
+        self.collection_name = collection_name
+
+    def collection(self, meeting_id: str) -> str:
+        return self.collection_name
+
+    def filter(self, meeting_id: str, *conditions) -> Filter:
+        return _filter([FieldCondition(key="meeting_id", match=MatchValue(value=meeting_id)), *conditions])
+
+    def payload(self, meeting_id: str, source: str, payload: dict) -> dict:
+        return {**payload, **self.tenant_resolver.resolve(meeting_id), "source": source}
+
+    def scope_filter(self, team_id: str = None, department_id: str = None, meeting_ids: list = None,
+                     source: str = None) -> Filter:
+        """Filter for a cross-meeting query. At least one scope must be given."""
+        conditions = []
+        if meeting_ids:
+            conditions.append(FieldCondition(key="meeting_id", match=MatchAny(any=list(meeting_ids))))
+        if team_id:
+            conditions.append(FieldCondition(key="team_id", match=MatchValue(value=team_id)))
+        if department_id:
+            conditions.append(FieldCondition(key="department_id", match=MatchValue(value=department_id)))
+        if not conditions:
+            raise ValueError("A team, department or meeting list is required")
+        if source:
+            conditions.append(FieldCondition(key="source", match=MatchValue(value=source)))
+        return Filter(must=conditions)
+
+    def hnsw_overrides(self, m: int) -> dict:
+        # No global graph; Qdrant builds one per tenant value instead, which is
+        # what filtered search on meeting_id or team_id uses
+        return {"m": 0, "payload_m": m}
+
+    def payload_indexes(self) -> list:
+        return [
+            # is_tenant co-locates each meeting's points on disk
+            ("meeting_id", KeywordIndexParams(type="keyword", is_tenant=True)),
+            ("team_id", KeywordIndexParams(type="keyword")),
+            ("department_id", KeywordIndexParams(type="keyword")),
+            ("source", PayloadSchemaType.KEYWORD),
+            ("start_time", PayloadSchemaType.FLOAT),
+            ("ingested_at", PayloadSchemaType.FLOAT),
+        ]
+
+
+class TenantResolver:
+    """
+    Team and department of a meeting, read through `lookup(meeting_id)` and
+    kept in an LRU. A meeting never moves between teams, so entries don't
+    expire; unknown meetings resolve to None keys and are not remembered.
+    """
+
+    def __init__(self, lookup, max_entries: int = 10000):
+        self.lookup = lookup
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, meeting_id: str) -> dict:
+        with self._lock:
+            tenant = self._entries.get(meeting_id)
+            if tenant is not None:
+                self._entries.move_to_end(meeting_id)
+                return tenant
+
+        team_id, department_id = self.lookup(meeting_id)
+        tenant = {"meeting_id": meeting_id, "team_id": team_id, "department_id": department_id}
+        if team_id is not None:
+            with self._lock:
+                self._entries[meeting_id] = tenant
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return tenant
+
+
+def mongo_tenant_lookup(database):
+    """`lookup` for TenantResolver that reads the meeting and its team from Mongo."""
+    from bson import ObjectId
+    from bson.errors import InvalidId
+
+    def lookup(meeting_id: str):
+        try:
+            meeting = database["meetings"].find_one({"_id": ObjectId(meeting_id)}, {"teamId": 1})
+        except InvalidId:
+            return None, None
+        if not meeting or not meeting.get("teamId"):
+            return None, None
+        team_id = meeting["teamId"]
+        try:
+            team = database["teams"].find_one({"_id": ObjectId(team_id)}, {"departmentId": 1})
+        except InvalidId:
+            team = None
+        return team_id, (team or {}).get("departmentId")
+
+    return lookup
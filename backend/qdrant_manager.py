@@ -1,159 +1,645 @@
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import VectorParams, PointStruct, Distance
+from qdrant_client.http.models import PointStruct, FieldCondition, Range, MatchValue, PayloadSchemaType, FilterSelector, OrderBy
 import google.generativeai as genai
+from llm import gateway, INTERACTIVE, BACKGROUND
+from concept_graph import link_segments, extract_concept_graph
+from context_packing import ContextPacker
+from answer_cache import AnswerCache, CachedAnswer
+from qdrant_layout import PerMeetingLayout, SharedLayout, SHARED_COLLECTION, TRANSCRIPT, PDF
+from collection_profiles import get_profile
+from embeddings import GeminiEmbedder
 import os
+import threading
+import time
+import uuid
 
 # Environment setup
 # os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+# Namespace for deterministic point ids, see point_id()
+POINT_ID_NAMESPACE = uuid.UUID("6f1c3a52-8d0e-4b7a-9c55-2e4f0b9d7a13")
+
+# Length in seconds of the transcript slot handed out per segment
+SEGMENT_SECONDS = 10
+
+CHAT_MODEL = "gemini-1.5-flash"
+NO_CONTEXT_REPLY = "No relevant context found. How can I help you?"
+
+
+def point_id(collection_name: str, *parts) -> str:
+    """
+    Deterministic UUID for a point, derived from its collection and content key.
+
+    Ids need no read from Qdrant, concurrent writers can't collide unless they
+    write the same content (in which case overwriting is the right outcome),
+    and retrying a write replaces the point instead of duplicating it.
+    """
+    key = "\x1f".join([collection_name, *(str(part) for part in parts)])
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, key))
+
+
+class SegmentClock:
+    """
+    Hands out consecutive transcript time slots per collection.
+
+    The clock for a collection is seeded once from the segments already stored
+    and then advanced in memory under a lock, so concurrent writers each get
+    their own slot without reading the collection on every insert.
+    """
+
+    def __init__(self, seed_fn, step: int = SEGMENT_SECONDS):
+        self.seed_fn = seed_fn
+        self.step = step
+        self._next_start = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, collection_name: str) -> int:
+        with self._lock:
+            if collection_name not in self._next_start:
+                self._next_start[collection_name] = self.seed_fn(collection_name)
+
+            start_time = self._next_start[collection_name]
+            self._next_start[collection_name] = start_time + self.step
+            return start_time
+
+    def advance(self, collection_name: str, end_time: float):
+        """Make slots handed out from now on start no earlier than `end_time`."""
+        with self._lock:
+            if collection_name in self._next_start:
+                self._next_start[collection_name] = max(self._next_start[collection_name], end_time)
+
+    def reset(self, collection_name: str):
+        with self._lock:
+            self._next_start.pop(collection_name, None)
+
+
+def is_not_found(error: Exception) -> bool:
+    """Whether a Qdrant call failed because the collection doesn't exist."""
+    return getattr(error, "status_code", None) == 404 or "not found" in str(error).lower()
+
+
+class CollectionRegistry:
+    """
+    Cache of collection existence and config.
+
+    `get_collection` is a full HTTP request, so the result is kept for `ttl`
+    seconds. Missing collections are only remembered for `missing_ttl` seconds
+    in case another worker creates them. Deletes through QdrantManager
+    invalidate the entry, and writes that find the collection gone do too.
+    """
+
+    def __init__(self, client, ttl: float = 300.0, missing_ttl: float = 5.0):
+        self.client = client
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, collection_name: str):
+        """Return the collection's info, or None if it doesn't exist."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(collection_name)
+        if entry and entry[1] > now:
+            return entry[0]
+
+        try:
+            info = self.client.get_collection(collection_name)
+        except Exception:
+            info = None
+
+        expires_at = now + (self.ttl if info is not None else self.missing_ttl)
+        with self._lock:
+            self._entries[collection_name] = (info, expires_at)
+        return info
+
+    def invalidate(self, collection_name: str):
+        with self._lock:
+            self._entries.pop(collection_name, None)
+
+
 class QdrantManager:
-    def __init__(self, qdrant_api_key: str, google_api_key: str, host="localhost", port=6333):
-        if host == "localhost": 
+    def __init__(self, qdrant_api_key: str, google_api_key: str, host="localhost", port=6333, client: QdrantClient = None, embed_fn=None,
+                 storage: str = "per_meeting", tenant_resolver=None, shared_collection: str = SHARED_COLLECTION,
+                 profile: str = None, vector_size: int = None):
+        if client is not None:
+            self.client = client
+        elif host == "localhost": 
             self.client = QdrantClient(url=host, port=port)
         else:
             self.client = QdrantClient(url=host, port=port, api_key=qdrant_api_key)
 
+        # Takes a list of texts and returns one embedding per text, see embeddings
+        self.embed_fn = embed_fn or GeminiEmbedder()
+        # Size of new collections' vectors, which must match the embedder's
+        self.vector_size = vector_size or getattr(self.embed_fn, "dimension", 768)
+
+        # "per_meeting": a collection per meeting; "shared": one collection, see qdrant_layout
+        if storage == "shared":
+            self.layout = SharedLayout(tenant_resolver, shared_collection)
+        elif storage == "per_meeting":
+            self.layout = PerMeetingLayout()
+        else:
+            raise ValueError(f"Unknown Qdrant storage mode '{storage}'")
+
+        # Vector storage, quantization and HNSW settings for new collections and searches
+        self.profile = get_profile(profile)
+
+        self.segment_clock = SegmentClock(self.get_last_end_time)
+        self.collections = CollectionRegistry(self.client)
+
+        # Transcript windows processed at once when building a concept graph
+        self.graph_concurrency = int(os.getenv("CONCEPT_GRAPH_CONCURRENCY", 4))
+
+        # Dedupes and trims chat search results to fit the prompt budget
+        self.context_packer = ContextPacker(
+            token_budget=int(os.getenv("CHAT_CONTEXT_TOKENS", 2000)),
+            mmr_lambda=float(os.getenv("CHAT_CONTEXT_MMR_LAMBDA", 0.7)),
+        )
+
+        # Answers to questions already asked of a meeting, matched by embedding
+        self.answer_cache = AnswerCache(
+            similarity=float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.93)),
+            ttl=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", 3600)),
+        )
+
         # Configure Gemini
         genai.configure(api_key=google_api_key)
     
     def collection_exists(self, collection_name: str) -> bool:
-        try:
-            self.client.get_collection(collection_name)
-            return True
-        except Exception:
+        """
+        Whether a meeting has a collection. In the shared layout that means it
+        has at least one point there, since the collection itself always exists.
+        """
+        if not self.has_storage(collection_name):
             return False
+        if not self.layout.shared:
+            return True
+        return self.client.count(
+            self.layout.collection(collection_name),
+            count_filter=self.layout.filter(collection_name),
+            exact=False,
+        ).count > 0
+
+    def has_storage(self, collection_name: str) -> bool:
+        """Whether the Qdrant collection a meeting's points are written to exists."""
+        return self.collections.get(self.layout.collection(collection_name)) is not None
+
+    def collection_info(self, collection_name: str):
+        return self.collections.get(self.layout.collection(collection_name))
+
+    def create_collection(self, collection_name, vector_size=None):
+        vector_size = vector_size or self.vector_size
+        if self.layout.shared:
+            # Meetings need no setup of their own, only the shared collection
+            self.ensure_shared_collection(vector_size)
+            return
 
-    def create_collection(self, collection_name, vector_size=768):
-        if self.collection_exists(collection_name):
+        # Asks Qdrant rather than the registry, which may not have seen a delete made elsewhere
+        self.collections.invalidate(collection_name)
+        if self.client.collection_exists(collection_name):
             print(f"Collection '{collection_name}' already exists")
             return
 
         self.client.create_collection(
             collection_name=collection_name,
-            vectors_config=VectorParams(
-                size=vector_size,
-                distance=Distance.COSINE
-            )
+            **self.profile.create_args(vector_size),
         )
+        # Lets live transcript readers fetch only segments newer than they've seen
+        self.client.create_payload_index(collection_name, "start_time", PayloadSchemaType.FLOAT)
+        # And transcript_revision find the latest write
+        self.client.create_payload_index(collection_name, "ingested_at", PayloadSchemaType.FLOAT)
+        self.collections.invalidate(collection_name)
+
+    def ensure_shared_collection(self, vector_size=None):
+        """Create the shared collection and its payload indexes if they don't exist yet."""
+        vector_size = vector_size or self.vector_size
+        name = self.layout.collection_name
+        if self.collections.get(name) is not None:
+            return
+
+        try:
+            self.client.create_collection(
+                collection_name=name,
+                **self.profile.create_args(vector_size, **self.layout.hnsw_overrides(self.profile.m)),
+            )
+        except Exception as e:
+            # Another worker may have created it first
+            print(f"Shared collection '{name}' not created: {e}")
+        for field_name, schema in self.layout.payload_indexes():
+            self.client.create_payload_index(name, field_name, schema)
+        self.collections.invalidate(name)
+
+    def apply_profile(self, physical_name: str):
+        """Move an existing collection (by its Qdrant name) to the current profile. Qdrant rebuilds in the background."""
+        overrides = self.layout.hnsw_overrides(self.profile.m) if self.layout.shared and physical_name == self.layout.collection_name else {}
+        self.client.update_collection(physical_name, **self.profile.update_args(**overrides))
+        self.collections.invalidate(physical_name)
 
     def delete_collection(self, collection_name):
         if not self.collection_exists(collection_name):
             raise ValueError(f"Collection '{collection_name}' does not exist")
         
-        self.client.delete_collection(collection_name)
+        if self.layout.shared:
+            # Only this meeting's points
+            self.client.delete(
+                self.layout.collection(collection_name),
+                points_selector=FilterSelector(filter=self.layout.filter(collection_name)),
+            )
+        else:
+            self.client.delete_collection(collection_name)
+            self.collections.invalidate(collection_name)
+        self.answer_cache.invalidate(collection_name)
+        self.segment_clock.reset(collection_name)
     
-    def get_next_id(self, collection_name: str) -> int:
+    def embed_texts(self, texts: list) -> list:
+        return self.embed_fn(list(texts))
+
+    def embed_text(self, text: str) -> list:
+        return self.embed_texts([text])[0]
+
+    def get_last_end_time(self, collection_name: str) -> int:
+        return self.transcript_position(collection_name)["end_time"]
+
+    def transcript_position(self, collection_name: str) -> dict:
+        """
+        End time of the last transcript segment and the first unused sequence
+        number, for a writer (re)starting a meeting's transcript. Reads every
+        segment's payload, so it's only for seeding, not per write.
+        """
+        position = {"end_time": 0, "seq": 0}
+        next_offset = None
         try:
-            response = self.client.count(collection_name)
-            return response.count if response.count else 0
+            while True:
+                points, next_offset = self.client.scroll(
+                    collection_name=self.layout.collection(collection_name),
+                    scroll_filter=self.layout.filter(collection_name),
+                    limit=1000,
+                    with_payload=["end_time", "seq"],
+                    with_vectors=False,
+                    offset=next_offset
+                )
+                for point in points:
+                    position["end_time"] = max(position["end_time"], point.payload.get("end_time", 0))
+                    if point.payload.get("seq") is not None:
+                        position["seq"] = max(position["seq"], point.payload["seq"] + 1)
+
+                if next_offset is None:
+                    return position
         except Exception as e:
-            return 0
+            print(f"Error reading transcript position: {e}")
+            return position
 
-    def add_text(self, collection_name: str, text: str):
-        if not self.collection_exists(collection_name):
+    def add_text(self, collection_name: str, text: str, start_time: float = None, end_time: float = None, seq: int = None):
+        """
+        Add one transcript segment. Without times it gets the next
+        SEGMENT_SECONDS slot of the segment clock.
+        """
+        if not self.has_storage(collection_name):
             raise ValueError(f"Collection '{collection_name}' does not exist")
 
-        # Encode text
-        embedding_response = genai.embed_content(
-            model="models/text-embedding-004",
-            content=text,
-        )
+        if start_time is None:
+            start_time = self.segment_clock.reserve(collection_name)
+            end_time = start_time + SEGMENT_SECONDS
+        elif end_time is None:
+            end_time = start_time + SEGMENT_SECONDS
+        return self.add_segments(collection_name, [
+            {"text": text, "start_time": start_time, "end_time": end_time, "seq": seq},
+        ])[0]
 
-        embedding = embedding_response['embedding']
-
-        next_id = self.get_next_id(collection_name)
+    def add_segments(self, collection_name: str, segments: list, embeddings: list = None) -> list:
+        """
+        Upsert transcript segments (dicts with text, start_time, end_time and
+        optionally seq), creating the meeting's collection if needed. Returns
+        the segments as get_transcriptions lists them.
+        """
+        if embeddings is None:
+            embeddings = self.embed_texts([segment["text"] for segment in segments])
+        written = self.add_segment_groups({collection_name: (segments, embeddings)})[collection_name]
+        if isinstance(written, Exception):
+            raise written
+        return written
+
+    def add_segment_groups(self, groups: dict) -> dict:
+        """
+        add_segments for several meetings, `{meeting_id: (segments, embeddings)}`,
+        with one upsert per Qdrant collection: one per meeting normally, one in
+        all with shared storage. A segment's id comes from its sequence number,
+        or its start time and text without one, so retrying a write overwrites
+        the points it made instead of duplicating them. Returns each meeting's
+        written segments, or the exception that failed them.
+        """
+        results, upserts = {}, {}
+        for collection_name, (segments, embeddings) in groups.items():
+            try:
+                if not self.has_storage(collection_name):
+                    self.create_collection(collection_name)
+
+                points, written = [], []
+                ingested_at = time.time()
+                for segment, embedding in zip(segments, embeddings):
+                    seq = segment.get("seq")
+                    payload = {"text": segment["text"], "start_time": segment["start_time"], "end_time": segment["end_time"],
+                               "ingested_at": ingested_at}
+                    if seq is not None:
+                        segment_id = point_id(collection_name, "transcript", "seq", seq)
+                        payload["seq"] = seq
+                    else:
+                        segment_id = point_id(collection_name, "transcript", segment["start_time"], segment["text"])
+                    points.append(PointStruct(
+                        id=segment_id, vector=embedding,
+                        payload=self.layout.payload(collection_name, TRANSCRIPT, payload),
+                    ))
+                    written.append({"id": segment_id, "text": segment["text"], "start_time": segment["start_time"],
+                                    "end_time": segment["end_time"]})
+            except Exception as e:
+                print(f"Error preparing transcript segments of {collection_name}: {e}")
+                results[collection_name] = e
+                continue
+            upserts.setdefault(self.layout.collection(collection_name), []).append((collection_name, points, written))
 
-        self.client.upsert(
-            collection_name=collection_name,
-            points=[
-                PointStruct(
-                    id=next_id,
-                    vector=embedding,
-                    payload={"text": text, "start_time": next_id * 10, "end_time": (next_id + 1) * 10},
-                )
-            ]
-        )
+        for physical_name, entries in upserts.items():
+            try:
+                self.client.upsert(collection_name=physical_name, points=[
+                    point for _, points, _ in entries for point in points
+                ])
+            except Exception as e:
+                print(f"Error writing transcript segments to {physical_name}: {e}")
+                if is_not_found(e):
+                    # Deleted since the registry saw it; the next write recreates it
+                    self.collections.invalidate(physical_name)
+                for collection_name, _, _ in entries:
+                    results[collection_name] = e
+                continue
+            for collection_name, _, written in entries:
+                # Keep clock-timed segments (add_text without times) after these
+                self.segment_clock.advance(collection_name, max(segment["end_time"] for segment in written))
+                results[collection_name] = written
+        return results
     
-    def add_text_pdf(self, collection_name: str, text: str):
-        if not self.collection_exists(collection_name):
+    def add_text_pdf(self, collection_name: str, text: str, document_key: str, index: int):
+        """
+        Add one line of a PDF, the `index`th of the document `document_key`.
+        Like add_pdf_chunks, ids come from the document and the line's position,
+        so repeated lines are all kept and re-adding a document overwrites it.
+        """
+        if not self.has_storage(collection_name):
             # raise ValueError(f"Collection '{collection_name}' does not exist")
             self.create_collection(collection_name)
-        
-        print("Printed")
 
         # Encode text
-        embedding_response = genai.embed_content(
-            model="models/text-embedding-004",
-            content=text,
-        )
-
-        embedding = embedding_response['embedding']
-
-        next_id = self.get_next_id(collection_name)
+        embedding = self.embed_text(text)
 
         self.client.upsert(
-            collection_name=collection_name,
+            collection_name=self.layout.collection(collection_name),
             points=[
                 PointStruct(
-                    id=next_id,
+                    id=point_id(collection_name, "pdf", document_key, "line", index),
                     vector=embedding,
-                    payload={"text": text, "isPDF": True},
+                    payload=self.layout.payload(
+                        collection_name, PDF, {"text": text, "isPDF": True, "document_key": document_key},
+                    ),
                 )
             ]
         )
 
-    def search_similar(self, collection_name, prompt, limit: int = 30, similarity_threshold: float = 0.2):
-        # Get embedding
-        embedding_response = genai.embed_content(
-            model="models/text-embedding-004",
-            content=prompt
+    def add_pdf_chunks(self, collection_name: str, texts: list, embeddings: list, document_key: str, start_index: int):
+        """
+        Upsert already-embedded PDF chunks as one batch. Chunk ids are derived from
+        the document and the chunk's position in it, so re-ingesting the same
+        document overwrites its points instead of duplicating them. The key is
+        also stored with each chunk, for delete_pdf_points.
+        """
+        try:
+            self.client.upsert(
+                collection_name=self.layout.collection(collection_name),
+                points=[
+                    PointStruct(
+                        id=point_id(collection_name, "pdf", document_key, start_index + i),
+                        vector=embedding,
+                        payload=self.layout.payload(
+                            collection_name, PDF, {"text": text, "isPDF": True, "document_key": document_key},
+                        ),
+                    )
+                    for i, (text, embedding) in enumerate(zip(texts, embeddings))
+                ]
+            )
+        except Exception as e:
+            if is_not_found(e):
+                self.collections.invalidate(self.layout.collection(collection_name))
+            raise
+
+    def delete_pdf_points(self, collection_name: str, document_key: str):
+        """
+        Delete a PDF's chunks (by the key they were added with). Changes
+        points_version, which cached answers are keyed on, and drops them too.
+        Chunks ingested before the key was stored with them aren't found.
+        """
+        self.client.delete(
+            self.layout.collection(collection_name),
+            points_selector=FilterSelector(filter=self.layout.filter(
+                collection_name, FieldCondition(key="document_key", match=MatchValue(value=document_key)),
+            )),
+            wait=True,
         )
+        self.answer_cache.invalidate(collection_name)
 
-        # Access the values directly from the embedding response
-        embedding = embedding_response['embedding']
+    def transcript_version(self, collection_name: str) -> int:
+        """
+        Number of transcript segments in a collection. Segments are added, or
+        rewritten in place when a seq is sent again, so this grows with new
+        segments but does not change when one is rewritten.
+        """
+        return self.client.count(
+            self.layout.collection(collection_name),
+            count_filter=self.layout.filter(collection_name, FieldCondition(key="start_time", range=Range(gte=0))),
+            exact=True,
+        ).count
 
-        results = self.client.search(
-            collection_name=collection_name,
-            query_vector=embedding,
-            limit=limit,
-            with_payload=True, 
-            score_threshold=similarity_threshold # Gets results with score >= similarity_threshold
-        )
+    def transcript_revision(self, collection_name: str) -> str:
+        """
+        Changes whenever a collection's transcript does, including a segment
+        rewritten with new text: its segment count and the time of its latest
+        segment write. Costs a count and a one-point read.
+        """
+        physical_name = self.layout.collection(collection_name)
+        order_by = OrderBy(key="ingested_at", direction="desc")
+        try:
+            latest, _ = self.client.scroll(physical_name, scroll_filter=self.layout.filter(collection_name),
+                                           limit=1, order_by=order_by, with_payload=["ingested_at"])
+        except Exception as e:
+            # Collections created before segments had the field need its index to order by it
+            print(f"Adding ingested_at index to '{physical_name}': {e}")
+            self.client.create_payload_index(physical_name, "ingested_at", PayloadSchemaType.FLOAT)
+            latest, _ = self.client.scroll(physical_name, scroll_filter=self.layout.filter(collection_name),
+                                           limit=1, order_by=order_by, with_payload=["ingested_at"])
+        ingested_at = latest[0].payload.get("ingested_at") if latest else None
+        return f"{self.transcript_version(collection_name)}:{ingested_at}"
+
+    def points_version(self, collection_name: str) -> int:
+        """
+        Number of points in a collection, transcript and PDF alike. Changes
+        whenever points are added or removed.
+        """
+        return self.client.count(
+            self.layout.collection(collection_name),
+            count_filter=self.layout.filter(collection_name),
+            exact=True,
+        ).count
+
+    def search_similar(self, collection_name, prompt, limit: int = 30, similarity_threshold: float = 0.2, with_vectors: bool = False, embedding: list = None):
+        # Get embedding
+        if embedding is None:
+            embedding = self.embed_text(prompt)
+
+        try:
+            results = self.client.search(
+                collection_name=self.layout.collection(collection_name),
+                query_vector=embedding,
+                query_filter=self.layout.filter(collection_name),
+                search_params=self.profile.search_params(),
+                limit=limit,
+                with_payload=True, 
+                with_vectors=with_vectors,
+                score_threshold=similarity_threshold # Gets results with score >= similarity_threshold
+            )
+        except Exception:
+            # The collection may have been deleted since it was cached
+            self.collections.invalidate(self.layout.collection(collection_name))
+            raise
 
         return results
 
 
-    def chat(self, collection_name: str, prompt: str, conversation_history: list = []):
+    def search_meetings(self, prompt: str, team_id: str = None, department_id: str = None, meeting_ids: list = None,
+                        limit: int = 10, similarity_threshold: float = 0.2):
+        """
+        Search across meetings: a team's, a department's or a given list. The
+        shared layout answers with one filtered search; with a collection per
+        meeting, `meeting_ids` is required and each collection is searched.
+        """
+        embedding = self.embed_text(prompt)
+
+        if self.layout.shared:
+            results = self.client.search(
+                collection_name=self.layout.collection_name,
+                query_vector=embedding,
+                query_filter=self.layout.scope_filter(team_id, department_id, meeting_ids),
+                search_params=self.profile.search_params(),
+                limit=limit,
+                with_payload=True,
+                score_threshold=similarity_threshold,
+            )
+            hits = [(result.payload.get("meeting_id"), result) for result in results]
+        else:
+            if not meeting_ids:
+                raise ValueError("meeting_ids is required when each meeting has its own collection")
+            hits = []
+            for meeting_id in meeting_ids:
+                if not self.collection_exists(meeting_id):
+                    continue
+                for result in self.search_similar(meeting_id, prompt, limit=limit,
+                                                  similarity_threshold=similarity_threshold, embedding=embedding):
+                    hits.append((meeting_id, result))
+            hits.sort(key=lambda hit: -hit[1].score)
+            hits = hits[:limit]
+
+        return [{"meeting_id": meeting_id, **self.citations([result])[0]} for meeting_id, result in hits]
+
+    def chat_context(self, collection_name: str, prompt: str, conversation_history: list = [], embedding: list = None):
+        """
+        Retrieve context for a chat message. Returns the results packed into the
+        context and the model input built from them, or (results, None) if
+        nothing relevant was found.
+        """
         if not self.collection_exists(collection_name):
             print(f"Collection '{collection_name}' does not exist")
             raise ValueError(f"Collection '{collection_name}' does not exist")
 
-        results = self.search_similar(collection_name, prompt, similarity_threshold=0.2)
-        print(results)
+        # Vectors come back too, for the packer's near-duplicate check
+        results = self.search_similar(collection_name, prompt, similarity_threshold=0.2, with_vectors=True, embedding=embedding)
 
         if not results:
-            return "No relevant context found. How can I help you?"
+            return results, None
 
         history_context = "\n".join(conversation_history[-6:])
 
-        combined_text = ""
-
-        for result in results:
-            if 'isPDF' in result.payload:
-                combined_text += f"From PDF: {result.payload['text']}\n"
-            else:
-                combined_text += f"From Transcription: {result.payload['start_time']} - {result.payload['end_time']}: {result.payload['text']}\n"
+        results, combined_text = self.context_packer.pack(results)
 
         input_text = f"""Previous Conversation:\n{history_context}\n\nContext: {combined_text}\n\nUser: {prompt}\n"""
+        return results, input_text
+
+    @staticmethod
+    def citations(results) -> list:
+        """Client-facing description of the context a chat answer was built from."""
+        return [
+            {
+                "id": str(result.id),
+                "source": "pdf" if 'isPDF' in result.payload else "transcription",
+                "start_time": result.payload.get("start_time"),
+                "end_time": result.payload.get("end_time"),
+                "text": result.payload.get("text", "")[:200],
+                "score": result.score,
+            }
+            for result in results
+        ]
+
+    def cached_answer(self, collection_name: str, prompt: str, conversation_history: list = []):
+        """
+        Look for a cached answer to a question like `prompt`. Returns the
+        CachedAnswer or None, and a lookup to pass on to `chat_context` and
+        `remember_answer` so the prompt isn't embedded twice. Follow-up
+        questions (with history) are never cached.
+        """
+        if not self.collection_exists(collection_name):
+            print(f"Collection '{collection_name}' does not exist")
+            raise ValueError(f"Collection '{collection_name}' does not exist")
+
+        embedding = self.embed_text(prompt)
+        if conversation_history:
+            return None, (embedding, None, time.perf_counter())
+
+        version = self.points_version(collection_name)
+        cached = self.answer_cache.lookup(collection_name, version, embedding)
+        return cached, (embedding, version, time.perf_counter())
+
+    def remember_answer(self, collection_name: str, lookup, prompt: str, answer: str, citations: list):
+        embedding, version, started = lookup
+        if version is None:
+            return
+        cost = time.perf_counter() - started
+        self.answer_cache.store(collection_name, version, embedding, CachedAnswer(prompt, answer, citations, cost))
+
+    def chat(self, collection_name: str, prompt: str, conversation_history: list = []):
+        cached, lookup = self.cached_answer(collection_name, prompt, conversation_history)
+        if cached is not None:
+            return cached.answer
 
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        result = model.generate_content(input_text)
+        results, input_text = self.chat_context(collection_name, prompt, conversation_history, embedding=lookup[0])
+        if input_text is None:
+            return NO_CONTEXT_REPLY
+
+        result = gateway.generate(input_text, CHAT_MODEL, priority=INTERACTIVE)
+        self.remember_answer(collection_name, lookup, prompt, result.text, self.citations(results))
         return result.text
 
-    def get_transcriptions(self, collection_name: str):
+    def chat_stream(self, input_text: str, cancel=None):
+        """Yield the answer to a `chat_context` input as text chunks arrive from the model."""
+        yield from gateway.stream(input_text, CHAT_MODEL, priority=INTERACTIVE, cancel=cancel)
+
+    def get_transcriptions(self, collection_name: str, start_time_from: float = None):
+        """
+        Return the transcript segments of a collection ordered by start time.
+        With `start_time_from`, only segments starting at or after it are read.
+        """
         if not self.collection_exists(collection_name):
             raise ValueError(f"Collection '{collection_name}' does not exist")
 
+        since = None
+        if start_time_from is not None:
+            since = FieldCondition(key="start_time", range=Range(gte=start_time_from))
+        scroll_filter = self.layout.filter(collection_name, since)
+
         try:
             all_transcriptions = []
             next_offset = None
@@ -161,11 +647,11 @@ class QdrantManager:
             while True:
                 # Fetch batch of payloads
                 scroll_result = self.client.scroll(
-                    collection_name=collection_name,
-                    scroll_filter=None, 
+                    collection_name=self.layout.collection(collection_name),
+                    scroll_filter=scroll_filter, 
                     limit=1000, 
                     with_payload=True,
-                    with_vectors=True, 
+                    with_vectors=False, 
                     offset=next_offset
                 )
 
@@ -180,6 +666,7 @@ class QdrantManager:
                         continue
                     else:
                         transcriptions.append({
+                            "id": str(point.id),
                             "text": point.payload.get("text", ""),
                             "start_time": point.payload.get("start_time", 0),
                             "end_time": point.payload.get("end_time", 0),
@@ -191,11 +678,15 @@ class QdrantManager:
                 if next_offset is None:
                     break
 
+            # Point ids are UUIDs, so scroll order isn't transcript order
+            all_transcriptions.sort(key=lambda t: t["start_time"])
+
             print(f"Total transcriptions retrieved: {len(all_transcriptions)}")
             return all_transcriptions  # Returns a list of JSON objects
 
         except Exception as e:
             print(f"Error: {e}")
+            self.collections.invalidate(self.layout.collection(collection_name))
             return []
 
 
@@ -212,8 +703,8 @@ class QdrantManager:
             while True:
                 # Fetch batch of payloads
                 scroll_result = self.client.scroll(
-                    collection_name=collection_name,
-                    scroll_filter=None,
+                    collection_name=self.layout.collection(collection_name),
+                    scroll_filter=self.layout.filter(collection_name),
                     limit=1000,
                     with_payload=True,
                     with_vectors=True,
@@ -248,13 +739,15 @@ class QdrantManager:
 
         except Exception as e:
             print(f"Error: {e}")
+            self.collections.invalidate(self.layout.collection(collection_name))
             return []
 
 
-    def generate_concept_graph(self, collection_name: str):
+    def generate_concept_graph(self, collection_name: str, transcriptions: list = None):
         """
         Generate a concept graph from transcription data.
         Returns a dictionary with 'nodes' and 'edges' representing the graph.
+        Pass `transcriptions` if the caller has already read them.
         """
         if not self.collection_exists(collection_name):
             raise ValueError(f"Collection '{collection_name}' does not exist")
@@ -262,102 +755,23 @@ class QdrantManager:
 
         try:
             # Get all transcription texts
-            transcriptions = self.get_transcriptions(collection_name)
+            if transcriptions is None:
+                transcriptions = self.get_transcriptions(collection_name)
             
             if not transcriptions:
                 return {"nodes": [], "edges": []}
             
-            # Combine all transcription texts
-            combined_text = "\n".join([t.get("text", "") for t in transcriptions])
-            
-            # If combined text is too long, truncate it
-            if len(combined_text) > 10000:
-                combined_text = combined_text[:10000]
-            
-            # Prompt for Gemini to extract concepts and relationships
-            prompt = f"""
-            Analyze the following meeting transcript and extract key concepts and their relationships.
-            
-            TRANSCRIPT:
-            {combined_text}
-            
-            Create a concept graph with the following structure:
-            1. Nodes: Identify 8 key concepts, topics, or entities from the transcript.
-            2. Edges: Identify relationships between these concepts.
-            
-            Output the result as a JSON object with the following structure:
-            {{
-                "nodes": [
-                {{
-                    "id": "unique_id_1",
-                    "text": "concept_name",
-                    "type": "concept|topic|action",
-                    "importance": number from 1-10
-                }},
-                ...
-                ],
-                "edges": [
-                {{
-                    "source": "unique_id_of_source_node",
-                    "target": "unique_id_of_target_node",
-                    "type": "related|subTopic|implies",
-                    "strength": number from 1-10
-                }},
-                ...
-                ]
-            }}
-            
-            Ensure that:
-            - Each node has a unique ID (can be a simple number)
-            - Each edge connects existing nodes by their IDs
-            - Node types are one of: "concept", "topic", or "action"
-            - Edge types are one of: "related", "subTopic", or "implies"
-            - The graph is well-connected and represents the key relationships in the transcript
-            - Only return the JSON, with no additional explanation
-            """
-            
-            # Call Gemini to generate the concept graph
-            model = genai.GenerativeModel("gemini-2.0-flash")
-            response = model.generate_content(prompt)
+            # Long transcripts are processed window by window and merged. A long
+            # meeting makes dozens of calls, so they queue behind chat, not ahead of it
+            def generate(prompt):
+                return gateway.generate(prompt, "gemini-2.0-flash", priority=BACKGROUND).text
             
             # Parse the response
             try:
-                import json
-                import re
-                
-                # Clean the response to extract just the JSON
-                content = response.text
-                
-                # Extract JSON from possible markdown or surrounding text
-                json_match = re.search(r'```(?:json)?(.*?)```', content, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(1).strip()
-                else:
-                    json_str = content
-                
-                # Remove any non-JSON text before or after
-                json_str = re.sub(r'^[^{]*', '', json_str)
-                json_str = re.sub(r'[^}]*$', '', json_str)
-                
-                concept_graph = json.loads(json_str)
-                
-                # Ensure we have the expected structure
-                if 'nodes' not in concept_graph or 'edges' not in concept_graph:
-                    raise ValueError("Invalid concept graph structure")
+                concept_graph = extract_concept_graph(transcriptions, generate, max_concurrency=self.graph_concurrency)
                 
                 # Add timestamps and text snippets to nodes from original transcriptions
-                for node in concept_graph['nodes']:
-                    # Find relevant transcription segments for this concept
-                    related_segments = []
-                    for segment in transcriptions:
-                        if node['text'].lower() in segment.get('text', '').lower():
-                            related_segments.append(segment)
-                    
-                    # Add reference to first found segment
-                    if related_segments:
-                        node['start_time'] = related_segments[0].get('start_time', 0)
-                        node['end_time'] = related_segments[0].get('end_time', 0)
-                        node['text_snippet'] = related_segments[0].get('text', '')[:100] + '...'
+                link_segments(concept_graph['nodes'], transcriptions)
                 
                 return concept_graph
                 
@@ -372,7 +786,8 @@ class QdrantManager:
                     "edges": [
                         {"source": str(i), "target": str(i+1), "type": "related", "strength": 5}
                         for i in range(min(11, len(transcriptions)-1))
-                    ]
+                    ],
+                    "fallback": True
                 }
                 
         except Exception as e:
@@ -0,0 +1,191 @@
+"""
+Read-through cache for small, frequently read API responses.
+
+Responses are cached as encoded JSON bodies under resource keys such as
+"meeting:<id>", with a strong ETag computed from the body. The first tier is
+an in-process LRU with a TTL. An optional shared backend (Redis, or
+`LocalBackend` as a stand-in) lets several workers reuse each other's
+entries; write routes invalidate the keys they affect in both tiers.
+"""
+import asyncio
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+
+from fastapi import Response
+
+from offload import run_cache
+
+
+class LocalBackend:
+    """In-process stand-in for a shared backend, with the same interface as RedisBackend."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, keys: list):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class RedisBackend:
+    def __init__(self, url: str, prefix: str = "response-cache:"):
+        # Optional dependency, only needed when a shared cache is configured
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.client.set(self.prefix + key, value, ex=max(int(ttl), 1))
+
+    def delete(self, keys: list):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+
+def make_backend(url: str = None):
+    """Shared backend for a RESPONSE_CACHE_URL: "redis://...", "local", or none."""
+    if not url:
+        return None
+    if url == "local":
+        return LocalBackend()
+    return RedisBackend(url)
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def not_modified(request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 2000, ttl: float = 300.0, backend=None, backend_ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend
+        self.backend_ttl = backend_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loads = {}
+        # Bumped by every invalidation, so a load that overlapped one isn't cached
+        self._generation = 0
+        self._counts = {"memory_hits": 0, "shared_hits": 0, "misses": 0, "invalidations": 0, "not_modified": 0}
+
+    async def respond(self, request, key: str, load) -> Response:
+        """
+        Serve `key` from the cache, or from `await load()` (a JSON-serialisable
+        value) on a miss. Answers 304 when the client's ETag still matches.
+        Errors raised by `load` are passed on and not cached.
+        """
+        body, etag = await self.get_or_load(key, load)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if not_modified(request, etag):
+            self._count("not_modified")
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def get_or_load(self, key: str, load):
+        entry = self._get_local(key)
+        if entry is not None:
+            self._count("memory_hits")
+            return entry
+
+        if self.backend is not None:
+            value = await run_cache(self.backend.get, key)
+            if value is not None:
+                etag, _, body = value.partition(b"\n")
+                entry = (body, etag.decode())
+                self._put_local(key, entry)
+                self._count("shared_hits")
+                return entry
+
+        # Concurrent misses for the same key share one load
+        task = self._loads.get(key)
+        if task is None:
+            task = self._loads[key] = asyncio.ensure_future(self._load(key, load))
+            task.add_done_callback(lambda done: self._loads.pop(key, None) if self._loads.get(key) is done else None)
+        return await asyncio.shield(task)
+
+    def invalidate(self, *keys: str):
+        """Drop `keys` from both tiers. Blocking when a shared backend is configured."""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+                # Later requests shouldn't join a load that started before this write
+                self._loads.pop(key, None)
+            self._counts["invalidations"] += len(keys)
+        if self.backend is not None:
+            self.backend.delete(list(keys))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counts["memory_hits"] + self._counts["shared_hits"] + self._counts["misses"]
+            hits = lookups - self._counts["misses"]
+            return {
+                "entries": len(self._entries),
+                "shared_backend": type(self.backend).__name__ if self.backend else None,
+                **self._counts,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+    async def _load(self, key: str, load):
+        self._count("misses")
+        generation = self._generation
+        body = json.dumps(await load(), default=str).encode("utf-8")
+        entry = (body, etag_for(body))
+        if not self._put_local(key, entry, generation):
+            return entry
+        if self.backend is not None:
+            await run_cache(self.backend.set, key, entry[1].encode() + b"\n" + body, self.backend_ttl)
+        return entry
+
+    def _get_local(self, key: str):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put_local(self, key: str, entry, generation: int = None) -> bool:
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._entries[key] = (time.monotonic() + self.ttl, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
@@ -0,0 +1,155 @@
+import asyncio
+import numbers
+import time
+
+from offload import run_ingest
+
+# Most segments one request may carry
+MAX_SEGMENTS_PER_REQUEST = 500
+
+
+def parse_segments(body) -> list:
+    """
+    Validate a POST /meetings/{id}/segments body: one segment, a list of them,
+    or {"segments": [...]}. Each segment has `text`, `start_time` and
+    `end_time` in seconds from the start of the meeting, and optionally `seq`,
+    its position in the meeting's transcript. Raises ValueError.
+    """
+    if isinstance(body, dict) and "segments" in body:
+        body = body["segments"]
+    segments = body if isinstance(body, list) else [body]
+    if not segments:
+        raise ValueError("No segments given")
+    if len(segments) > MAX_SEGMENTS_PER_REQUEST:
+        raise ValueError(f"At most {MAX_SEGMENTS_PER_REQUEST} segments per request")
+
+    parsed = []
+    for i, segment in enumerate(segments):
+        if not isinstance(segment, dict):
+            raise ValueError(f"Segment {i} is not an object")
+        text = segment.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError(f"Segment {i} has no text")
+        start_time, end_time, seq = segment.get("start_time"), segment.get("end_time"), segment.get("seq")
+        for name, value in (("start_time", start_time), ("end_time", end_time)):
+            if not isinstance(value, numbers.Real) or isinstance(value, bool) or value < 0:
+                raise ValueError(f"Segment {i} needs a non-negative number {name}")
+        if end_time < start_time:
+            raise ValueError(f"Segment {i} ends before it starts")
+        if seq is not None and (not isinstance(seq, int) or isinstance(seq, bool) or seq < 0):
+            raise ValueError(f"Segment {i} seq must be a non-negative integer")
+        parsed.append({"text": text.strip(), "start_time": start_time, "end_time": end_time, "seq": seq})
+    return parsed
+
+
+class SegmentBatcher:
+    """
+    Group commit for transcript segments.
+
+    Requests add their segments to a pending batch and wait. A single writer
+    takes everything pending, embeds it in one call and upserts it with one
+    request per Qdrant collection, then answers every request in the batch. A batch is
+    written once `max_batch` segments are pending or the oldest has waited
+    `max_wait` seconds, and segments arriving during a write go into the next
+    batch, so under load batches grow instead of requests queueing one by one.
+    """
+
+    def __init__(self, qdrant_manager, max_batch: int = 64, max_wait: float = 0.02):
+        self.qdrant_manager = qdrant_manager
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending = []
+        self._pending_segments = 0
+        self._full = None
+        self._task = None
+
+        self.batches = 0
+        self.segments = 0
+        self.requests = 0
+        self.errors = 0
+        self.write_seconds = 0.0
+
+    async def submit(self, meeting_id: str, segments: list) -> list:
+        """Write `segments` of a meeting and return them as get_transcriptions lists them."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((meeting_id, segments, future))
+        self._pending_segments += len(segments)
+        self.requests += 1
+
+        if self._task is None or self._task.done():
+            # Made here rather than in __init__ so it belongs to the running loop
+            self._full = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        elif self._pending_segments >= self.max_batch:
+            self._full.set()
+        return await future
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "segments": self.segments,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch_size": round(self.segments / self.batches, 1) if self.batches else None,
+            "write_seconds": round(self.write_seconds, 3),
+            "pending": self._pending_segments,
+        }
+
+    async def _run(self):
+        while self._pending:
+            if self._pending_segments < self.max_batch:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+            batch, self._pending, self._pending_segments = self._pending, [], 0
+
+            started = time.perf_counter()
+            try:
+                results = await run_ingest(self._write, [(meeting_id, segments) for meeting_id, segments, _ in batch])
+            except Exception as e:
+                print(f"Error writing transcript segments: {e}")
+                results = [e] * len(batch)
+            self.write_seconds += time.perf_counter() - started
+            self.batches += 1
+
+            for (_, segments, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    self.errors += 1
+                else:
+                    self.segments += len(segments)
+                # The request may have been cancelled while waiting
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _write(self, items: list) -> list:
+        texts = [segment["text"] for _, segments in items for segment in segments]
+        embeddings = self.qdrant_manager.embed_texts(texts)
+
+        # Requests' segments and embeddings grouped by meeting, in arrival order
+        meetings = {}
+        offset = 0
+        for index, (meeting_id, segments) in enumerate(items):
+            group = meetings.setdefault(meeting_id, {"requests": [], "segments": [], "embeddings": []})
+            group["requests"].append((index, len(segments)))
+            group["segments"].extend(segments)
+            group["embeddings"].extend(embeddings[offset:offset + len(segments)])
+            offset += len(segments)
+
+        # One upsert per Qdrant collection; a meeting that fails doesn't fail the others
+        written = self.qdrant_manager.add_segment_groups({
+            meeting_id: (group["segments"], group["embeddings"]) for meeting_id, group in meetings.items()
+        })
+        results = [None] * len(items)
+        for meeting_id, group in meetings.items():
+            start = 0
+            for index, count in group["requests"]:
+                result = written[meeting_id]
+                results[index] = result if isinstance(result, Exception) else result[start:start + count]
+                start += count
+        return results
@@ -1,14 +1,20 @@
 from typing import Optional
 import warnings
 from dotenv import load_dotenv
+import datetime
+import hashlib
 import os
 
 from langchain.prompts import PromptTemplate
-from langchain.chains.summarize import load_summarize_chain
-from langchain.chains.mapreduce import MapReduceChain
+from langchain.chains.combine_documents.reduce import ReduceDocumentsChain
+from langchain.chains.combine_documents.stuff import StuffDocumentsChain
+from langchain.chains.llm import LLMChain
+from langchain_core.documents import Document
+from langchain_core.output_parsers import StrOutputParser
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.rate_limiters import InMemoryRateLimiter
+
+from llm import gateway, BACKGROUND
 
 warnings.filterwarnings("ignore")
 
@@ -35,35 +41,101 @@ combine_prompt = PromptTemplate(
     template=combine_prompt_template, input_variables=["text"]
 )
 
-class Summarizer:
+MODEL_NAME = "gemini-2.0-flash-lite-001"
+
+
+class InMemoryMapStore:
+    """Map-step outputs keyed by chunk hash, kept for the life of the process."""
+
     def __init__(self):
-        rate_limiter = InMemoryRateLimiter(
-            requests_per_second=0.5,
-            check_every_n_seconds=0.1,
-            max_bucket_size=10,
-        )
-        self.gemini_llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash-lite-001", api_key=API_KEY, rate_limiter=rate_limiter)
-
-        self.summarizer = load_summarize_chain(
-            self.gemini_llm,
-            chain_type="map_reduce",
-            map_prompt=map_prompt,
-            combine_prompt=prompt,
-            return_intermediate_steps=True,
+        self.outputs = {}
+
+    def get_many(self, keys: list) -> dict:
+        return {key: self.outputs[key] for key in keys if key in self.outputs}
+
+    def put_many(self, outputs: dict):
+        self.outputs.update(outputs)
+
+
+class MongoMapStore:
+    """Map-step outputs keyed by chunk hash, persisted in a Mongo collection."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def get_many(self, keys: list) -> dict:
+        return {doc["_id"]: doc["output"] for doc in self.collection.find({"_id": {"$in": keys}})}
+
+    def put_many(self, outputs: dict):
+        now = datetime.datetime.now().isoformat()
+        for key, output in outputs.items():
+            self.collection.update_one({"_id": key}, {"$set": {"output": output, "created_at": now}}, upsert=True)
+
+
+class Summarizer:
+    def __init__(self, llm=None, map_store=None, max_concurrency: int = 4):
+        if llm is None:
+            # Rate limiting and concurrency come from the shared gateway, which
+            # also serves chat ahead of summaries
+            llm = gateway.chat_model(ChatGoogleGenerativeAI(model=MODEL_NAME, api_key=API_KEY), priority=BACKGROUND)
+        self.gemini_llm = llm
+        self.map_store = map_store if map_store is not None else InMemoryMapStore()
+        self.max_concurrency = max_concurrency
+
+        # Same map and combine steps as load_summarize_chain's map_reduce chain,
+        # split apart so map outputs can be reused between runs
+        self.map_chain = map_prompt | self.gemini_llm | StrOutputParser()
+        self.reduce_chain = ReduceDocumentsChain(
+            combine_documents_chain=StuffDocumentsChain(
+                llm_chain=LLMChain(llm=self.gemini_llm, prompt=prompt),
+                document_variable_name="text",
+            ),
+            token_max=3000,
         )
-        
+
     def summarize(self, text: str) -> str:
         '''
         Returns dict containing `"input_documents"`, `"intermediate_steps"`, `"summary"`, and `"detailed_summary"`
+
+        Map outputs are looked up in the map store by chunk hash, so when a
+        transcript grows only its new or changed chunks are mapped again and the
+        combine step runs on the cached outputs. `"mapped_chunks"` and
+        `"reused_chunks"` count how many chunks went through the map step.
         '''
         chunked = self.chunk_text(text)
-        summary = self.summarizer({"input_documents": chunked})
-        
-        detailed_summary = "\n".join([out for out in summary["intermediate_steps"]])
-        summary["detailed_summary"] = detailed_summary
-        summary["summary"] = summary.pop("output_text")
+        keys = [self.chunk_key(doc.page_content) for doc in chunked]
+
+        cached = self.map_store.get_many(list(set(keys)))
+        missing = {key: doc for key, doc in zip(keys, chunked) if key not in cached}
+        if missing:
+            outputs = self.map_chain.batch(
+                [{"text": doc.page_content} for doc in missing.values()],
+                config={"max_concurrency": self.max_concurrency},
+            )
+            fresh = dict(zip(missing, outputs))
+            self.map_store.put_many(fresh)
+            cached.update(fresh)
+
+        intermediate_steps = [cached[key] for key in keys]
+        output_text = ""
+        if intermediate_steps:
+            output_text = self.reduce_chain.invoke(
+                {"input_documents": [Document(page_content=step) for step in intermediate_steps]}
+            )["output_text"]
+
+        return {
+            "input_documents": chunked,
+            "intermediate_steps": intermediate_steps,
+            "summary": output_text,
+            "detailed_summary": "\n".join(intermediate_steps),
+            "mapped_chunks": len(missing),
+            "reused_chunks": len(keys) - len(missing),
+        }
 
-        return summary
+    def chunk_key(self, chunk: str) -> str:
+        # Include the model and prompt so changing either invalidates old outputs
+        llm_name = getattr(self.gemini_llm, "model", type(self.gemini_llm).__name__)
+        return hashlib.sha256(f"{llm_name}\0{map_prompt_template}\0{chunk}".encode("utf-8")).hexdigest()
 
     def chunk_text(self, text: str) -> list:
         text_splitter = RecursiveCharacterTextSplitter()
@@ -0,0 +1,20 @@
+import contextlib
+import io
+
+from fastapi.testclient import TestClient
+import pytest
+
+from benchmarks.fakes import install_fake_services
+
+
+@pytest.fixture(scope="session")
+def main():
+    """The app module with fake Mongo, Qdrant and Gemini. `main` can only be imported once per process."""
+    # The handlers print liberally
+    with contextlib.redirect_stdout(io.StringIO()):
+        return install_fake_services()
+
+
+@pytest.fixture
+def client(main):
+    return TestClient(main.app)
@@ -0,0 +1,20 @@
+import mongomock
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from db.indexes import ensure_indexes
+
+
+def test_duplicate_summaries_are_removed_before_the_unique_index():
+    database = mongomock.MongoClient()["biz_data"]
+    database["summaries"].insert_many([
+        {"meeting_id": "a", "summary": "read and updated by the API"},
+        {"meeting_id": "a", "summary": "inserted by a racing run"},
+        {"meeting_id": "b", "summary": "only one"},
+    ])
+
+    ensure_indexes(database)
+
+    assert sorted(doc["summary"] for doc in database["summaries"].find()) == ["only one", "read and updated by the API"]
+    with pytest.raises(DuplicateKeyError):
+        database["summaries"].insert_one({"meeting_id": "a", "summary": "another"})
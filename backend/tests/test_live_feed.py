@@ -0,0 +1,74 @@
+import asyncio
+
+from bson import ObjectId
+
+from benchmarks.fakes import make_qdrant_manager
+from live_feed import TranscriptFeed
+
+
+def segment(seq: int) -> dict:
+    return {"text": f"segment {seq}", "start_time": seq * 10.0, "end_time": seq * 10.0 + 9.5, "seq": seq}
+
+
+async def received(subscription, polls: int = 3) -> list:
+    segments = []
+    for _ in range(polls):
+        event, batch = await subscription.next(timeout=0.05)
+        if event == "reset":
+            segments.append("reset")
+        segments.extend(batch)
+    return segments
+
+
+def texts(segments: list) -> list:
+    return [s if s == "reset" else s["text"] for s in segments]
+
+
+def test_segments_written_out_of_order_are_delivered_once():
+    async def run():
+        manager = make_qdrant_manager()
+        meeting_id = str(ObjectId())
+        manager.add_segments(meeting_id, [segment(0)])
+        # No grace window, so the late segment is only found through the count
+        feed = TranscriptFeed(manager, poll_seconds=0.01, late_seconds=0)
+        subscription = feed.subscribe(meeting_id)
+        assert texts(await subscription.snapshot()) == ["segment 0"]
+
+        manager.add_segments(meeting_id, [segment(5)])
+        assert texts(await received(subscription)) == ["segment 5"]
+        # Finished after a later chunk, e.g. by another worker
+        manager.add_segments(meeting_id, [segment(3)])
+        assert texts(await received(subscription)) == ["segment 3"]
+
+        late_viewer = feed.subscribe(meeting_id)
+        assert texts(await late_viewer.snapshot()) == ["segment 0", "segment 3", "segment 5"]
+        late_viewer.close()
+        subscription.close()
+
+    asyncio.run(run())
+
+
+def test_deleted_transcript_is_cleared_and_resent():
+    async def run():
+        manager = make_qdrant_manager()
+        meeting_id = str(ObjectId())
+        manager.add_segments(meeting_id, [segment(0), segment(1)])
+        feed = TranscriptFeed(manager, poll_seconds=0.01)
+        subscription = feed.subscribe(meeting_id)
+        assert texts(await subscription.snapshot()) == ["segment 0", "segment 1"]
+
+        manager.delete_collection(meeting_id)
+        feed.reset(meeting_id)
+        assert texts(await received(subscription)) == ["reset"]
+
+        # Re-ingested from the start, so with the same seqs and point ids
+        restarted = [dict(segment(0), text="again 0")]
+        manager.add_segments(meeting_id, restarted)
+        assert texts(await received(subscription)) == ["again 0"]
+
+        late_viewer = feed.subscribe(meeting_id)
+        assert texts(await late_viewer.snapshot()) == ["again 0"]
+        late_viewer.close()
+        subscription.close()
+
+    asyncio.run(run())
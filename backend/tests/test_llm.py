@@ -0,0 +1,56 @@
+import threading
+import time
+
+from llm import LLMGateway
+
+
+class SlowStream:
+    """A streamed response whose chunks take `delay` seconds each, and that records being cancelled."""
+
+    def __init__(self, delay: float, chunks: int = 5):
+        self.delay = delay
+        self.chunks = chunks
+        self.cancelled = threading.Event()
+
+    def __iter__(self):
+        for i in range(self.chunks):
+            if self.cancelled.wait(self.delay):
+                raise RuntimeError("Cancelled")
+            yield type("Chunk", (), {"text": f"chunk {i} "})()
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+def test_cancel_while_waiting_for_a_chunk_stops_the_upstream_and_frees_the_slot():
+    gateway = LLMGateway(max_concurrency=1)
+    response = SlowStream(delay=5.0)
+    gateway._models["model"] = type("Model", (), {"generate_content": lambda self, *a, **k: response})()
+    cancel = threading.Event()
+    chunks = []
+    reader = threading.Thread(target=lambda: chunks.extend(gateway.stream("prompt", "model", cancel=cancel)))
+    reader.start()
+    time.sleep(0.2)
+    assert gateway.stats()["active"] == 1
+
+    started = time.monotonic()
+    cancel.set()
+    reader.join(timeout=2)
+
+    assert not reader.is_alive() and time.monotonic() - started < 1
+    assert chunks == []
+    assert response.cancelled.is_set()
+    assert gateway.stats()["active"] == 0
+
+
+def test_closing_the_generator_cancels_the_upstream():
+    gateway = LLMGateway()
+    response = SlowStream(delay=0.01)
+    gateway._models["model"] = type("Model", (), {"generate_content": lambda self, *a, **k: response})()
+
+    stream = gateway.stream("prompt", "model")
+    assert next(stream) == "chunk 0 "
+    stream.close()
+
+    assert response.cancelled.is_set()
+    assert gateway.stats()["active"] == 0
@@ -0,0 +1,45 @@
+"""Run from the backend directory: python -m pytest tests"""
+from bson import ObjectId
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointStruct
+
+from benchmarks.fakes import FakeEmbedder, SerializedClient
+from db.migrate_qdrant_shared import migrate
+from qdrant_layout import TenantResolver
+from qdrant_manager import QdrantManager
+
+DIMENSION = 8
+
+
+def legacy_meeting(client, meeting_id: str, count: int):
+    """A per-meeting collection as the old count()-based allocation wrote it: ids 0..count-1."""
+    client.create_collection(meeting_id, vectors_config={"size": DIMENSION, "distance": "Cosine"})
+    embedder = FakeEmbedder(dimension=DIMENSION)
+    client.upsert(meeting_id, points=[
+        PointStruct(id=i, vector=embedder.vector(f"{meeting_id} {i}"),
+                    payload={"text": f"segment {i} of {meeting_id}", "start_time": i * 10, "end_time": i * 10 + 10})
+        for i in range(count)
+    ])
+
+
+def test_meetings_with_overlapping_ids_keep_all_points():
+    client = SerializedClient(QdrantClient(":memory:"))
+    meetings = [str(ObjectId()) for _ in range(2)]
+    for meeting_id in meetings:
+        legacy_meeting(client, meeting_id, 5)
+    manager = QdrantManager(
+        qdrant_api_key=None, google_api_key=None, client=client, embed_fn=FakeEmbedder(dimension=DIMENSION),
+        storage="shared", tenant_resolver=TenantResolver(lambda meeting_id: ("team", "department")),
+    )
+
+    counts = migrate(manager, delete_source=True)
+
+    assert counts == {"meetings": 2, "points": 10, "failed": 0, "deleted": 2}
+    assert not {collection.name for collection in client.get_collections().collections} & set(meetings)
+    for meeting_id in meetings:
+        assert manager.points_version(meeting_id) == 5
+        texts = {segment["text"] for segment in manager.get_transcriptions(meeting_id)}
+        assert texts == {f"segment {i} of {meeting_id}" for i in range(5)}
+
+    assert client.count(manager.layout.collection_name, exact=True).count == 10
+
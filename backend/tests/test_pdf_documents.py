@@ -0,0 +1,65 @@
+from bson import ObjectId
+
+from benchmarks.fakes import synthetic_pdf
+
+
+def upload(client, meeting_id: str) -> str:
+    response = client.post(f"/meetings/{meeting_id}/upload-pdf",
+                           files={"file": ("notes.pdf", synthetic_pdf(2), "application/pdf")})
+    response.raise_for_status()
+    return response.json()["document_id"]
+
+
+def test_deleting_a_pdf_removes_its_points(client, main, monkeypatch):
+    # mongomock's GridFS can't delete files with this pymongo version
+    monkeypatch.setattr(main.pdf_storage, "delete", lambda file_id: True)
+    meeting_id = client.post(f"/teams/{ObjectId()}/meetings", json={"title": "Review"}).json()["inserted_id"]
+    first, second = upload(client, meeting_id), upload(client, meeting_id)
+    points = main.qdrant_manager.points_version(meeting_id)
+    assert points > 0
+
+    # The copies share points, which stay until the last one is deleted
+    client.delete(f"/pdf-documents/{first}").raise_for_status()
+    assert main.qdrant_manager.points_version(meeting_id) == points
+    client.delete(f"/pdf-documents/{second}").raise_for_status()
+    assert main.qdrant_manager.points_version(meeting_id) == 0
+
+
+def test_content_disposition_keeps_non_ascii_names(client):
+    meeting_id = client.post(f"/teams/{ObjectId()}/meetings", json={"title": "Review"}).json()["inserted_id"]
+    response = client.post(f"/meetings/{meeting_id}/upload-pdf",
+                           files={"file": ("Résumé 会议.pdf", synthetic_pdf(1), "application/pdf")})
+    response.raise_for_status()
+
+    response = client.get(f"/pdf-documents/{response.json()['document_id']}/content")
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == (
+        'inline; filename="R_sum_ __.pdf"; '
+        "filename*=UTF-8''R%C3%A9sum%C3%A9%20%E4%BC%9A%E8%AE%AE.pdf"
+    )
+
+
+def test_failed_extraction_is_rejected_and_cleaned_up(client, main, monkeypatch):
+    deleted = []
+    monkeypatch.setattr(main.pdf_storage, "delete", deleted.append)
+    meeting_id = client.post(f"/teams/{ObjectId()}/meetings", json={"title": "Review"}).json()["inserted_id"]
+
+    response = client.post(f"/meetings/{meeting_id}/upload-pdf",
+                           files={"file": ("broken.pdf", b"not a pdf", "application/pdf")})
+    assert response.status_code == 422
+
+    # Over the time limit part way through, after some chunks were already stored
+    def iter_lines(pdf_file):
+        yield from ["first line of the document", "second line of the document", "third line"]
+        raise main.PdfExtractionError("PDF extraction took longer than 60 seconds")
+    monkeypatch.setattr(main.pdf_extractor, "iter_lines", iter_lines)
+    for setting in ("chunk_chars", "embed_batch_size", "upsert_batch_size", "max_concurrency"):
+        monkeypatch.setattr(main.pdf_ingestor, setting, 1)
+    response = client.post(f"/meetings/{meeting_id}/upload-pdf",
+                           files={"file": ("slow.pdf", synthetic_pdf(1), "application/pdf")})
+    assert response.status_code == 413
+
+    assert len(deleted) == 2
+    assert main.db["pdf_documents"].count_documents({"meeting_id": meeting_id}) == 0
+    assert main.qdrant_manager.points_version(meeting_id) == 0
+    assert main.db["meetings"].find_one({"_id": ObjectId(meeting_id)}).get("pdf_documents") in (None, [])
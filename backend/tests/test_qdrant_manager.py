@@ -0,0 +1,56 @@
+import pytest
+from bson import ObjectId
+from qdrant_client import QdrantClient
+
+from benchmarks.fakes import FakeEmbedder, SerializedClient
+from qdrant_layout import TenantResolver
+from qdrant_manager import QdrantManager
+
+
+def shared_manager() -> QdrantManager:
+    return QdrantManager(
+        qdrant_api_key=None, google_api_key=None, client=SerializedClient(QdrantClient(":memory:")),
+        embed_fn=FakeEmbedder(), storage="shared",
+        tenant_resolver=TenantResolver(lambda meeting_id: ("team", "department")),
+    )
+
+
+def test_shared_layout_knows_which_meetings_exist():
+    manager = shared_manager()
+    meeting_id, unknown = str(ObjectId()), str(ObjectId())
+    manager.add_segments(meeting_id, [{"text": "hello", "start_time": 0.0, "end_time": 5.0, "seq": 0}])
+
+    assert manager.collection_exists(meeting_id)
+    assert not manager.collection_exists(unknown)
+    with pytest.raises(ValueError):
+        manager.get_transcriptions(unknown)
+    with pytest.raises(ValueError):
+        manager.delete_collection(unknown)
+
+    manager.delete_collection(meeting_id)
+    assert not manager.collection_exists(meeting_id)
+    with pytest.raises(ValueError):
+        manager.delete_collection(meeting_id)
+
+
+def test_transcript_revision_changes_when_a_segment_is_rewritten():
+    manager = shared_manager()
+    meeting_id = str(ObjectId())
+    manager.add_segments(meeting_id, [{"text": "first take", "start_time": 0.0, "end_time": 5.0, "seq": 0}])
+    revision = manager.transcript_revision(meeting_id)
+
+    # Same seq, so the same point and segment count
+    manager.add_segments(meeting_id, [{"text": "corrected", "start_time": 0.0, "end_time": 5.0, "seq": 0}])
+    assert manager.transcript_version(meeting_id) == 1
+    assert manager.transcript_revision(meeting_id) != revision
+
+
+def test_repeated_pdf_lines_are_all_kept():
+    manager = shared_manager()
+    meeting_id = str(ObjectId())
+    for index, line in enumerate(["Agenda", "Notes", "Agenda"]):
+        manager.add_text_pdf(meeting_id, line, "notes.pdf", index)
+    assert manager.points_version(meeting_id) == 3
+
+    manager.delete_pdf_points(meeting_id, "notes.pdf")
+    assert manager.points_version(meeting_id) == 0
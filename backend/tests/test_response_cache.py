@@ -0,0 +1,38 @@
+from bson import ObjectId
+
+from benchmarks.fakes import synthetic_pdf
+
+
+def add_meeting(client, team_id: str) -> str:
+    response = client.post(f"/teams/{team_id}/meetings", json={"title": "Planning", "meeting_date": "2024-01-01"})
+    response.raise_for_status()
+    return response.json()["inserted_id"]
+
+
+def test_transcription_status_updates_the_team_meeting_list(client):
+    team_id = str(ObjectId())
+    meeting_id = add_meeting(client, team_id)
+    # Cache the list, then change one of its meetings
+    assert [meeting.get("hasTranscription") for meeting in client.get(f"/teams/{team_id}/meetings").json()] == [None]
+
+    client.post(f"/meetings/{meeting_id}/transcription", json={"hasTranscription": True}).raise_for_status()
+
+    meetings = client.get(f"/teams/{team_id}/meetings").json()
+    assert [meeting["hasTranscription"] for meeting in meetings] == [True]
+
+
+def test_pdf_upload_and_delete_update_the_team_meeting_list(client, main, monkeypatch):
+    # mongomock's GridFS can't delete files with this pymongo version
+    monkeypatch.setattr(main.pdf_storage, "delete", lambda file_id: True)
+    team_id = str(ObjectId())
+    meeting_id = add_meeting(client, team_id)
+    assert client.get(f"/teams/{team_id}/meetings").json()[0].get("pdf_documents") is None
+
+    response = client.post(f"/meetings/{meeting_id}/upload-pdf",
+                           files={"file": ("notes.pdf", synthetic_pdf(1), "application/pdf")})
+    response.raise_for_status()
+    document_id = response.json()["document_id"]
+    assert client.get(f"/teams/{team_id}/meetings").json()[0]["pdf_documents"] == [document_id]
+
+    client.delete(f"/pdf-documents/{document_id}").raise_for_status()
+    assert client.get(f"/teams/{team_id}/meetings").json()[0]["pdf_documents"] == []
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from bson import ObjectId
+import pytest
+
+from db.indexes import ensure_indexes
+from jobs import JobCancelled, SummaryScheduler
+
+
+def saved(main, meeting_id: str):
+    summary = main.db["summaries"].find_one({"meeting_id": meeting_id})["summary"]
+    actions = sorted(action["description"] for action in main.db["actions"].find({"meeting_id": meeting_id}))
+    return summary, actions
+
+
+def test_a_superseded_job_does_not_overwrite_newer_results(main):
+    ensure_indexes(main.db)
+    meeting_id = str(ObjectId())
+    main.save_summary(meeting_id, 2, "newer", [{"description": "newer action"}])
+
+    # The older job got past its last cancellation check before the newer one saved
+    with pytest.raises(JobCancelled):
+        main.save_summary(meeting_id, 1, "older", [{"description": "older action"}])
+
+    assert saved(main, meeting_id) == ("newer", ["newer action"])
+
+
+def test_a_newer_job_replaces_older_results(main):
+    ensure_indexes(main.db)
+    meeting_id = str(ObjectId())
+    main.db["summaries"].insert_one({"meeting_id": meeting_id, "summary": "from before jobs had generations"})
+    main.db["actions"].insert_one({"meeting_id": meeting_id, "description": "old action"})
+
+    main.save_summary(meeting_id, 1, "first", [{"description": "first action"}])
+    main.save_summary(meeting_id, 2, "second", [{"description": "second action"}])
+
+    assert saved(main, meeting_id) == ("second", ["second action"])
+
+
+def test_finished_jobs_are_forgotten_after_their_ttl():
+    release = threading.Event()
+    scheduler = SummaryScheduler(lambda job: release.wait(5), lambda meeting_id: 1, max_workers=1,
+                                 finished_ttl=0.05)
+    jobs = [scheduler.submit(meeting_id) for meeting_id in ("a", "b")]
+    assert scheduler.stats()["running"] + scheduler.stats()["queue_depth"] == 2
+
+    release.set()
+    scheduler._pool.shutdown(wait=True)
+    assert all(job.status == "done" for job in jobs)
+    assert scheduler.latest("a") is jobs[0]
+
+    time.sleep(0.1)
+    assert scheduler.latest("a") is None
+    assert scheduler.stats()["tracked_meetings"] == 0
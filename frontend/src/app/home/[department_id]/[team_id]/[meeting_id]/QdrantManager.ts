@@ -1,5 +1,4 @@
 import { QdrantClient } from '@qdrant/js-client-rest';
-import { GoogleGenerativeAI } from '@google/generative-ai';
 
 interface SearchResult {
   payload: {
@@ -10,7 +9,10 @@ interface SearchResult {
   score: number;
 }
 
-const googleApiKey = process.env.GOOGLE_API_KEY || '';
+// Same settings as the backend: "shared" keeps every meeting in one collection,
+// with each point tagged by its meeting, team and department
+const SHARED_STORAGE = process.env.QDRANT_STORAGE === 'shared';
+const SHARED_COLLECTION = process.env.QDRANT_SHARED_COLLECTION || 'meetings';
 
 export interface Point {
   id: string | number; // ID can be a string or a number
@@ -37,8 +39,19 @@ export class QdrantManager {
     });
   }
 
+  // Physical collection and filter for a meeting's points
+  private collectionFor(collectionName: string): string {
+    return SHARED_STORAGE ? SHARED_COLLECTION : collectionName;
+  }
+
+  private meetingFilter(collectionName: string) {
+    return SHARED_STORAGE
+      ? { must: [{ key: 'meeting_id', match: { value: collectionName } }] }
+      : undefined;
+  }
+
   async collectionExists(collectionName: string): Promise<boolean> {
-    const { exists } = await this.client.collectionExists(collectionName);
+    const { exists } = await this.client.collectionExists(this.collectionFor(collectionName));
     if (exists) {
       return true;
     } else {
@@ -50,6 +63,11 @@ export class QdrantManager {
     collectionName: string,
     vectorSize: number = 768
   ): Promise<void> {
+    if (SHARED_STORAGE) {
+      // The backend creates the shared collection and its indexes at startup
+      return;
+    }
+
     try {
       const { exists } = await this.client.collectionExists(collectionName);
       if (exists) {
@@ -72,102 +90,14 @@ export class QdrantManager {
     console.log(`Collection '${collectionName}' created successfully`);
   }
 
-  async deleteCollection(collectionName: string): Promise<void> {
-    const { exists } = await this.client.collectionExists(collectionName);
-    if (!exists) {
-      throw new Error(`Collection '${collectionName}' does not exist`);
-    }
-
-    await this.client.deleteCollection(collectionName);
-  }
-
-  private async getNextId(collectionName: string): Promise<number> {
-    try {
-      const response = await this.client.count(collectionName);
-
-      // If there are no points, start with ID 0
-      if (!response.count) {
-        return 0;
-      }
-
-      const highestId = response.count as number;
-      console.log("Highest ID:", highestId);
-      return highestId;
-    } catch (error) {
-      console.error('Error getting next ID:', error);
-      // If there's an error reading, start with ID 0
-      return 0;
-    }
-  }
-
-  private async getLastEndTime(collectionName: string, lastId: number): Promise<number> {
-    try {
-      if (lastId < 0) {
-        console.log("No points in the collection.");
-        return 0;
-      }
-      // Retrieve the point with the last ID
-      const point = await this.client.retrieve(collectionName, {
-        ids: [lastId], // Assuming IDs are strings
-      });
-  
-      if (point && point.length > 0) {
-        const lastPoint = point[0];
-        const endTime = lastPoint.payload?.end_time;
-  
-        console.log("Last point retrieved:", lastPoint);
-        console.log("End Time:", endTime);
-  
-        return endTime as number;
-      } else {
-        console.log("No point found with the last ID.");
-        return 0;
-      }
-    } catch (error) {
-      console.error("Error retrieving last point:", error);
-      return 0;
-    }
-  }  
-
-  async addText(collectionName: string, text: string): Promise<void> {
-    const { exists } = await this.client.collectionExists(collectionName);
-    if (!exists) {
-      throw new Error(`Collection '${collectionName}' does not exist`);
-    }
-
-    // Get embedding from Google's Generative AI
-    const genAI = new GoogleGenerativeAI(googleApiKey);
-    const model = genAI.getGenerativeModel({ model: 'text-embedding-004' });
-    const result = await model.embedContent(text);
-    const embedding = result.embedding.values;
-
-    // Get the next available ID from the database
-    const nextId = await this.getNextId(collectionName);
-    const lastEndTime = await this.getLastEndTime(collectionName, nextId - 1);
-
-    await this.client.upsert(collectionName, {
-      wait: true,
-      points: [
-        {
-          id: nextId,
-          vector: embedding,
-          payload: {
-            text,
-            start_time: lastEndTime,
-            end_time: lastEndTime + 10,
-          },
-        },
-      ],
-    });
-  }
-
   async getTranscriptions(collectionName: string) {
-    const { exists } = await this.client.collectionExists(collectionName);
+    const { exists } = await this.client.collectionExists(this.collectionFor(collectionName));
     if (!exists) {
       throw new Error(`Collection '${collectionName}' does not exist`);
     }
 
-    const response = await this.client.query(collectionName, {
+    const response = await this.client.query(this.collectionFor(collectionName), {
+      filter: this.meetingFilter(collectionName),
       limit: 1000,
       with_payload: true,
     });
@@ -10,12 +10,58 @@ const qdrantApiKey = process.env.QDRANT_API_KEY || '';
 const host = process.env.QDRANT_LINK || 'http://localhost';
 const manager = new QdrantManager(qdrantApiKey, host);
 
+// Transcript segments are written through the backend, which embeds and
+// stores them in batches
+const BACKEND_URL = process.env.BACKEND_URL || 'http://localhost:8000';
+const SEGMENT_RETRIES = 3;
+
+// Where a chunk sits in the meeting: its sequence number and its start and
+// end in seconds from the start of the meeting
+export interface SegmentTiming {
+  seq: number;
+  startTime: number;
+  endTime: number;
+}
+
+export interface TranscriptPosition {
+  nextStartTime: number;
+  nextSeq: number;
+}
+
 const client = new AssemblyAI({
   apiKey: ASSEMBLYAI_API_KEY,
 });
 
 
-export async function processAudioChunk(audioBlob: Blob, collectionName: string) {
+async function addSegment(collectionName: string, text: string, timing: SegmentTiming): Promise<void> {
+  const body = JSON.stringify({
+    text,
+    seq: timing.seq,
+    start_time: timing.startTime,
+    end_time: timing.endTime,
+  });
+
+  // Segment ids come from the meeting and seq, so a retry can't duplicate it
+  for (let attempt = 1; ; attempt++) {
+    try {
+      const response = await fetch(`${BACKEND_URL}/meetings/${collectionName}/segments`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body,
+      });
+      if (response.ok) return;
+      // Bad requests won't succeed on a retry
+      if (response.status < 500 || attempt >= SEGMENT_RETRIES) {
+        throw new Error(`Adding segment failed: ${response.status} ${await response.text()}`);
+      }
+    } catch (error) {
+      if (attempt >= SEGMENT_RETRIES || !(error instanceof TypeError)) throw error;
+    }
+    await new Promise((resolve) => setTimeout(resolve, 500 * attempt));
+  }
+}
+
+export async function processAudioChunk(audioBlob: Blob, collectionName: string, timing: SegmentTiming) {
   try {
     // Check if the blob is valid
     if (!audioBlob.type.includes('audio/')) {
@@ -52,8 +98,8 @@ export async function processAudioChunk(audioBlob: Blob, collectionName: string)
     }
     
     if (transcript.text && transcript.text.trim()) {
-      await manager.addText(collectionName, transcript.text);
-      console.log('Added transcription to Qdrant:', transcript.text);
+      await addSegment(collectionName, transcript.text.trim(), timing);
+      console.log('Added transcription segment:', timing.seq, transcript.text);
     }
 
   } catch (error) {
@@ -62,22 +108,35 @@ export async function processAudioChunk(audioBlob: Blob, collectionName: string)
   }
 }
 
-export async function initializeCollection(collectionName: string, vectorSize: number = 768): Promise<void> {
+export async function initializeCollection(collectionName: string): Promise<TranscriptPosition> {
+    // The backend creates the collection with its embedder's vector size and
+    // says where the transcript so far ends
     try {
-      console.log(`Initializing collection '${collectionName}' with vector size ${vectorSize}`);
-      await manager.createCollection(collectionName, vectorSize);
+      console.log(`Initializing collection '${collectionName}'`);
+      const response = await fetch(`${BACKEND_URL}/meetings/${collectionName}/collection`, { method: 'POST' });
+      if (!response.ok) {
+        throw new Error(`${response.status} ${await response.text()}`);
+      }
+      const position = await response.json();
+      return { nextStartTime: position.next_start_time, nextSeq: position.next_seq };
     } catch (error) {
       console.error(`Error initializing collection '${collectionName}':`, error);
+      return { nextStartTime: 0, nextSeq: 0 };
     }
 }
 
-export async function restartCollection(collectionName: string, vectorSize: number = 768): Promise<void> {
+export async function restartCollection(collectionName: string): Promise<TranscriptPosition> {
+  // Through the backend, so its cached view of the collection is dropped too
   try {
-    await manager.deleteCollection(collectionName);
-    await manager.createCollection(collectionName, vectorSize);
+    const response = await fetch(`${BACKEND_URL}/meetings/${collectionName}/collection`, { method: 'DELETE' });
+    // 404: nothing recorded yet
+    if (!response.ok && response.status !== 404) {
+      throw new Error(`${response.status} ${await response.text()}`);
+    }
   } catch (error) {
     console.error(`Error restarting collection '${collectionName}':`, error);
   }
+  return await initializeCollection(collectionName);
 }
 
 export async function collectionExists(collectionName: string): Promise<boolean> {
@@ -93,9 +93,23 @@ export default function ChatPage() {
     setInputMessage('');
     setIsSending(true);
     
+    // Bot message that the streamed tokens are appended to
+    const botId = (Date.now() + 1).toString();
+    setMessages(prev => [...prev, {
+      id: botId,
+      content: '',
+      sender: 'bot',
+      timestamp: new Date().toISOString()
+    }]);
+    const setBotContent = (update: (content: string) => string) => {
+      setMessages(prev => prev.map(message =>
+        message.id === botId ? { ...message, content: update(message.content) } : message
+      ));
+    };
+
     try {
-      // Call the backend API
-      const response = await fetch(`/api/backend/meetings/${meetingId}/chat`, {
+      // Stream the answer as server-sent events: citations, token..., done
+      const response = await fetch(`/api/backend/meetings/${meetingId}/chat/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -103,33 +117,42 @@ export default function ChatPage() {
         body: JSON.stringify({ message: inputMessage }),
       });
       
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error('Failed to get response');
       }
       
-      const data = await response.json();
-      
-      // Add bot response
-      const botMessage: Message = {
-        id: Date.now().toString(),
-        content: data.message,
-        sender: 'bot',
-        timestamp: new Date().toISOString()
-      };
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
       
-      setMessages(prev => [...prev, botMessage]);
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        // Events are separated by a blank line
+        const events = buffer.split('\n\n');
+        buffer = events.pop() || '';
+        
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1];
+          const data = raw.match(/^data: (.*)$/m)?.[1];
+          if (!event || !data) continue;
+          
+          const payload = JSON.parse(data);
+          if (event === 'token') {
+            setBotContent(content => content + payload.text);
+          } else if (event === 'done') {
+            setBotContent(() => payload.message);
+          } else if (event === 'error') {
+            throw new Error(payload.detail);
+          }
+        }
+      }
     } catch (err) {
       console.error('Error sending message:', err);
       
-      // Add error message
-      const errorMessage: Message = {
-        id: Date.now().toString(),
-        content: 'Sorry, I couldn\'t process your request at the moment.',
-        sender: 'bot',
-        timestamp: new Date().toISOString()
-      };
-      
-      setMessages(prev => [...prev, errorMessage]);
+      setBotContent(() => 'Sorry, I couldn\'t process your request at the moment.');
     } finally {
       setIsSending(false);
     }
@@ -158,6 +158,9 @@ export default function MeetingPage() {
     const intervalRef = useRef<NodeJS.Timeout | null>(null);
     const chunksRef = useRef<Blob[]>([]);
     const durationTimeoutRef = useRef<NodeJS.Timeout | null>(null);
+    // Where this recording session continues the meeting's transcript: chunk
+    // times are measured from startedAt and offset past the existing segments
+    const transcriptClockRef = useRef<{ startedAt: number; offset: number; nextSeq: number } | null>(null);
 
     // Meeting state
     const [meeting, setMeeting] = useState<MeetingDetails | null>(null);
@@ -247,6 +250,12 @@ export default function MeetingPage() {
         // Clear previous chunks
         chunksRef.current = [];
 
+        const clock = transcriptClockRef.current;
+        if (!clock) return;
+        const elapsedSeconds = () => clock.offset + (Date.now() - clock.startedAt) / 1000;
+        const seq = clock.nextSeq++;
+        const startTime = elapsedSeconds();
+
         // Create new MediaRecorder with appropriate options
         const options = {
             mimeType: 'audio/webm;codecs=opus',
@@ -265,8 +274,9 @@ export default function MeetingPage() {
             mediaRecorderRef.current.onstop = async () => {
                 if (chunksRef.current.length > 0) {
                     const audioBlob = new Blob(chunksRef.current, { type: 'audio/webm;codecs=opus' });
+                    const endTime = elapsedSeconds();
                     try {
-                        await processAudioChunk(audioBlob, meetingId);
+                        await processAudioChunk(audioBlob, meetingId, { seq, startTime, endTime });
                     } catch (error) {
                         console.error("Error processing audio chunk:", error);
                     }
@@ -283,11 +293,16 @@ export default function MeetingPage() {
 
     const handleStartTranscription = async (durationMs?: number) => {
         try {
-            await initializeCollection(meetingId);
-            console.log("Starting transcription...");
-
             if (transcriptionStarted) return;
 
+            const position = await initializeCollection(meetingId);
+            transcriptClockRef.current = {
+                startedAt: Date.now(),
+                offset: position.nextStartTime,
+                nextSeq: position.nextSeq,
+            };
+            console.log("Starting transcription...");
+
             const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
             streamRef.current = stream;
             
@@ -359,7 +374,15 @@ export default function MeetingPage() {
 
     const handleRestartCollection = async () => {
         try {
-            await restartCollection(meetingId);
+            const position = await restartCollection(meetingId);
+            // A recording in progress continues from the emptied transcript
+            if (transcriptClockRef.current) {
+                Object.assign(transcriptClockRef.current, {
+                    startedAt: Date.now(),
+                    offset: position.nextStartTime,
+                    nextSeq: position.nextSeq,
+                });
+            }
             console.log("Collection restarted successfully.");
         } catch (error) {
             console.error("Error restarting collection:", error);
@@ -429,31 +452,9 @@ export default function MeetingPage() {
     };
 
     // Function to open a PDF in a new tab
-    const openPdf = async (documentId: string) => {
-        try {
-            const response = await fetch(`/api/backend/pdf-documents/${documentId}`);
-
-            if (!response.ok) {
-                throw new Error('Failed to fetch PDF document');
-            }
-
-            const document = await response.json();
-
-            // Create a blob from the base64 data
-            const binaryString = atob(document.file_content);
-            const bytes = new Uint8Array(binaryString.length);
-            for (let i = 0; i < binaryString.length; i++) {
-                bytes[i] = binaryString.charCodeAt(i);
-            }
-            const blob = new Blob([bytes], { type: 'application/pdf' });
-
-            // Create a URL for the blob and open it in a new tab
-            const url = URL.createObjectURL(blob);
-            window.open(url, '_blank');
-        } catch (err) {
-            console.error('Error opening PDF:', err);
-            alert('Failed to open PDF. Please try again.');
-        }
+    const openPdf = (documentId: string) => {
+        // The backend streams the file itself, so the browser's viewer can fetch it in ranges
+        window.open(`/api/backend/pdf-documents/${documentId}/content`, '_blank');
     };
 
     // First, add the deleteDocument function to handle document deletion
@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import Link from 'next/link';
 import { useParams, useRouter } from 'next/navigation';
 import ReactMarkdown from 'react-markdown';
@@ -78,6 +78,7 @@ export default function TranscriptionPage() {
     const [apiTranscriptions, setApiTranscriptions] = useState<TranscriptSegment[]>([]);
     const [isLoadingTranscriptions, setIsLoadingTranscriptions] = useState(false);
     const [transcriptError, setTranscriptError] = useState<string | null>(null);
+    const latestSegments = useRef<TranscriptSegment[]>([]);
 
     // State for AI summary
     const [aiSummary, setAiSummary] = useState<string | null>(null);
@@ -135,22 +136,20 @@ export default function TranscriptionPage() {
                 const meetingData = await response.json();
                 setMeeting(meetingData);
                 
-                // Initialize a basic transcript structure
+                // Initialize a basic transcript structure, keeping any segments
+                // the live stream delivered before the meeting loaded
                 setTranscript({
                     meetingId: meetingId,
                     meetingName: meetingData.title,
                     date: meetingData.meeting_date,
                     duration: '00:00:00', // Will be updated based on transcription
                     speakers: sampleSpeakers,
-                    segments: [],
+                    segments: latestSegments.current,
                     summary: '',
                     keyPoints: [],
                     actionItems: []
                 });
 
-                // Fetch transcriptions from API
-                await fetchTranscriptions(meetingId);
-                
             } catch (err) {
                 console.error('Error fetching meeting:', err);
             } finally {
@@ -160,13 +159,37 @@ export default function TranscriptionPage() {
         
         fetchMeeting();
 
-        // Set up polling every 5 seconds
-        const intervalId = setInterval(() => {
-            fetchTranscriptions(meetingId);
-        }, 5000);
+        // Subscribe to the live transcript: the server sends everything so far
+        // as a "snapshot" event and then only newly ingested segments, or a
+        // "reset" event when the transcript was deleted
+        let received: any[] = [];
+        setIsLoadingTranscriptions(true);
+        const eventSource = new EventSource(`/api/backend/meetings/${meetingId}/transcriptions/stream`);
+
+        eventSource.addEventListener('snapshot', (event) => {
+            received = JSON.parse((event as MessageEvent).data).transcriptions || [];
+            applyTranscriptions(received);
+            setIsLoadingTranscriptions(false);
+        });
+
+        eventSource.addEventListener('segments', (event) => {
+            received = [...received, ...(JSON.parse((event as MessageEvent).data).transcriptions || [])];
+            applyTranscriptions(received);
+        });
+
+        eventSource.addEventListener('reset', () => {
+            received = [];
+            applyTranscriptions(received);
+        });
+
+        eventSource.onerror = () => {
+            // EventSource reconnects on its own and the server resends the snapshot
+            setTranscriptError('Lost connection to the live transcript, reconnecting...');
+            setIsLoadingTranscriptions(false);
+        };
 
-        // Clean up the interval on component unmount
-        return () => clearInterval(intervalId);
+        // Close the stream on component unmount
+        return () => eventSource.close();
     }, [meetingId]);
 
     // Effect to fetch AI summary when user switches to summary tab
@@ -176,19 +199,9 @@ export default function TranscriptionPage() {
         }
     }, [activeTab]);
 
-    // Fetch transcriptions from API
-    const fetchTranscriptions = async (meetingId: string) => {
-        setIsLoadingTranscriptions(true);
+    // Show transcriptions received from the live transcript stream
+    const applyTranscriptions = (transcriptions: any[]) => {
         try {
-            const response = await fetch(`/api/backend/meetings/${meetingId}/transcriptions`);
-            
-            if (!response.ok) {
-                throw new Error('Failed to fetch transcriptions');
-            }
-            
-            const data = await response.json();
-            const transcriptions = data.transcriptions || [];
-            
             // Map API transcriptions to our TranscriptSegment format
             // Assign random speakers for tracking
             const speakerIds = sampleSpeakers.map(s => s.id) || [];
@@ -209,6 +222,7 @@ export default function TranscriptionPage() {
             });
             
             setApiTranscriptions(formattedTranscriptions);
+            latestSegments.current = formattedTranscriptions;
             
             // If we have API transcriptions, update the transcript object
             if (formattedTranscriptions.length > 0) {
@@ -223,7 +237,7 @@ export default function TranscriptionPage() {
             
             setTranscriptError(null);
         } catch (err) {
-            console.error('Error fetching transcriptions:', err);
+            console.error('Error processing transcriptions:', err);
             setTranscriptError('Failed to load transcriptions from API');
         } finally {
             setIsLoadingTranscriptions(false);
@@ -103,18 +103,17 @@ export default function TeamPage() {
             setError(null);
             
             try {
-                // Fetch the specific team directly by its ID
-                const teamResponse = await fetch(`/api/backend/teams/${teamId}`);
+                // Fetch the team together with its meetings
+                const teamResponse = await fetch(`/api/backend/org-tree?team_id=${teamId}`);
                 
                 if (!teamResponse.ok) {
                     throw new Error('Failed to fetch team');
                 }
                 
-                const teamData = await teamResponse.json();
+                const data = await teamResponse.json();
+                const { meetings: teamMeetings, ...teamData } = data.teams[0];
                 setTeam(teamData);
-                
-                // Now fetch meetings for this team
-                await fetchMeetings(teamId);
+                showMeetings(teamMeetings);
             } catch (err) {
                 console.error('Error fetching team data:', err);
                 setError('Failed to load team data');
@@ -126,6 +125,25 @@ export default function TeamPage() {
         fetchTeamData();
     }, [departmentId, teamId]);
     
+    const showMeetings = (data: Meeting[]) => {
+        setMeetings(data);
+        
+        // Create calendar events from meetings
+        const events = data.map((meeting: Meeting) => ({
+            id: meeting._id,
+            title: meeting.title,
+            start: new Date(meeting.meeting_date).toISOString(),
+            end: new Date(new Date(meeting.meeting_date).getTime() + 60 * 60 * 1000).toISOString(), // Add 1 hour
+            extendedProps: {
+                description: meeting.description,
+                teamId: meeting.teamId,
+                _id: meeting._id
+            }
+        }));
+        
+        setCalendarEvents(events);
+    };
+
     const fetchMeetings = async (teamId: string) => {
         try {
             setIsFetchingMeetings(true);
@@ -136,22 +154,7 @@ export default function TeamPage() {
             }
             
             const data = await res.json();
-            setMeetings(data);
-            
-            // Create calendar events from meetings
-            const events = data.map((meeting: Meeting) => ({
-                id: meeting._id,
-                title: meeting.title,
-                start: new Date(meeting.meeting_date).toISOString(),
-                end: new Date(new Date(meeting.meeting_date).getTime() + 60 * 60 * 1000).toISOString(), // Add 1 hour
-                extendedProps: {
-                    description: meeting.description,
-                    teamId: meeting.teamId,
-                    _id: meeting._id
-                }
-            }));
-            
-            setCalendarEvents(events);
+            showMeetings(data);
         } catch (error) {
             console.error('Error fetching meetings:', error);
         } finally {
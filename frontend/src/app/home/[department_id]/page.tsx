@@ -37,24 +37,21 @@ export default function DepartmentPage() {
             setError(null);
             
             try {
-                // First, fetch all departments to find the one we need
-                const response = await fetch('/api/backend/departments');
+                // Fetch the department together with its teams
+                const response = await fetch(`/api/backend/org-tree?department_id=${departmentId}&depth=teams`);
                 
+                if (response.status === 404) {
+                    setError('Department not found');
+                    return;
+                }
                 if (!response.ok) {
-                    throw new Error('Failed to fetch departments');
+                    throw new Error('Failed to fetch department');
                 }
                 
-                const departments = await response.json();
-                const currentDepartment = departments.find((dept: Department) => dept._id === departmentId);
-                
-                if (currentDepartment) {
-                    setDepartment(currentDepartment);
-                    
-                    // Now fetch teams for this department
-                    await fetchTeams(departmentId);
-                } else {
-                    setError('Department not found');
-                }
+                const data = await response.json();
+                const { teams: departmentTeams, ...currentDepartment } = data.departments[0];
+                setDepartment(currentDepartment);
+                setTeams(departmentTeams);
             } catch (err) {
                 console.error('Error fetching department data:', err);
                 setError('Failed to load department data');
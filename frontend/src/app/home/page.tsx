@@ -42,13 +42,13 @@ export default function HomePage() {
   const fetchDepartments = async () => {
     setIsLoading(true);
     try {
-      // Use the backend API directly through the Next.js rewrite proxy
-      const response = await fetch('/api/backend/departments');
+      // Departments with their team counts in one request
+      const response = await fetch('/api/backend/org-tree?depth=departments');
       
       if (response.ok) {
         const data = await response.json();
         // Map the API data to match our Department interface
-        const formattedDepartments = data.map((dept: any) => ({
+        const formattedDepartments = data.departments.map((dept: any) => ({
           id: dept.name.toLowerCase().replace(/\s+/g, '-'),
           _id: dept._id,
           name: dept.name,